@@ -0,0 +1,90 @@
+"""
+Per-request deadlines.
+
+A caller's deadline (``deadline_ms`` or the ``X-Deadline-Ms`` header) is
+turned into an absolute ``time.monotonic()`` value and kept in a context
+variable, so it follows the request into every task and fetch thread it
+spawns. The scheduler skips work that has not started by the deadline, and
+HTTP timeouts shrink to the time that is left.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+_deadline: ContextVar[float | None] = ContextVar("deadline", default=None)
+_progress: ContextVar["Progress | None"] = ContextVar("deadline_progress", default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    """The deadline passed while the work was running."""
+
+
+class Skipped(DeadlineExceeded):
+    """The deadline passed before the work could start."""
+
+
+def from_budget(*budgets_ms: int | None) -> float | None:
+    """Absolute deadline for the tightest of the given budgets (in ms), if any."""
+    budgets = [b for b in budgets_ms if b is not None]
+    if not budgets:
+        return None
+    return time.monotonic() + min(budgets) / 1000
+
+
+@contextmanager
+def scope(deadline: float | None):
+    """Run the block under ``deadline``; None keeps the enclosing deadline, if any."""
+    if deadline is None:
+        yield
+        return
+    token = _deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+class Progress:
+    """Whether the tracked piece of work got past its queue before the deadline."""
+
+    __slots__ = ("started",)
+
+    def __init__(self):
+        self.started = False
+
+
+def track() -> Progress:
+    """Track the work run from here on (the current task and tasks it creates)."""
+    progress = Progress()
+    _progress.set(progress)
+    return progress
+
+
+def mark_started() -> None:
+    progress = _progress.get()
+    if progress is not None:
+        progress.started = True
+
+
+def remaining() -> float | None:
+    """Seconds left before the current deadline (may be negative), or None."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def expired() -> bool:
+    left = remaining()
+    return left is not None and left <= 0
+
+
+def timeout(default: float) -> float:
+    """``default`` capped to the time left; raises once nothing is left."""
+    left = remaining()
+    if left is None:
+        return default
+    if left <= 0:
+        raise DeadlineExceeded("deadline reached")
+    return min(default, left)
@@ -0,0 +1,193 @@
+"""
+Columnar export of scraped companies and profiles (Parquet or Arrow).
+
+Reads crawl output (Scrapy ``-O`` JSON files, JSON lines, rotating feed
+directories) and writes one typed table, so analysis starts from numbers and
+nulls instead of re-parsing strings. Normalization runs column-wise with
+Arrow compute kernels:
+
+- ``""`` and ``"not-found"`` become nulls in every column;
+- counts (``linkedin_followers_count``, ``num_of_employees``,
+  ``funding_total_rounds``) become int64, whether stored as ints or as
+  text like ``"1,230 employees"``;
+- ``company_size_approx`` ("201-500", "10,001+") also gives
+  ``company_size_min`` / ``company_size_max`` (null for an open range);
+- ``funding`` ("US$ 6.6B") also gives ``funding_amount`` (float64) and
+  ``funding_currency``;
+- ``founded`` becomes an int32 year and ``last_funding_round``
+  ("Sep 14, 2023") a timestamp;
+- for profiles, ``connections`` ("500+ connections") also gives
+  ``connections_min``.
+
+Parquet files are written in row groups of ``--row-group-size`` rows with
+min/max statistics, so readers skip groups a filter rules out; ``--sort-by``
+clusters rows on a column to make those statistics selective. Other
+extensions (``.arrow``, ``.feather``) write an Arrow IPC file.
+
+Needs pyarrow (``pip install pyarrow``).
+
+    python -m api.export companies company_profile.json output/company_profile_scraper -o companies.parquet
+    python -m api.export profiles user_profiles.json -o profiles.parquet
+"""
+
+import argparse
+import os
+
+import numpy as np
+
+from scraper_common.items import COMPANY_FIELDS, PROFILE_FIELDS
+from scraper_common.records import iter_items, read_file
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+except ImportError:  # optional: only the export needs it
+    pa = None
+
+SENTINELS = ("", "not-found")
+COUNT_FIELDS = ("linkedin_followers_count", "num_of_employees", "funding_total_rounds")
+DATE_FORMATS = ("%b %d, %Y", "%b %Y", "%Y-%m-%d")
+ROW_GROUP_SIZE = 64 * 1024
+
+_NUMBER = r"(?P<n>\d[\d,]*)"
+_SIZE = r"^\s*(?P<min>\d[\d,]*)\s*(?:[-–]\s*(?P<max>\d[\d,]*))?"
+_MONEY = r"(?P<currency>[^\d\s]*)\s*(?P<amount>\d+(?:\.\d+)?)\s*(?P<unit>[KMBT]?)"
+_UNITS = ("", "K", "M", "B", "T")
+_MULTIPLIERS = np.array([1.0, 1e3, 1e6, 1e9, 1e12])
+
+
+def _require_pyarrow() -> None:
+    if pa is None:
+        raise RuntimeError("The columnar export needs pyarrow (pip install pyarrow)")
+
+
+# ── Reading ──
+
+
+def read_records(paths):
+    """Records from JSON/JSON lines files and the complete segments of feed directories."""
+    for path in paths:
+        if os.path.isdir(path):
+            yield from iter_items(path)
+        else:
+            yield from read_file(path)
+
+
+def _columns(records, fields) -> dict[str, list]:
+    """Records transposed into one list per field, values as text (None kept)."""
+    columns = {name: [] for name in fields}
+    for record in records:
+        for name, values in columns.items():
+            value = record.get(name)
+            values.append(None if value is None else str(value))
+    return columns
+
+
+# ── Normalization (whole columns) ──
+
+
+def _strings(values: list) -> "pa.Array":
+    """String array with the ``not-found`` style sentinels as nulls."""
+    array = pa.array(values, type=pa.string())
+    return pc.if_else(pc.is_in(array, value_set=pa.array(SENTINELS)), None, array)
+
+
+def _group(array: "pa.Array", pattern: str, name: str) -> "pa.Array":
+    return pc.struct_field(pc.extract_regex(array, pattern), name)
+
+
+def _ints(array: "pa.Array", pattern: str = _NUMBER, name: str = "n") -> "pa.Array":
+    """First number in each string ("1,230 employees" -> 1230); null if none."""
+    digits = pc.replace_substring(_group(array, pattern, name), ",", "")
+    return pc.cast(pc.if_else(pc.equal(digits, ""), None, digits), pa.int64())
+
+
+def _timestamps(array: "pa.Array") -> "pa.Array":
+    """Dates in any of ``DATE_FORMATS``; null when none matches."""
+    parsed = pc.strptime(array, format=DATE_FORMATS[0], unit="s", error_is_null=True)
+    for fmt in DATE_FORMATS[1:]:
+        # Later formats only while some values are still unparsed
+        if parsed.null_count == array.null_count:
+            break
+        parsed = pc.coalesce(parsed, pc.strptime(array, format=fmt, unit="s", error_is_null=True))
+    return parsed
+
+
+def _money(array: "pa.Array") -> tuple["pa.Array", "pa.Array"]:
+    """("US$ 6.6B") -> (6.6e9, "US$")."""
+    matched = pc.extract_regex(array, _MONEY)
+    amount = pc.cast(pc.struct_field(matched, "amount"), pa.float64())
+    unit = pc.index_in(pc.struct_field(matched, "unit"), value_set=pa.array(_UNITS))
+    scale = _MULTIPLIERS[pc.fill_null(unit, 0).to_numpy(zero_copy_only=False)]
+    currency = pc.struct_field(matched, "currency")
+    return pc.multiply(amount, pa.array(scale)), pc.if_else(pc.equal(currency, ""), None, currency)
+
+
+def company_table(records) -> "pa.Table":
+    """Typed table of company records (see the module docstring for the columns)."""
+    _require_pyarrow()
+    raw = {name: _strings(values) for name, values in _columns(records, COMPANY_FIELDS).items()}
+    columns = {}
+    for name in COMPANY_FIELDS:
+        array = raw[name]
+        if name in COUNT_FIELDS:
+            array = _ints(array)
+        elif name == "founded":
+            array = pc.cast(_ints(array), pa.int32())
+        elif name == "last_funding_round":
+            array = _timestamps(array)
+        columns[name] = array
+        if name == "company_size_approx":
+            columns["company_size_min"] = _ints(array, _SIZE, "min")
+            columns["company_size_max"] = _ints(array, _SIZE, "max")
+        elif name == "funding":
+            columns["funding_amount"], columns["funding_currency"] = _money(array)
+    return pa.table(columns)
+
+
+def profile_table(records) -> "pa.Table":
+    """Typed table of profile records."""
+    _require_pyarrow()
+    columns = {}
+    for name, values in _columns(records, PROFILE_FIELDS).items():
+        columns[name] = _strings(values)
+        if name == "connections":
+            columns["connections_min"] = _ints(columns[name])
+    return pa.table(columns)
+
+
+# ── Writing ──
+
+
+def write(table: "pa.Table", path: str, row_group_size: int = ROW_GROUP_SIZE, sort_by: str = None) -> None:
+    """Write ``table`` as Parquet (``.parquet``) or an Arrow IPC file (anything else)."""
+    _require_pyarrow()
+    if sort_by:
+        table = table.sort_by([(sort_by, "ascending")])
+    if path.endswith(".parquet"):
+        pq.write_table(
+            table, path, row_group_size=row_group_size, compression="zstd", write_statistics=True,
+        )
+    else:
+        feather.write_feather(table, path, compression="zstd", chunksize=row_group_size)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export scraped records to Parquet or Arrow")
+    parser.add_argument("kind", choices=("companies", "profiles"))
+    parser.add_argument("paths", nargs="+", help="crawl output: .json, .jsonl(.gz) or feed directories")
+    parser.add_argument("-o", "--output", required=True, help=".parquet, or .arrow/.feather")
+    parser.add_argument("--row-group-size", type=int, default=ROW_GROUP_SIZE)
+    parser.add_argument("--sort-by", help="column to cluster rows on (e.g. num_of_employees)")
+    args = parser.parse_args(argv)
+
+    build = company_table if args.kind == "companies" else profile_table
+    table = build(read_records(args.paths))
+    write(table, args.output, args.row_group_size, args.sort_by)
+    print(f"{table.num_rows} {args.kind} written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,15 +4,36 @@ LinkedIn Scraping API
 FastAPI service exposing company and profile scrapers.
 """
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from api.routes import company, profile
+from api import page_class, scraper_runner, settings
+from api.memory import PeakMemoryMiddleware, profiler
+from api.responses import CompressionMiddleware
+from api.routes import assets, batch, company, debug, profile, search, snapshots
+from api.prefetch import prefetcher
+from api.scheduler import scheduler
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    profiler.start()
+    prefetcher.start()
+    yield
+    await prefetcher.stop()
+    await scraper_runner.backend.close()
+    if scraper_runner.asset_fetcher is not None:
+        scraper_runner.asset_fetcher.close()
+    profiler.stop()
+
 
 app = FastAPI(
     title="LinkedIn Scraping API",
     description="Search for company and profile data from LinkedIn",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -22,9 +43,17 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(CompressionMiddleware, minimum_size=settings.COMPRESSION_MIN_SIZE)
+if profiler.samples_requests:
+    app.add_middleware(PeakMemoryMiddleware, profiler=profiler)
 
 app.include_router(company.router, prefix="/company", tags=["company"])
+app.include_router(search.router, prefix="/company", tags=["search"])
+app.include_router(snapshots.router, prefix="/company", tags=["snapshots"])
 app.include_router(profile.router, prefix="/profile", tags=["profile"])
+app.include_router(batch.router, prefix="/batch", tags=["batch"])
+app.include_router(assets.router, prefix="/assets", tags=["assets"])
+app.include_router(debug.router, prefix="/debug", tags=["debug"])
 
 
 @app.get("/")
@@ -35,6 +64,14 @@ def root():
         "endpoints": {
             "company": "POST /company - Search multiple companies",
             "profile": "POST /profile - Search multiple profiles",
+            "batch": "POST /batch - Search companies and profiles together",
+            "resolve": "GET /company/resolve?name=... - Company handles for a name",
+            "search": "POST /company/search - Filter and sort already-scraped companies",
+            "history": "GET /company/history/{handle} - Follower/employee counts over time",
+            "movers": "GET /company/movers - Companies that grew the most in a window",
+            "assets": "GET /assets/{key} - Stored logo or profile photo (ASSET_DIR)",
+            "memory": "GET /debug/memory - Top allocators and live parser objects (DEBUG_MEMORY_TOKEN)",
+            "scheduler": "GET /scheduler - Queue waits per host and priority class, page labels per host, refresh-ahead",
         },
     }
 
@@ -42,3 +79,13 @@ def root():
 @app.get("/health")
 def health():
     return {"status": "ok"}
+
+
+@app.get("/scheduler")
+async def scheduler_stats():
+    """Queue state per host and class, fetched pages per host and label, refresh-ahead state."""
+    return {
+        "hosts": scheduler.stats(),
+        "pages": page_class.counts.snapshot(),
+        "prefetch": await prefetcher.stats(),
+    }
@@ -0,0 +1,242 @@
+"""
+Memory profiling for long-running API workers - GET /debug/memory.
+
+Off unless ``DEBUG_MEMORY_TOKEN`` is set: nothing is traced, no middleware is
+installed and the endpoint answers 404. With a token set, the worker starts
+``tracemalloc`` (``MEMORY_TRACE_FRAMES`` frames per allocation; 0 leaves it
+off) and the endpoint, called with the token in ``X-Debug-Token``, reports:
+
+- the lines and modules holding the most traced memory, and the lines that
+  grew the most since the baseline (taken at startup or with ``reset``);
+  large strings such as ``resp.text`` are not tracked by ``gc`` and only
+  show up here, at the line that made them;
+- live objects of the parser types in ``WATCHED_TYPES`` (``Selector``, lxml
+  trees and elements, responses, items);
+- the peak traced memory of a ``MEMORY_SAMPLE_RATE`` share of requests,
+  per route. One request is measured at a time, and its peak includes
+  whatever other requests allocated meanwhile, so it is an upper bound.
+"""
+
+import gc
+import linecache
+import os
+import random
+import secrets
+import sys
+import time
+import tracemalloc
+from collections import Counter, deque
+
+from api import settings
+
+# Live instances counted by the report (module.qualname of the exact type)
+WATCHED_TYPES = (
+    "parsel.selector.Selector",
+    "parsel.selector.SelectorList",
+    "lxml.html.HtmlElement",
+    "lxml.etree._Element",
+    "lxml.etree._ElementTree",
+    "requests.models.Response",
+    "scraper_common.items.CompanyItem",
+    "scraper_common.items.ProfileItem",
+)
+
+# Allocations made by tracemalloc, the import system and the report's own
+# source lookups are not ours
+_IGNORED = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+    tracemalloc.Filter(False, linecache.__file__),
+)
+
+
+class MemoryProfiler:
+    """Traces allocations, samples per-request peaks and builds the /debug/memory report."""
+
+    def __init__(
+        self,
+        token: str = settings.DEBUG_MEMORY_TOKEN,
+        frames: int = settings.MEMORY_TRACE_FRAMES,
+        sample_rate: float = settings.MEMORY_SAMPLE_RATE,
+        recent: int = 50,
+    ):
+        self.token = token
+        self.frames = frames
+        self.sample_rate = sample_rate
+        self._baseline = None
+        self._started = False
+        self._sampling = False
+        # route -> [requests sampled, total peak, largest peak]
+        self._routes: dict[str, list] = {}
+        self._recent = deque(maxlen=recent)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.token)
+
+    @property
+    def tracing(self) -> bool:
+        return self.enabled and self.frames > 0
+
+    @property
+    def samples_requests(self) -> bool:
+        return self.tracing and self.sample_rate > 0
+
+    def authorized(self, token: str | None) -> bool:
+        return self.enabled and token is not None and secrets.compare_digest(token, self.token)
+
+    def start(self) -> None:
+        if not self.tracing:
+            return
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._started = True
+        self._baseline = self._snapshot()
+
+    def stop(self) -> None:
+        if self._started:
+            tracemalloc.stop()
+            self._started = False
+        self._baseline = None
+
+    # Per-request peaks
+
+    def begin_sample(self) -> int | None:
+        """Start measuring a request when it is picked; returns the traced memory at its start."""
+        if self._sampling or not tracemalloc.is_tracing() or random.random() >= self.sample_rate:
+            return None
+        self._sampling = True
+        tracemalloc.reset_peak()
+        return tracemalloc.get_traced_memory()[0]
+
+    def end_sample(self, route: str, start: int, elapsed: float) -> None:
+        peak = max(0, tracemalloc.get_traced_memory()[1] - start)
+        self._sampling = False
+        entry = self._routes.setdefault(route, [0, 0, 0])
+        entry[0] += 1
+        entry[1] += peak
+        entry[2] = max(entry[2], peak)
+        self._recent.append({"route": route, "peak": peak, "seconds": round(elapsed, 3), "at": time.time()})
+
+    # Report
+
+    def report(self, limit: int = 20, reset: bool = False) -> dict:
+        """Top allocators, growth since the baseline, watched objects and request peaks."""
+        report = {
+            "tracing": tracemalloc.is_tracing(),
+            "frames": tracemalloc.get_traceback_limit() if tracemalloc.is_tracing() else 0,
+            "rss": _rss(),
+        }
+        if tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            snapshot = self._snapshot()
+            modules = _module_names()
+            report["traced"] = {"current": current, "peak": peak}
+            report["top_lines"] = [
+                _line(stat.traceback[0], modules, size=stat.size, count=stat.count)
+                for stat in snapshot.statistics("lineno")[:limit]
+            ]
+            report["top_modules"] = [
+                {"module": _module(stat.traceback[0].filename, modules), "size": stat.size, "count": stat.count}
+                for stat in snapshot.statistics("filename")[:limit]
+            ]
+            if self._baseline is not None:
+                report["growth"] = [
+                    _line(stat.traceback[0], modules, size_diff=stat.size_diff, count_diff=stat.count_diff)
+                    for stat in snapshot.compare_to(self._baseline, "lineno")[:limit]
+                    if stat.size_diff > 0
+                ]
+            if reset:
+                self._baseline = snapshot
+        report["objects"] = live_objects()
+        report["gc"] = {"counts": gc.get_count(), "garbage": len(gc.garbage)}
+        report["requests"] = {
+            "sample_rate": self.sample_rate if self.samples_requests else 0,
+            "routes": {
+                route: {"sampled": count, "mean_peak": total // count, "max_peak": largest}
+                for route, (count, total, largest) in sorted(self._routes.items(), key=lambda item: -item[1][2])
+            },
+            "recent": list(self._recent),
+        }
+        return report
+
+    @staticmethod
+    def _snapshot():
+        return tracemalloc.take_snapshot().filter_traces(_IGNORED)
+
+
+def live_objects() -> dict[str, int]:
+    """Live instances of each type in ``WATCHED_TYPES``."""
+    counts = dict.fromkeys(WATCHED_TYPES, 0)
+    for kind, count in Counter(map(type, gc.get_objects())).items():
+        name = f"{kind.__module__}.{kind.__qualname__}"
+        if name in counts:
+            counts[name] = count
+    return counts
+
+
+def _rss() -> int | None:
+    """Resident set size in bytes (Linux only)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _module_names() -> dict[str, str]:
+    names = {}
+    for name, module in list(sys.modules.items()):
+        path = getattr(module, "__file__", None)
+        if path:
+            names[path] = name
+    return names
+
+
+def _module(filename: str, modules: dict[str, str]) -> str:
+    return modules.get(filename, filename)
+
+
+def _line(frame, modules: dict[str, str], **sizes) -> dict:
+    return {
+        "module": _module(frame.filename, modules),
+        "line": frame.lineno,
+        "code": linecache.getline(frame.filename, frame.lineno).strip(),
+        **sizes,
+    }
+
+
+def _route(scope) -> str:
+    """The matched route's template, so /company/history/{handle} is one entry."""
+    path, route = scope["path"], scope.get("route")
+    if route is None or not hasattr(route, "path_format"):
+        return path
+    # The route knows its path below the router prefix only; the prefix is
+    # what is left of the request path once the rendered route is removed
+    rendered = route.path_format.format(**scope.get("path_params", {}))
+    prefix = path[: len(path) - len(rendered)] if rendered and path.endswith(rendered) else path
+    return prefix + route.path_format if rendered else path
+
+
+class PeakMemoryMiddleware:
+    """ASGI middleware measuring the peak traced memory of sampled requests."""
+
+    def __init__(self, app, profiler: MemoryProfiler):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        start = self.profiler.begin_sample() if scope["type"] == "http" else None
+        if start is None:
+            await self.app(scope, receive, send)
+            return
+        began = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.profiler.end_sample(_route(scope), start, time.perf_counter() - began)
+
+
+profiler = MemoryProfiler()
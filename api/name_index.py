@@ -0,0 +1,358 @@
+"""
+Company name -> handle index built from the directory crawl output.
+
+``linkedin_directory_scraper`` collects ``{company name: company URL}``
+pairs. This module turns them into a read-only index directory of ``.npy``
+files that is opened with ``mmap_mode="r"``, so several API workers share
+one copy in the page cache and opening it costs nothing:
+
+``keys`` / ``key_offsets``
+    Normalized names (lower-cased, accents, punctuation and legal suffixes
+    such as "Inc." removed) as one UTF-8 blob, sorted; row ``i`` is
+    ``keys[key_offsets[i]:key_offsets[i + 1]]``.
+``names``, ``handles`` (and their offsets)
+    Display name and company handle of each row.
+``delete_hashes`` / ``delete_rows``
+    CRC32 of every key with one character deleted (and of the key itself),
+    sorted, with the row it came from.
+``handle_hashes`` / ``handle_rows``
+    CRC32 of every handle, sorted, with its row (``has_handle``).
+
+Lookups:
+
+exact
+    Binary search over the sorted keys. Every 64th key is kept in memory, so
+    ``bisect`` narrows the search to 64 rows before touching the map.
+prefix
+    The range of keys starting with the query; the shortest ones first.
+fuzzy
+    Keys within one edit (insertion, deletion, substitution or swap of two
+    neighbours) of the query: two strings at that distance share a
+    one-deletion variant (symmetric delete), so the query's variants are
+    looked up in ``delete_hashes`` and the candidates checked.
+
+    python -m api.name_index build directory_data.json -o name_index
+    python -m api.name_index lookup name_index "Open AI"
+"""
+
+import argparse
+import bisect
+import json
+import os
+import re
+import unicodedata
+import zlib
+from dataclasses import dataclass
+
+import numpy as np
+
+from api import settings
+
+_SAMPLE = 64
+_ARRAYS = (
+    "keys", "key_offsets", "names", "name_offsets", "handles", "handle_offsets",
+    "delete_hashes", "delete_rows",
+)
+# Not in indexes built before handle lookups existed
+_OPTIONAL_ARRAYS = ("handle_hashes", "handle_rows")
+META_NAME = "meta.json"
+
+# Trailing words dropped from names before indexing ("OpenAI, Inc." -> "openai").
+LEGAL_SUFFIXES = frozenset({
+    "inc", "incorporated", "llc", "llp", "ltd", "limited", "corp", "corporation", "co",
+    "company", "plc", "gmbh", "ag", "sa", "sas", "srl", "bv", "nv", "pty", "pvt", "oy", "ab",
+})
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+
+def normalize(name: str) -> str:
+    """Comparison key of a company name: "The Boeing Company" -> "boeing"."""
+    text = unicodedata.normalize("NFKD", name)
+    text = "".join(c for c in text if not unicodedata.combining(c)).lower()
+    text = text.replace("&", " and ")
+    words = _NON_WORD.sub(" ", text).split()
+    core = list(words)
+    while len(core) > 1 and core[-1] in LEGAL_SUFFIXES:
+        core.pop()
+    if len(core) > 1 and core[0] == "the":
+        core.pop(0)
+    return " ".join(core)
+
+
+def url_handle(url: str) -> str | None:
+    """Handle of a company URL from the directory ("https://.../company/openai?trk=x" -> "openai")."""
+    if "/company/" not in url:
+        return None
+    handle = url.split("/company/", 1)[1].split("?")[0].split("#")[0].strip("/").split("/")[0]
+    return handle.lower() or None
+
+
+def _deletes(key: str) -> set[str]:
+    return {key} | {key[:i] + key[i + 1:] for i in range(len(key))}
+
+
+def within_one_edit(a: str, b: str) -> bool:
+    """Optimal string alignment distance of a and b is at most 1."""
+    if a == b:
+        return True
+    la, lb = len(a), len(b)
+    if abs(la - lb) > 1:
+        return False
+    i = 0
+    while i < min(la, lb) and a[i] == b[i]:
+        i += 1
+    if la == lb:
+        return a[i + 1:] == b[i + 1:] or (
+            a[i + 1:i + 2] == b[i:i + 1] and a[i:i + 1] == b[i + 1:i + 2] and a[i + 2:] == b[i + 2:]
+        )
+    return a[i + 1:] == b[i:] if la > lb else a[i:] == b[i + 1:]
+
+
+@dataclass
+class Match:
+    name: str
+    handle: str
+    match: str  # "exact", "prefix" or "fuzzy"
+
+    def to_dict(self) -> dict:
+        return {"name": self.name, "handle": self.handle, "match": self.match}
+
+
+# ── Building ──
+
+def read_directory(paths) -> dict[str, str]:
+    """{name: handle} from directory crawl output (JSON array or JSON lines of {name: url})."""
+    pairs = {}
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            if path.endswith(".json"):
+                records = json.load(f)
+            else:
+                records = (json.loads(line) for line in f if line.strip())
+            for record in records:
+                for name, url in record.items():
+                    handle = url_handle(url) if isinstance(url, str) else None
+                    if name and handle:
+                        pairs[name.strip()] = handle
+    return pairs
+
+
+def _blob(strings: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    encoded = [s.encode() for s in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.uint32)
+    np.cumsum([len(e) for e in encoded], out=offsets[1:])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+
+def build(pairs: dict[str, str], directory: str) -> int:
+    """Write the index for ``{name: handle}`` to ``directory``. Returns the number of rows."""
+    rows = sorted(
+        (key.encode(), name, handle)
+        for name, handle in pairs.items()
+        if (key := normalize(name))
+    )
+    keys = [r[0].decode() for r in rows]
+    hashes, delete_rows = [], []
+    for row, key in enumerate(keys):
+        for variant in _deletes(key):
+            hashes.append(zlib.crc32(variant.encode()))
+            delete_rows.append(row)
+    hashes = np.array(hashes, dtype=np.uint32)
+    order = np.argsort(hashes, kind="stable")
+    handle_hashes = np.array([zlib.crc32(r[2].encode()) for r in rows], dtype=np.uint32)
+    handle_order = np.argsort(handle_hashes, kind="stable")
+
+    arrays = {}
+    arrays["keys"], arrays["key_offsets"] = _blob(keys)
+    arrays["names"], arrays["name_offsets"] = _blob([r[1] for r in rows])
+    arrays["handles"], arrays["handle_offsets"] = _blob([r[2] for r in rows])
+    arrays["delete_hashes"] = hashes[order]
+    arrays["delete_rows"] = np.array(delete_rows, dtype=np.uint32)[order]
+    arrays["handle_hashes"] = handle_hashes[handle_order]
+    arrays["handle_rows"] = handle_order.astype(np.uint32)
+
+    os.makedirs(directory, exist_ok=True)
+    for name, array in arrays.items():
+        tmp = os.path.join(directory, f"{name}.npy.tmp")
+        with open(tmp, "wb") as f:
+            np.save(f, array)
+        os.replace(tmp, os.path.join(directory, f"{name}.npy"))
+    # Written last: readers reopen the index when it changes
+    tmp = os.path.join(directory, META_NAME + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"rows": len(rows), "variants": len(hashes)}, f)
+    os.replace(tmp, os.path.join(directory, META_NAME))
+    return len(rows)
+
+
+# ── Lookups ──
+
+class NameIndex:
+    def __init__(self, directory: str):
+        self.directory = directory
+        a = {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r") for name in _ARRAYS}
+        self._keys, self._key_offsets = a["keys"], a["key_offsets"]
+        self._names, self._name_offsets = a["names"], a["name_offsets"]
+        self._handles, self._handle_offsets = a["handles"], a["handle_offsets"]
+        self._delete_hashes, self._delete_rows = a["delete_hashes"], a["delete_rows"]
+        a.update(
+            (name, np.load(path, mmap_mode="r"))
+            for name in _OPTIONAL_ARRAYS
+            if os.path.exists(path := os.path.join(directory, f"{name}.npy"))
+        )
+        self._handle_hashes, self._handle_rows = a.get("handle_hashes"), a.get("handle_rows")
+        # Plain buffer views: indexing them is much cheaper than numpy scalar indexing
+        self._key_view, self._offsets = memoryview(self._keys), memoryview(self._key_offsets)
+        self._sample = [self._key(i) for i in range(0, len(self), _SAMPLE)]
+
+    def __len__(self) -> int:
+        return len(self._key_offsets) - 1
+
+    def _key(self, row: int) -> bytes:
+        return self._key_view[self._offsets[row]:self._offsets[row + 1]].tobytes()
+
+    def _match(self, row: int, kind: str) -> Match:
+        no, ho = self._name_offsets, self._handle_offsets
+        return Match(
+            name=self._names[no[row]:no[row + 1]].tobytes().decode(),
+            handle=self._handles[ho[row]:ho[row + 1]].tobytes().decode(),
+            match=kind,
+        )
+
+    def _bisect(self, key: bytes) -> int:
+        """First row whose key is >= ``key``."""
+        block = max(0, bisect.bisect_left(self._sample, key) - 1)
+        lo, hi = block * _SAMPLE, min(len(self), (block + 1) * _SAMPLE)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _rows_equal(self, key: bytes) -> range:
+        start = row = self._bisect(key)
+        while row < len(self) and self._key(row) == key:
+            row += 1
+        return range(start, row)
+
+    def has_handle(self, handle: str) -> bool:
+        """Whether ``handle`` is the handle of an indexed company (False for an
+        index built without handle lookups)."""
+        if self._handle_hashes is None:
+            return False
+        handle = handle.lower()
+        crc = zlib.crc32(handle.encode())
+        start = np.searchsorted(self._handle_hashes, crc, "left")
+        end = np.searchsorted(self._handle_hashes, crc, "right")
+        ho = self._handle_offsets
+        return any(
+            self._handles[ho[row]:ho[row + 1]].tobytes().decode() == handle
+            for row in map(int, self._handle_rows[start:end])
+        )
+
+    def exact(self, name: str) -> list[Match]:
+        key = normalize(name).encode()
+        return [self._match(row, "exact") for row in self._rows_equal(key)] if key else []
+
+    def prefix(self, name: str, limit: int = 10) -> list[Match]:
+        """Names starting with ``name``, shortest first."""
+        key = normalize(name).encode()
+        if not key:
+            return []
+        lo, hi = self._bisect(key), self._bisect(key + b"\xff")
+        lengths = np.diff(self._key_offsets[lo:hi + 1])
+        if len(lengths) > limit:
+            top = np.argpartition(lengths, limit - 1)[:limit]
+            rows = lo + top[np.argsort(lengths[top], kind="stable")]
+        else:
+            rows = lo + np.argsort(lengths, kind="stable")
+        return [self._match(int(row), "prefix") for row in rows]
+
+    def fuzzy(self, name: str, limit: int = 10) -> list[Match]:
+        """Names one edit away from ``name`` (not counting exact matches)."""
+        key = normalize(name)
+        if len(key) < 3:
+            return []
+        hashes = np.array([zlib.crc32(v.encode()) for v in _deletes(key)], dtype=np.uint32)
+        starts = np.searchsorted(self._delete_hashes, hashes, "left")
+        ends = np.searchsorted(self._delete_hashes, hashes, "right")
+        rows = sorted({int(r) for s, e in zip(starts, ends) for r in self._delete_rows[s:e]})
+        matches = []
+        for row in rows:
+            candidate = self._key(row).decode()
+            if candidate != key and within_one_edit(key, candidate):
+                matches.append(self._match(row, "fuzzy"))
+                if len(matches) == limit:
+                    break
+        return matches
+
+    def lookup(self, name: str, limit: int = 10) -> list[Match]:
+        """Exact matches, then prefix and fuzzy ones, up to ``limit`` distinct handles."""
+        seen, out = set(), []
+        for matches in (self.exact(name), self.prefix(name, limit + 1), self.fuzzy(name, limit)):
+            for m in matches:
+                if m.handle not in seen and len(out) < limit:
+                    seen.add(m.handle)
+                    out.append(m)
+        return out
+
+    def resolve(self, name: str) -> str | None:
+        """Handle for a free-text name: the exact match, else the only fuzzy one."""
+        exact = {m.handle for m in self.exact(name)}
+        if len(exact) == 1:
+            return exact.pop()
+        if exact:
+            return None  # ambiguous
+        fuzzy = {m.handle for m in self.fuzzy(name, limit=2)}
+        return fuzzy.pop() if len(fuzzy) == 1 else None
+
+
+class _Reloading:
+    """The index in ``directory``, reopened when it is rebuilt; None until it exists."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._stamp = None
+        self._index: NameIndex | None = None
+
+    def get(self) -> NameIndex | None:
+        try:
+            stamp = os.stat(os.path.join(self.directory, META_NAME)).st_mtime_ns
+        except FileNotFoundError:
+            return None
+        if stamp != self._stamp:
+            self._index, self._stamp = NameIndex(self.directory), stamp
+        return self._index
+
+
+names = _Reloading(settings.NAME_INDEX_PATH) if settings.NAME_INDEX_PATH else None
+
+
+def current() -> NameIndex | None:
+    return names.get() if names is not None else None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or query the company name index")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build_cmd = sub.add_parser("build", help="index directory crawl output")
+    build_cmd.add_argument("paths", nargs="+", help="linkedin_directory_scraper output (.json or .jsonl)")
+    build_cmd.add_argument("-o", "--output", required=True, help="index directory")
+    lookup = sub.add_parser("lookup", help="look a name up")
+    lookup.add_argument("directory")
+    lookup.add_argument("name")
+    lookup.add_argument("-n", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        rows = build(read_directory(args.paths), args.output)
+        print(f"{rows} names indexed in {args.output}")
+    else:
+        matches = NameIndex(args.directory).lookup(args.name, args.n)
+        print(json.dumps([m.to_dict() for m in matches], indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Page labels for the API's fetcher.
+
+``_get`` (through ``check``) labels every response with
+``scraper_common.page_class.classify`` (ok, authwall, challenge, not-found,
+rate-limited or error) and raises ``UnusablePage`` for anything but ok, so
+nothing else is parsed. Rate-limited pages raise ``RateLimitedPage`` and 5xx
+``TransientStatus``; the scheduler retries both. Rate-limited and challenge
+pages also pause the host (``RetryPolicy.host_pause``). Labels are counted
+per host and shown by ``GET /scheduler``.
+"""
+
+import threading
+from collections import Counter
+from urllib.parse import urlsplit
+
+import requests
+
+from api.retry import TransientStatus, raise_for_transient
+from scraper_common.page_class import ERROR, OK, RATE_LIMITED, SNIFF_BYTES, classify
+
+
+def classify_response(resp: requests.Response) -> str:
+    return classify(
+        resp.status_code, resp.url, resp.content[:SNIFF_BYTES],
+        resp.headers.get("Location", ""), resp.headers.get("Set-Cookie", ""),
+    )
+
+
+class UnusablePage(requests.HTTPError):
+    """A response that is not the page asked for; ``label`` says what it is."""
+
+    def __init__(self, label: str, url: str, response: requests.Response = None):
+        super().__init__(f"{label} page from {url}", response=response)
+        self.label = label
+
+
+class RateLimitedPage(UnusablePage, TransientStatus):
+    """Rate-limited: retried like other transient statuses."""
+
+
+class LabelCounts:
+    """Responses per host and label (thread-safe: fetches run in a pool)."""
+
+    def __init__(self):
+        self._counts: dict[str, Counter] = {}
+        self._lock = threading.Lock()
+
+    def record(self, url: str, label: str) -> None:
+        host = urlsplit(url).hostname or ""
+        with self._lock:
+            self._counts.setdefault(host, Counter())[label] += 1
+
+    def snapshot(self) -> dict[str, dict[str, int]]:
+        with self._lock:
+            return {host: dict(counts) for host, counts in self._counts.items()}
+
+
+counts = LabelCounts()
+
+
+def check(resp: requests.Response) -> str:
+    """Classify and count ``resp``; raise for pages that must not be parsed."""
+    label = classify_response(resp)
+    counts.record(resp.url, label)
+    if label == ERROR:
+        raise_for_transient(resp)  # 5xx: retried
+    if label == RATE_LIMITED:
+        raise RateLimitedPage(label, resp.url, response=resp)
+    if label != OK:
+        raise UnusablePage(label, resp.url, response=resp)
+    return label
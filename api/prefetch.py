@@ -0,0 +1,205 @@
+"""
+Refresh-ahead for the most looked-up companies and profiles.
+
+A few entities get most lookups, and the caller who asks right after their
+cache entry expires pays a full fetch. ``Prefetcher`` counts lookups per
+entity (its cache key prefix, e.g. ``company:<url>``) in a count-min sketch
+and keeps the ``PREFETCH_TOP_N`` most counted as candidates. Every
+``PREFETCH_INTERVAL`` seconds it re-fetches the candidates looked up at
+least ``PREFETCH_MIN_HITS`` times whose full record expires within
+``PREFETCH_AHEAD`` seconds (or is not cached), so the next lookup is served
+warm.
+
+Refreshes run in the ``background`` priority class and start at most at
+``PREFETCH_RATE_SHARE`` of each host's rate (``1 / *_MIN_INTERVAL``), paced
+by a token bucket in ``api.shared_state``, so with several workers the
+share holds for all of them together. A refresh claims its key like a
+single-flight fetch, and a record another worker refreshed first is no
+longer due, so workers do not refresh the same entity twice.
+
+Counts are halved every ``SKETCH_WIDTH * 10`` lookups, so entities that
+stop being looked up drop out of the top.
+"""
+
+import asyncio
+import hashlib
+import heapq
+import logging
+
+import numpy as np
+
+from api import priorities, settings
+from api.scheduler import scheduler
+from api.shared_state import state
+
+logger = logging.getLogger(__name__)
+
+SKETCH_WIDTH = 4096
+SKETCH_DEPTH = 4
+
+
+class CountMinSketch:
+    """Approximate counts in ``depth`` rows of ``width`` counters (never under-counts)."""
+
+    def __init__(self, width: int = SKETCH_WIDTH, depth: int = SKETCH_DEPTH):
+        self.width = width
+        self.depth = depth
+        self.table = np.zeros((depth, width), dtype=np.uint32)
+        self._rows = np.arange(depth)
+        self.added = 0
+
+    def _columns(self, key: str) -> np.ndarray:
+        digest = hashlib.blake2b(key.encode(), digest_size=4 * self.depth).digest()
+        return np.frombuffer(digest, dtype=np.uint32) % self.width
+
+    def add(self, key: str) -> int:
+        """Count one occurrence of ``key``; return its new estimate."""
+        columns = self._columns(key)
+        # Conservative update: only the counters at the minimum grow
+        cells = self.table[self._rows, columns]
+        estimate = int(cells.min()) + 1
+        self.table[self._rows, columns] = np.maximum(cells, estimate)
+        self.added += 1
+        return estimate
+
+    def estimate(self, key: str) -> int:
+        return int(self.table[self._rows, self._columns(key)].min())
+
+    def halve(self) -> None:
+        self.table >>= 1
+        self.added = 0
+
+
+class Prefetcher:
+    """Tracks lookups and refreshes the hottest cached records before they expire."""
+
+    def __init__(
+        self,
+        top_n: int = settings.PREFETCH_TOP_N,
+        ahead: float = settings.PREFETCH_AHEAD,
+        interval: float = settings.PREFETCH_INTERVAL,
+        rate_share: float = settings.PREFETCH_RATE_SHARE,
+        min_hits: int = settings.PREFETCH_MIN_HITS,
+    ):
+        self.top_n = top_n
+        self.ahead = ahead
+        self.interval = interval
+        self.rate_share = rate_share
+        self.min_hits = min_hits
+        self.sketch = CountMinSketch()
+        # prefix -> [estimate, url fetched, refresh coroutine function]
+        self._top: dict[str, list] = {}
+        self._running: set[str] = set()
+        self._tasks: set[asyncio.Task] = set()
+        self._loop_task = None
+        self.refreshed = 0
+        self.failed = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.top_n > 0 and settings.CACHE_TTL > 0
+
+    def record(self, prefix: str, url: str, refresh) -> None:
+        """Count a lookup of ``prefix``; ``refresh()`` re-fetches it into the cache."""
+        if not self.enabled:
+            return
+        estimate = self.sketch.add(prefix)
+        if self.sketch.added >= self.sketch.width * 10:
+            self.sketch.halve()
+            for entry in self._top.values():
+                entry[0] >>= 1
+        entry = self._top.get(prefix)
+        if entry is not None:
+            entry[0] = estimate
+            return
+        if len(self._top) >= self.top_n:
+            coldest = min(self._top, key=lambda key: self._top[key][0])
+            if self._top[coldest][0] >= estimate:
+                return
+            del self._top[coldest]
+        self._top[prefix] = [estimate, url, refresh]
+
+    def candidates(self) -> list[tuple[str, str, object]]:
+        """Hot entities looked up at least ``min_hits`` times and not being refreshed, hottest first."""
+        hot = heapq.nlargest(self.top_n, self._top.items(), key=lambda item: item[1][0])
+        return [
+            (prefix, url, refresh) for prefix, (count, url, refresh) in hot
+            if count >= self.min_hits and prefix not in self._running
+        ]
+
+    async def due(self, candidates) -> list[tuple[str, str, object]]:
+        """The ``candidates`` whose full record is missing or expires within ``ahead``."""
+        found = []
+        for prefix, url, refresh in candidates:
+            left = await state.aexpires_in(f"{prefix}|*")
+            if left is None or left <= self.ahead:
+                found.append((prefix, url, refresh))
+        return found
+
+    async def refresh_due(self) -> int:
+        """Start refreshing every due candidate within the rate share; returns how many."""
+        started = 0
+        for prefix, url, refresh in await self.due(self.candidates()):
+            queue = scheduler.queue_for(url)
+            if queue.min_interval > 0:
+                rate = self.rate_share / queue.min_interval
+                wait = await state.aacquire_rate(f"prefetch:{queue.host}", rate, 1)
+                if wait > 0:
+                    await asyncio.sleep(wait)
+            self._running.add(prefix)
+            task = asyncio.create_task(self._refresh(prefix, refresh))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+            started += 1
+        return started
+
+    async def _refresh(self, prefix: str, refresh) -> None:
+        try:
+            with priorities.scope("background"):
+                if await refresh():
+                    self.refreshed += 1
+        except Exception as e:
+            self.failed += 1
+            logger.info("Refresh of %s failed: %s", prefix, e)
+        finally:
+            self._running.discard(prefix)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.refresh_due()
+            except Exception:
+                logger.exception("Refresh-ahead round failed")
+
+    def start(self) -> None:
+        if self.enabled and self._loop_task is None:
+            self._loop_task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        tasks = [*self._tasks, *([self._loop_task] if self._loop_task else [])]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._loop_task = None
+
+    async def stats(self, n: int = 10) -> dict:
+        """Refresh counts and the ``n`` hottest entities with their estimated lookups."""
+        hot = heapq.nlargest(n, self._top.items(), key=lambda item: item[1][0])
+        return {
+            "enabled": self.enabled,
+            "refreshed": self.refreshed,
+            "failed": self.failed,
+            "running": len(self._running),
+            "hot": [
+                {"key": prefix, "lookups": count, "expires_in": _rounded(await state.aexpires_in(f"{prefix}|*"))}
+                for prefix, (count, _, _) in hot
+            ],
+        }
+
+
+def _rounded(seconds: float | None) -> float | None:
+    return None if seconds is None else round(seconds, 1)
+
+
+prefetcher = Prefetcher()
@@ -0,0 +1,58 @@
+"""
+Priority classes for outbound requests.
+
+Every fetch belongs to one class, kept in a context variable like the
+deadline, so it follows the API call into the tasks it spawns:
+
+``interactive``
+    Small API calls a person is waiting on (up to ``INTERACTIVE_MAX_ITEMS``
+    lookups).
+``batch``
+    Larger API calls.
+``background``
+    Work nobody is waiting on (refreshes, prefetching).
+
+The scheduler shares each host's rate budget between the classes that have
+requests waiting, in proportion to ``PRIORITY_WEIGHT_*``.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Literal
+
+from api import settings
+
+CLASSES = ("interactive", "batch", "background")
+Priority = Literal[CLASSES]
+
+WEIGHTS = {
+    "interactive": settings.PRIORITY_WEIGHT_INTERACTIVE,
+    "batch": settings.PRIORITY_WEIGHT_BATCH,
+    "background": settings.PRIORITY_WEIGHT_BACKGROUND,
+}
+
+_priority: ContextVar[str] = ContextVar("priority", default="interactive")
+
+
+def for_size(lookups: int) -> str:
+    """Default class of an API call making ``lookups`` lookups."""
+    return "interactive" if lookups <= settings.INTERACTIVE_MAX_ITEMS else "batch"
+
+
+@contextmanager
+def scope(priority: str | None):
+    """Run the block in class ``priority``; None keeps the enclosing class."""
+    if priority is None:
+        yield
+        return
+    if priority not in CLASSES:
+        raise ValueError(f"Unknown priority: {priority}")
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current() -> str:
+    return _priority.get()
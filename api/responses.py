@@ -0,0 +1,103 @@
+"""
+Response helpers: fast JSON rendering and negotiated compression.
+
+Routes return ``FastJSONResponse`` directly. FastAPI does not run
+``response_model`` validation on a returned Response, so scraped items are
+serialized once, straight from the dataclasses, with orjson when available.
+``CompressionMiddleware`` then compresses bodies above a size threshold with
+brotli or gzip, depending on the client's ``Accept-Encoding``. Images that
+are compressed already (the stored logos and photos) are sent as they are.
+"""
+
+import gzip
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import JSONResponse
+
+from api import settings
+from scraper_common.items import dumps
+
+try:
+    import brotli
+except ImportError:  # optional — gzip only
+    brotli = None
+
+# Compressed formats: compressing them again costs CPU and saves nothing
+_COMPRESSED_TYPES = ("image/jpeg", "image/png", "image/gif", "image/webp", "image/avif")
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+def _choose_encoding(accept_encoding: str) -> str | None:
+    offered = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        offered[name.strip()] = quality
+    if brotli is not None and offered.get("br", 0) > 0:
+        return "br"
+    if offered.get("gzip", 0) > 0:
+        return "gzip"
+    return None
+
+
+def _compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=settings.BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=settings.GZIP_LEVEL)
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing complete responses above ``minimum_size``."""
+
+    def __init__(self, app, minimum_size: int = 1024):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = _choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        chunks = []
+
+        async def send_compressed(message):
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or start_message is None:
+                await send(message)
+                return
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+
+            body = b"".join(chunks)
+            headers = MutableHeaders(raw=start_message["headers"])
+            if (
+                len(body) >= self.minimum_size
+                and "content-encoding" not in headers
+                and not headers.get("content-type", "").startswith(_COMPRESSED_TYPES)
+            ):
+                body = _compress(body, encoding)
+                headers["Content-Encoding"] = encoding
+                headers["Content-Length"] = str(len(body))
+                headers.add_vary_header("Accept-Encoding")
+            await send(start_message)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_compressed)
@@ -0,0 +1,70 @@
+"""
+Retry policy for outbound GETs.
+
+Only transient failures are retried: connection errors, timeouts, and 429 /
+5xx responses. LinkedIn's 999 (bot wall) and other 4xx are final — asking
+again only digs the hole deeper. Waits use exponential backoff with full
+jitter, so workers that failed together do not retry together, and a
+``Retry-After`` header is honoured when it asks for longer.
+
+Pages labelled rate-limited or challenge (``scraper_common.page_class``)
+also pause the whole host for the un-jittered backoff, since every request
+to it would only meet the same wall.
+"""
+
+import random
+from dataclasses import dataclass
+
+import requests
+
+TRANSIENT_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# Page labels after which the host is paused
+PAUSE_LABELS = frozenset({"rate-limited", "challenge"})
+
+TRANSIENT_ERRORS = (
+    requests.ConnectionError,
+    requests.Timeout,
+    requests.exceptions.ChunkedEncodingError,
+)
+
+
+class TransientStatus(requests.HTTPError):
+    """A response whose status says "try again later"."""
+
+
+def raise_for_transient(resp: requests.Response) -> None:
+    if resp.status_code in TRANSIENT_STATUSES:
+        raise TransientStatus(f"HTTP {resp.status_code} from {resp.url}", response=resp)
+
+
+@dataclass(frozen=True, slots=True)
+class RetryPolicy:
+    attempts: int = 3
+    backoff_base: float = 0.5
+    backoff_max: float = 8.0
+
+    def is_transient(self, exc: BaseException) -> bool:
+        return isinstance(exc, (TransientStatus, *TRANSIENT_ERRORS))
+
+    def backoff(self, attempt: int, exc: BaseException | None = None) -> float:
+        """Seconds to wait before retry number ``attempt`` (1-based)."""
+        wait = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)))
+        return max(wait, self._retry_after(exc))
+
+    def host_pause(self, attempt: int, exc: BaseException) -> float:
+        """Seconds the host should get no requests after ``exc`` (0 for most failures)."""
+        if getattr(exc, "label", None) not in PAUSE_LABELS:
+            return 0.0
+        wait = min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1))
+        return max(wait, self._retry_after(exc))
+
+    def _retry_after(self, exc: BaseException | None) -> float:
+        response = getattr(exc, "response", None)
+        if response is None:
+            return 0.0
+        try:
+            retry_after = float(response.headers.get("Retry-After", 0))
+        except ValueError:
+            retry_after = 0  # HTTP-date form: fall back to our own backoff
+        return min(retry_after, self.backoff_max)
@@ -0,0 +1,30 @@
+"""
+Stored logos and profile photos - GET /assets/{key}
+"""
+
+import os
+import re
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import FileResponse
+
+from api.scraper_runner import asset_fetcher
+
+router = APIRouter()
+
+# SHA-256 of the content plus the extension (scraper_common/assets.py)
+_KEY = re.compile(r"[0-9a-f]{64}(\.[a-z0-9]+)?")
+
+
+@router.get("/{key}")
+def get_asset(key: str):
+    """
+    An image stored by a lookup with `assets: true`. Keys are content hashes,
+    so a key's file never changes and can be cached forever.
+    """
+    if asset_fetcher is None:
+        raise HTTPException(status_code=404, detail="Asset store is not enabled (set ASSET_DIR)")
+    path = asset_fetcher.store.path(key) if _KEY.fullmatch(key) else None
+    if path is None or not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="No such asset")
+    return FileResponse(path, headers={"Cache-Control": "public, max-age=31536000, immutable"})
@@ -0,0 +1,92 @@
+"""
+Mixed company + profile search API - POST /batch
+"""
+
+from fastapi import APIRouter, Header, HTTPException
+from pydantic import BaseModel, Field, model_validator
+
+from api import deadlines, priorities
+from api.responses import FastJSONResponse
+from api.scraper_runner import run_batch_scraper
+
+router = APIRouter()
+
+
+class BatchRequest(BaseModel):
+    companies: list[str] = Field(
+        default_factory=list,
+        description="List of company handles or URLs (e.g. ['microsoft', 'openai'])",
+        max_length=50,
+    )
+    profiles: list[str] = Field(
+        default_factory=list,
+        description="List of profile usernames or URLs (e.g. ['satya-nadella'])",
+        max_length=50,
+    )
+    li_at: str | None = Field(
+        default=None,
+        description="LinkedIn session cookie (li_at) used for the profile lookups",
+    )
+    deadline_ms: int | None = Field(
+        default=None,
+        gt=0,
+        description=(
+            "Time budget in milliseconds (also accepted as the X-Deadline-Ms header). "
+            "Lookups unfinished by then are returned with status 'timeout' or 'skipped'."
+        ),
+    )
+    priority: priorities.Priority | None = Field(
+        default=None,
+        description=(
+            "Scheduling class: 'interactive', 'batch' or 'background'. Defaults to "
+            "'interactive' for small requests and 'batch' for larger ones."
+        ),
+    )
+    assets: bool = Field(
+        default=False,
+        description=(
+            "Store logos and profile photos in the asset store (ASSET_DIR) and return "
+            "their keys as 'company_logo_key' / 'profile_photo_key'."
+        ),
+    )
+
+    @model_validator(mode="after")
+    def _require_input(self):
+        if not self.companies and not self.profiles:
+            raise ValueError("Provide at least one company or profile")
+        return self
+
+
+class BatchResponse(BaseModel):
+    success: bool = True
+    count: int
+    companies: list[dict]
+    profiles: list[dict]
+
+
+@router.post("", response_model=BatchResponse, response_class=FastJSONResponse)
+async def search_batch(
+    request: BatchRequest, x_deadline_ms: int | None = Header(default=None, gt=0)
+):
+    """
+    Search companies and profiles in one call. Work against LinkedIn and
+    DuckDuckGo is scheduled on separate per-host queues, so the two kinds
+    interleave. Results are grouped by kind, in input order.
+    """
+    deadline = deadlines.from_budget(request.deadline_ms, x_deadline_ms)
+    try:
+        data = await run_batch_scraper(
+            request.companies,
+            request.profiles,
+            li_at=request.li_at,
+            deadline=deadline,
+            priority=request.priority,
+            assets=request.assets,
+        )
+        count = len(data["companies"]) + len(data["profiles"])
+        # Returned directly: items are serialized once, without re-validation
+        return FastJSONResponse({"success": True, "count": count, **data})
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -1,11 +1,14 @@
 """
-Company search API - POST /company
+Company search API - POST /company, GET /company/resolve
 """
 
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel, Field
+from fastapi import APIRouter, Header, HTTPException, Query
+from pydantic import BaseModel, Field, field_validator
 
+from api import deadlines, priorities, name_index
+from api.responses import FastJSONResponse
 from api.scraper_runner import run_company_scraper
+from scraper_common.items import COMPANY_FIELDS
 
 router = APIRouter()
 
@@ -13,10 +16,52 @@ router = APIRouter()
 class CompanyRequest(BaseModel):
     companies: list[str] = Field(
         ...,
-        description="List of company handles or URLs (e.g. ['microsoft', 'tutorflo', 'openai'])",
+        description=(
+            "List of company handles, URLs or names (e.g. ['microsoft', 'tutorflo', 'Open AI']). "
+            "Names are resolved with the name index (NAME_INDEX_PATH)."
+        ),
         min_length=1,
         max_length=50,
     )
+    fields: list[str] | None = Field(
+        default=None,
+        description=(
+            "Only extract and return these fields "
+            "(e.g. ['linkedin_followers_count', 'num_of_employees']). Defaults to all fields."
+        ),
+    )
+    deadline_ms: int | None = Field(
+        default=None,
+        gt=0,
+        description=(
+            "Time budget in milliseconds (also accepted as the X-Deadline-Ms header). "
+            "Lookups unfinished by then are returned with status 'timeout' or 'skipped'."
+        ),
+    )
+    priority: priorities.Priority | None = Field(
+        default=None,
+        description=(
+            "Scheduling class: 'interactive', 'batch' or 'background'. Defaults to "
+            "'interactive' for small requests and 'batch' for larger ones."
+        ),
+    )
+    assets: bool = Field(
+        default=False,
+        description=(
+            "Store each logo in the asset store (ASSET_DIR) and return its key "
+            "as 'company_logo_key' (GET /assets/{key} serves the file)."
+        ),
+    )
+
+    @field_validator("fields")
+    @classmethod
+    def _check_fields(cls, value):
+        if value is None:
+            return value
+        unknown = sorted(set(value) - set(COMPANY_FIELDS))
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+        return value
 
 
 class CompanyResponse(BaseModel):
@@ -25,16 +70,45 @@ class CompanyResponse(BaseModel):
     data: list[dict]
 
 
-@router.post("", response_model=CompanyResponse)
-async def search_companies(request: CompanyRequest):
+@router.post("", response_model=CompanyResponse, response_class=FastJSONResponse)
+async def search_companies(
+    request: CompanyRequest, x_deadline_ms: int | None = Header(default=None, gt=0)
+):
     """
     Search for multiple companies by handle or URL. Scrapes directly from LinkedIn.
     Examples: microsoft, tutorflo, openai, or full https://linkedin.com/company/... URLs.
     """
+    deadline = deadlines.from_budget(request.deadline_ms, x_deadline_ms)
     try:
-        data = await run_company_scraper(request.companies)
-        return CompanyResponse(success=True, count=len(data), data=data)
+        items = await run_company_scraper(
+            request.companies,
+            fields=request.fields,
+            deadline=deadline,
+            priority=request.priority,
+            assets=request.assets,
+        )
+        if request.fields is not None:
+            items = [item.to_dict(request.fields) for item in items]
+        # Returned directly: items are serialized once, without re-validation
+        return FastJSONResponse({"success": True, "count": len(items), "data": items})
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except RuntimeError as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/resolve", response_class=FastJSONResponse)
+def resolve_company(
+    name: str = Query(..., min_length=1, description="Company name, e.g. 'Open AI'"),
+    n: int = Query(default=10, ge=1, le=100),
+):
+    """
+    Company handles for a free-text name, from the directory crawl output (no
+    scraping): exact matches first, then names starting with it and names one
+    typo away.
+    """
+    names = name_index.current()
+    if names is None:
+        raise HTTPException(status_code=404, detail="Name index is not available (set NAME_INDEX_PATH)")
+    matches = [m.to_dict() for m in names.lookup(name, n)]
+    return FastJSONResponse({"success": True, "count": len(matches), "data": matches})
@@ -0,0 +1,27 @@
+"""
+Memory report for finding leaks in running workers - GET /debug/memory
+"""
+
+from fastapi import APIRouter, Header, HTTPException, Query
+
+from api.memory import profiler
+
+router = APIRouter()
+
+
+@router.get("/memory")
+def memory_report(
+    limit: int = Query(20, ge=1, le=200),
+    reset: bool = False,
+    x_debug_token: str | None = Header(None),
+):
+    """
+    Top allocating lines and modules, growth since the baseline, live parser
+    objects and sampled per-request peaks for this worker. `reset=true` makes
+    this report the new baseline. Needs the `X-Debug-Token` header.
+    """
+    if not profiler.enabled:
+        raise HTTPException(status_code=404, detail="Memory profiling is not enabled (set DEBUG_MEMORY_TOKEN)")
+    if not profiler.authorized(x_debug_token):
+        raise HTTPException(status_code=403, detail="Missing or wrong X-Debug-Token")
+    return profiler.report(limit, reset)
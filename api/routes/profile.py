@@ -2,10 +2,13 @@
 Profile search API - POST /profile
 """
 
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel, Field
+from fastapi import APIRouter, Header, HTTPException
+from pydantic import BaseModel, Field, field_validator
 
+from api import deadlines, priorities
+from api.responses import FastJSONResponse
 from api.scraper_runner import run_profile_scraper
+from scraper_common.items import PROFILE_FIELDS
 
 router = APIRouter()
 
@@ -25,6 +28,45 @@ class ProfileRequest(BaseModel):
             "Get it from browser DevTools > Application > Cookies > linkedin.com > li_at"
         ),
     )
+    fields: list[str] | None = Field(
+        default=None,
+        description=(
+            "Only extract and return these fields (e.g. ['name', 'headline']). "
+            "Defaults to all fields."
+        ),
+    )
+    deadline_ms: int | None = Field(
+        default=None,
+        gt=0,
+        description=(
+            "Time budget in milliseconds (also accepted as the X-Deadline-Ms header). "
+            "Lookups unfinished by then are returned with status 'timeout' or 'skipped'."
+        ),
+    )
+    priority: priorities.Priority | None = Field(
+        default=None,
+        description=(
+            "Scheduling class: 'interactive', 'batch' or 'background'. Defaults to "
+            "'interactive' for small requests and 'batch' for larger ones."
+        ),
+    )
+    assets: bool = Field(
+        default=False,
+        description=(
+            "Store each profile photo in the asset store (ASSET_DIR) and return its key "
+            "as 'profile_photo_key' (GET /assets/{key} serves the file)."
+        ),
+    )
+
+    @field_validator("fields")
+    @classmethod
+    def _check_fields(cls, value):
+        if value is None:
+            return value
+        unknown = sorted(set(value) - set(PROFILE_FIELDS))
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+        return value
 
 
 class ProfileResponse(BaseModel):
@@ -33,8 +75,10 @@ class ProfileResponse(BaseModel):
     data: list[dict]
 
 
-@router.post("", response_model=ProfileResponse)
-async def search_profiles(request: ProfileRequest):
+@router.post("", response_model=ProfileResponse, response_class=FastJSONResponse)
+async def search_profiles(
+    request: ProfileRequest, x_deadline_ms: int | None = Header(default=None, gt=0)
+):
     """
     Search for multiple LinkedIn profiles. Accepts usernames (e.g. satya-nadella)
     or full profile URLs.
@@ -42,9 +86,20 @@ async def search_profiles(request: ProfileRequest):
     For best results, provide your LinkedIn li_at cookie for authenticated access.
     Without it, the scraper falls back to search-engine results with limited data.
     """
+    deadline = deadlines.from_budget(request.deadline_ms, x_deadline_ms)
     try:
-        data = await run_profile_scraper(request.profiles, li_at=request.li_at)
-        return ProfileResponse(success=True, count=len(data), data=data)
+        items = await run_profile_scraper(
+            request.profiles,
+            li_at=request.li_at,
+            fields=request.fields,
+            deadline=deadline,
+            priority=request.priority,
+            assets=request.assets,
+        )
+        if request.fields is not None:
+            items = [item.to_dict(request.fields) for item in items]
+        # Returned directly: items are serialized once, without re-validation
+        return FastJSONResponse({"success": True, "count": len(items), "data": items})
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except RuntimeError as e:
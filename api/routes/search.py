@@ -0,0 +1,78 @@
+"""
+Company search API - POST /company/search
+
+Filters companies already scraped (see api/search_index.py) without any
+network call: the index is built from the output files in
+``SEARCH_INDEX_SOURCES`` and from every company the API scrapes.
+"""
+
+import time
+from typing import Literal
+
+from fastapi import APIRouter
+from pydantic import BaseModel, Field
+
+from api.responses import FastJSONResponse
+from api.search_index import index, source_paths
+
+router = APIRouter()
+
+
+class CompanySearchRequest(BaseModel):
+    industry: list[str] = Field(default_factory=list, description="e.g. ['Financial Services']")
+    headquarters: list[str] = Field(
+        default_factory=list, description="City, region or country (e.g. ['London'])"
+    )
+    type: list[str] = Field(default_factory=list, description="e.g. ['Privately Held']")
+    company_size: list[str] = Field(default_factory=list, description="e.g. ['51-200']")
+    specialties: list[str] = Field(
+        default_factory=list, description="Every word of each specialty must match (e.g. ['fintech'])"
+    )
+    min_followers: int | None = Field(default=None, ge=0)
+    max_followers: int | None = Field(default=None, ge=0)
+    min_employees: int | None = Field(default=None, ge=0)
+    max_employees: int | None = Field(default=None, ge=0)
+    sort: Literal["followers", "employees"] | None = None
+    order: Literal["desc", "asc"] = "desc"
+    limit: int = Field(default=20, ge=1, le=1000)
+
+
+class CompanySearchResponse(BaseModel):
+    success: bool = True
+    count: int
+    took_ms: float
+    data: list[dict]
+
+
+_SORT_FIELDS = {"followers": "linkedin_followers_count", "employees": "num_of_employees"}
+
+
+@router.post("/search", response_model=CompanySearchResponse, response_class=FastJSONResponse)
+def search_index(request: CompanySearchRequest):
+    """
+    Search scraped companies, e.g. fintech companies in London with 51-200
+    employees and more than 10k followers, sorted by followers. ``count`` is
+    the number of matches; ``data`` holds the first ``limit`` of them.
+    """
+    # A plain def: FastAPI runs it in a thread, so reading changed sources
+    # does not block the event loop
+    start = time.perf_counter()
+    index.refresh(source_paths())
+    count, items = index.search(
+        filters={
+            "industry": request.industry,
+            "headquarters": request.headquarters,
+            "type": request.type,
+            "company_size_approx": request.company_size,
+            "specialties": request.specialties,
+        },
+        ranges={
+            "linkedin_followers_count": (request.min_followers, request.max_followers),
+            "num_of_employees": (request.min_employees, request.max_employees),
+        },
+        sort=_SORT_FIELDS.get(request.sort),
+        descending=request.order == "desc",
+        limit=request.limit,
+    )
+    took_ms = round((time.perf_counter() - start) * 1000, 3)
+    return FastJSONResponse({"success": True, "count": count, "took_ms": took_ms, "data": items})
@@ -0,0 +1,50 @@
+"""
+Company growth API - GET /company/history/{handle}, GET /company/movers
+
+Served from the snapshot store (see scraper_common/snapshots.py), which
+records the counts of every company scraped while ``SNAPSHOT_DIR`` is set.
+"""
+
+import time
+from typing import Literal
+
+from fastapi import APIRouter, HTTPException, Query
+
+from api.responses import FastJSONResponse
+from api.scraper_runner import company_handle
+from api.snapshots import store
+from scraper_common.snapshots import METRICS
+
+router = APIRouter()
+
+Metric = Literal[METRICS]
+
+
+def _store():
+    if store is None:
+        raise HTTPException(status_code=404, detail="Snapshot store is not enabled (set SNAPSHOT_DIR)")
+    return store
+
+
+@router.get("/history/{handle}", response_class=FastJSONResponse)
+def company_history(
+    handle: str,
+    days: float | None = Query(default=None, gt=0, description="Only the last N days"),
+):
+    """Growth series of one company: one point per scrape, oldest first."""
+    since = None if days is None else int(time.time() - days * 86400)
+    series = _store().history(company_handle(handle), since=since)
+    return FastJSONResponse({"success": True, "count": len(series), "data": series})
+
+
+@router.get("/movers", response_class=FastJSONResponse)
+def company_movers(
+    metric: Metric = "linkedin_followers_count",
+    days: float = Query(default=30, gt=0, description="Window length in days"),
+    n: int = Query(default=10, ge=1, le=1000),
+    relative: bool = Query(default=False, description="Rank by percentage change"),
+    direction: Literal["up", "down"] = "up",
+):
+    """Companies whose metric grew (or shrank) the most within the window."""
+    movers = _store().movers(metric, days * 86400, n=n, relative=relative, direction=direction)
+    return FastJSONResponse({"success": True, "count": len(movers), "data": movers})
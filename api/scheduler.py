@@ -0,0 +1,335 @@
+"""
+Per-host request scheduler.
+
+Every outbound request is queued on the host it targets. Each host has its
+own FIFO queue, its own rate limit (minimum interval between request starts)
+and its own concurrency cap, so work against one host never waits behind
+another host's rate limit — e.g. DuckDuckGo lookups keep flowing while
+LinkedIn company fetches wait for their slot.
+
+Request starts are paced by a token bucket per host kept in
+``api.shared_state``, so with ``SHARED_STATE_PATH`` set the rate limit is
+shared by all uvicorn workers instead of multiplied by their number.
+
+The blocking ``requests`` calls themselves run in the scheduler's thread
+pool (sized by ``FETCH_THREADS``, not by CPU count, since the threads mostly
+wait on the network). Calls
+that fail transiently are retried with jittered backoff (``api.retry``), and
+with hedging on, a call still running after the host's recent p95 latency
+gets a duplicate; the first answer wins. Retries and hedges take their own
+slot, so they count against the host's rate budget. A failure on a
+rate-limited or challenge page (``scraper_common.page_class``) also pauses
+the whole host queue for the backoff (``RetryPolicy.host_pause``), rather
+than letting the other callers walk into the same wall.
+
+Calls made under a deadline (``api.deadlines``) give up waiting for a slot
+once it passes (``Skipped``), and stop waiting on a running fetch or backoff
+that would outlast it (``DeadlineExceeded``).
+
+Each host queue holds one FIFO per priority class (``api.priorities``). Slots
+go to the waiting classes in proportion to their weights (stride scheduling:
+the class that has used least of its share goes next), so a single
+interactive lookup does not wait behind a bulk job's backlog, and the bulk
+job still gets its share. A request queued longer than ``PRIORITY_MAX_WAIT``
+is served next whatever its class. Queue waits are kept per class
+(``HostScheduler.stats``).
+"""
+
+import asyncio
+import contextvars
+import functools
+import time
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from api import deadlines, priorities, settings
+from api.retry import RetryPolicy
+from api.shared_state import SharedState, state as shared_state
+
+
+class HostQueue:
+    """Callers waiting for a request slot on one host, one FIFO per priority class."""
+
+    def __init__(
+        self,
+        host: str,
+        min_interval: float,
+        concurrency: int,
+        limiter: SharedState,
+        weights: dict[str, float] | None = None,
+        max_wait: float | None = None,
+    ):
+        self.host = host
+        self.min_interval = min_interval
+        self.concurrency = max(1, concurrency)
+        self.limiter = limiter
+        self.weights = weights or priorities.WEIGHTS
+        self.max_wait = max_wait
+        self.active = 0
+        self.served = Counter()
+        self._waiters = {cls: deque() for cls in self.weights}
+        self._pass = dict.fromkeys(self.weights, 0.0)
+        self._vtime = 0.0
+        self._waits = {cls: deque(maxlen=1000) for cls in self.weights}
+        self._reserved = False
+        self._latencies = deque(maxlen=200)
+        self._wakeup = asyncio.Event()
+        self._pump_task = None
+        self._paused_until = 0.0
+
+    def __len__(self) -> int:
+        return sum(len(waiters) for waiters in self._waiters.values())
+
+    async def acquire(self, priority: str = "interactive") -> None:
+        """Wait until this caller may start a request against the host."""
+        fut = asyncio.get_running_loop().create_future()
+        waiters = self._waiters[priority]
+        if not waiters:
+            # A class that was idle starts level with the others, without
+            # credit for the time it had nothing queued
+            self._pass[priority] = max(self._pass[priority], self._vtime)
+        waiters.append((fut, time.monotonic()))
+        if self._pump_task is None or self._pump_task.done():
+            self._pump_task = asyncio.create_task(self._pump())
+        self._wakeup.set()
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                self.release()  # slot was granted just before cancellation
+            raise
+
+    def release(self) -> None:
+        self.active -= 1
+        self._wakeup.set()
+
+    def pause(self, seconds: float) -> None:
+        """Hand out no slots for ``seconds`` (extends, never shortens, a pause)."""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def paused_for(self) -> float:
+        return max(0.0, self._paused_until - time.monotonic())
+
+    def record_latency(self, seconds: float) -> None:
+        self._latencies.append(seconds)
+
+    def latency_quantile(self, q: float, min_samples: int = 20) -> float | None:
+        """Quantile of recent successful call durations, once there are enough."""
+        if len(self._latencies) < min_samples:
+            return None
+        ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def wait_stats(self) -> dict:
+        """Per class: callers waiting, slots granted and recent queue waits (ms)."""
+        stats = {}
+        for cls, waits in self._waits.items():
+            ordered = sorted(waits)
+
+            def ms(q):
+                return round(1000 * ordered[min(len(ordered) - 1, int(q * len(ordered)))], 1)
+
+            stats[cls] = {
+                "waiting": len(self._waiters[cls]),
+                "served": self.served[cls],
+                "wait_ms": {"p50": ms(0.5), "p95": ms(0.95), "max": ms(1.0)} if ordered else None,
+            }
+        return stats
+
+    def _next_class(self) -> str | None:
+        """The class whose oldest waiter gets the next slot."""
+        heads = {}
+        for cls, waiters in self._waiters.items():
+            while waiters and waiters[0][0].done():  # cancelled while queued
+                waiters.popleft()
+            if waiters:
+                heads[cls] = waiters[0][1]
+        if not heads:
+            return None
+        if self.max_wait:
+            now = time.monotonic()
+            overdue = [(queued, cls) for cls, queued in heads.items() if now - queued >= self.max_wait]
+            if overdue:
+                return min(overdue)[1]
+        return min(heads, key=lambda cls: self._pass[cls])
+
+    async def _pump(self) -> None:
+        """Hand out slots by class share, respecting rate and concurrency."""
+        while len(self):
+            if self.active >= self.concurrency:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            paused = self.paused_for()
+            if paused > 0:
+                await asyncio.sleep(paused)
+                continue
+            if not self._reserved and self.min_interval > 0:
+                # One token per min_interval, burst of one: the same spacing
+                # whether the bucket is process-local or shared
+                self._reserved = True
+                delay = await self.limiter.aacquire_rate(self.host, 1 / self.min_interval, 1)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                    continue
+            cls = self._next_class()
+            if cls is None:
+                break
+            fut, queued = self._waiters[cls].popleft()
+            self._vtime = self._pass[cls]
+            self._pass[cls] += 1 / self.weights[cls]
+            self._waits[cls].append(time.monotonic() - queued)
+            self.served[cls] += 1
+            self.active += 1
+            self._reserved = False
+            fut.set_result(None)
+
+
+class HostScheduler:
+    """Routes blocking fetch functions through per-host queues."""
+
+    def __init__(
+        self,
+        min_intervals: dict[str, float] | None = None,
+        default_min_interval: float = 1.0,
+        concurrency: int = 4,
+        limiter: SharedState = shared_state,
+        retry: RetryPolicy = RetryPolicy(),
+        hedge_quantile: float | None = None,
+        threads: int = 32,
+        weights: dict[str, float] | None = None,
+        max_wait: float | None = None,
+    ):
+        self.min_intervals = min_intervals or {}
+        self.default_min_interval = default_min_interval
+        self.concurrency = concurrency
+        self.limiter = limiter
+        self.retry = retry
+        self.hedge_quantile = hedge_quantile
+        self.weights = weights
+        self.max_wait = max_wait
+        self._executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="fetch")
+        self._queues: dict[str, HostQueue] = {}
+
+    def queue_for(self, url: str) -> HostQueue:
+        host = urlsplit(url).hostname or ""
+        queue = self._queues.get(host)
+        if queue is None:
+            interval = self.min_intervals.get(host, self.default_min_interval)
+            queue = self._queues[host] = HostQueue(
+                host, interval, self.concurrency, self.limiter, self.weights, self.max_wait
+            )
+        return queue
+
+    def stats(self) -> dict:
+        """Queue state and waits per host and priority class."""
+        return {host: queue.wait_stats() for host, queue in self._queues.items()}
+
+    async def run(self, url: str, fn, *args, **kwargs):
+        """Wait for a slot on ``url``'s host, then run ``fn`` in a thread.
+
+        The slot is queued in the caller's priority class (``api.priorities``).
+
+        ``fn`` must be idempotent (it may run more than once): transient
+        failures are retried, and hedging can run it twice concurrently.
+        """
+        queue = self.queue_for(url)
+        call = functools.partial(fn, *args, **kwargs)
+        attempt = 1
+        while True:
+            try:
+                return await self._hedged(queue, call)
+            except deadlines.Skipped:
+                if attempt == 1:
+                    raise
+                raise deadlines.DeadlineExceeded("deadline reached between retries") from None
+            except deadlines.DeadlineExceeded:
+                raise
+            except Exception as e:
+                pause = self.retry.host_pause(attempt, e)
+                if pause > 0:
+                    queue.pause(pause)
+                if attempt >= self.retry.attempts or not self.retry.is_transient(e):
+                    raise
+                wait = self.retry.backoff(attempt, e)
+                left = deadlines.remaining()
+                if left is not None and wait >= left:
+                    raise deadlines.DeadlineExceeded("no time left to retry") from e
+                await asyncio.sleep(wait)
+                attempt += 1
+
+    async def _attempt(self, queue: HostQueue, call, started: asyncio.Event | None = None):
+        try:
+            await asyncio.wait_for(queue.acquire(priorities.current()), deadlines.remaining())
+        except TimeoutError:
+            raise deadlines.Skipped(f"deadline reached waiting for a slot on {queue.host}") from None
+        deadlines.mark_started()
+        try:
+            if started is not None:
+                started.set()
+            begin = time.monotonic()
+            # Copy the context so the deadline reaches the fetch thread
+            ctx = contextvars.copy_context()
+            fetch = asyncio.get_running_loop().run_in_executor(self._executor, ctx.run, call)
+            try:
+                result = await asyncio.wait_for(fetch, deadlines.remaining())
+            except TimeoutError as e:
+                if isinstance(e, deadlines.DeadlineExceeded):
+                    raise
+                raise deadlines.DeadlineExceeded(f"deadline reached fetching from {queue.host}") from None
+        finally:
+            queue.release()
+        queue.record_latency(time.monotonic() - begin)
+        return result
+
+    async def _hedged(self, queue: HostQueue, call):
+        delay = None
+        if self.hedge_quantile is not None:
+            delay = queue.latency_quantile(self.hedge_quantile)
+        if delay is None:
+            return await self._attempt(queue, call)
+
+        started = asyncio.Event()
+        first = asyncio.create_task(self._attempt(queue, call, started))
+        pending = {first}
+        try:
+            # The hedge timer starts once the first call holds a slot, not
+            # while it is still queued behind the rate limit
+            waiter = asyncio.create_task(started.wait())
+            await asyncio.wait({first, waiter}, return_when=asyncio.FIRST_COMPLETED)
+            waiter.cancel()
+            if not first.done():
+                done, _ = await asyncio.wait({first}, timeout=delay)
+                if not done:
+                    pending.add(asyncio.create_task(self._attempt(queue, call)))
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            # The losing thread runs to completion in the background
+            for task in pending:
+                task.cancel()
+
+
+scheduler = HostScheduler(
+    min_intervals={
+        urlsplit(settings.LINKEDIN_BASE_URL).hostname: settings.LINKEDIN_MIN_INTERVAL,
+        urlsplit(settings.DDG_HTML_URL).hostname: settings.DDG_MIN_INTERVAL,
+    },
+    default_min_interval=settings.DEFAULT_MIN_INTERVAL,
+    concurrency=settings.HOST_CONCURRENCY,
+    retry=RetryPolicy(
+        attempts=settings.RETRY_ATTEMPTS,
+        backoff_base=settings.RETRY_BACKOFF_BASE,
+        backoff_max=settings.RETRY_BACKOFF_MAX,
+    ),
+    hedge_quantile=settings.HEDGE_QUANTILE or None,
+    threads=settings.FETCH_THREADS,
+    max_wait=settings.PRIORITY_MAX_WAIT or None,
+)
@@ -2,16 +2,43 @@
 Scrapes LinkedIn data using direct HTTP requests.
 Works both locally and on serverless platforms (Vercel, etc.) —
 no subprocess or Scrapy CLI needed.
+
+Requests are routed through the per-host scheduler (see api/scheduler.py),
+so LinkedIn and DuckDuckGo work interleaves instead of running serially.
+Results are cached in the shared state (see api/shared_state.py), and a
+handle requested by several callers or workers at once is fetched once.
+Runs can be bounded by a deadline (see api/deadlines.py): lookups still
+unfinished when it passes come back with status "timeout" or "skipped".
+Each run has a priority class (see api/priorities.py): small runs are
+interactive and are served ahead of bulk ones on the per-host queues.
+
+Fetching and parsing go through a ``FetchBackend`` chosen by
+``FETCH_BACKEND``: ``HttpBackend`` (below) or ``ScrapyBackend``, which runs
+the Scrapy spiders in-process (see api/scrapy_backend.py). Caching,
+deadlines and the search/snapshot updates are the same for both.
 """
 
+import asyncio
+import functools
+import hashlib
 import re
-import html as html_module
-import time
+from abc import ABC, abstractmethod
 from urllib.parse import quote_plus
 
 import requests
 from parsel import Selector
 
+from api import deadlines, priorities, settings
+from api import name_index, page_class
+from api.prefetch import prefetcher
+from api.scheduler import scheduler
+from api.search_index import index as search_index
+from api.shared_state import single_flight, state
+from api.snapshots import store as snapshot_store
+from scraper_common import ddg_results
+from scraper_common.assets import AssetFetcher, AssetStore
+from scraper_common.items import COMPANY_FIELDS, PROFILE_FIELDS, CompanyItem, ProfileItem
+
 USER_AGENT = (
     "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
     "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
@@ -29,7 +56,105 @@ HEADERS = {
     "Upgrade-Insecure-Requests": "1",
 }
 
-REQUEST_TIMEOUT = 20
+REQUEST_TIMEOUT = (settings.CONNECT_TIMEOUT, settings.READ_TIMEOUT)
+
+
+def _get(url: str, **kwargs) -> requests.Response:
+    """GET with the shared headers and timeout; 429/5xx raise so the scheduler retries.
+
+    Login walls, security checks and other pages that are not what was asked
+    for raise ``page_class.UnusablePage`` instead of being parsed. The
+    timeouts shrink to whatever is left of the current deadline.
+    """
+    timeout = tuple(deadlines.timeout(t) for t in REQUEST_TIMEOUT)
+    resp = requests.get(url, headers=HEADERS, timeout=timeout, **kwargs)
+    page_class.check(resp)
+    return resp
+
+
+async def _cached(prefix: str, fields, fetch, should_cache):
+    """Serve a scraped record (as a dict) from the cache, fetching it at most once.
+
+    A full record cached earlier also answers requests for a subset of fields.
+    """
+    if settings.CACHE_TTL <= 0:
+        return await fetch()
+    if fields is not None:
+        full = await state.aget(f"{prefix}|*")
+        if full is not None:
+            return full
+    key = f"{prefix}|{'*' if fields is None else ','.join(sorted(fields))}"
+    return await single_flight(key, fetch, settings.CACHE_TTL, should_cache)
+
+
+async def _refresh(prefix: str, fetch, should_cache) -> bool:
+    """Re-fetch the full record under ``prefix`` into the cache (refresh-ahead).
+
+    False when another caller is already fetching it or the result is not
+    worth caching; the cached record is then left as it is.
+    """
+    key = f"{prefix}|*"
+    if not await state.aclaim(key, settings.SINGLE_FLIGHT_TIMEOUT):
+        return False
+    try:
+        value = await fetch()
+        if not should_cache(value):
+            return False
+        await state.aset(key, value, settings.CACHE_TTL)
+        return True
+    finally:
+        await state.aunclaim(key)
+
+
+asset_fetcher = (
+    AssetFetcher(AssetStore(settings.ASSET_DIR), settings.ASSET_CONCURRENCY, settings.READ_TIMEOUT,
+                 settings.ASSET_MAX_BYTES)
+    if settings.ASSET_DIR else None
+)
+
+
+def _check_assets(assets: bool) -> None:
+    if assets and asset_fetcher is None:
+        raise ValueError("Asset store is not enabled (set ASSET_DIR)")
+
+
+def _asset_fields(fields, url_field: str, key_field: str):
+    """``fields`` to scrape when assets are wanted: the key needs the URL."""
+    if fields is None or key_field not in fields or url_field in fields:
+        return fields
+    return [*fields, url_field]
+
+
+async def _store_assets(items: list, url_field: str, key_field: str) -> None:
+    """Set ``key_field`` on ``items`` to the stored asset behind ``url_field``.
+
+    Downloads still running at the deadline go on in the background; their
+    items are returned without a key.
+    """
+    try:
+        keys = await asyncio.wait_for(
+            asset_fetcher.fetch_all(getattr(item, url_field) for item in items), deadlines.remaining()
+        )
+    except TimeoutError:
+        return
+    for item in items:
+        setattr(item, key_field, keys.get(getattr(item, url_field)))
+
+
+async def _within_deadline(coro, unfinished):
+    """Await ``coro`` until the current deadline.
+
+    Past the deadline, returns ``unfinished(status)`` instead, with status
+    "skipped" if the lookup never started and "timeout" if it did.
+    """
+    if deadlines.expired():
+        coro.close()
+        return unfinished("skipped")
+    progress = deadlines.track()
+    try:
+        return await asyncio.wait_for(coro, deadlines.remaining())
+    except TimeoutError:
+        return unfinished("timeout" if progress.started else "skipped")
 
 
 # ────────────────────────────────────────────
@@ -44,127 +169,243 @@ def _normalize_company_url(handle_or_url: str) -> str:
         handle = s.split("linkedin.com/company/")[-1].split("?")[0].strip("/")
     else:
         handle = s.replace("linkedin.com/company/", "").strip("/")
-    return f"https://www.linkedin.com/company/{handle}"
+    return f"{settings.LINKEDIN_BASE_URL}/company/{handle}"
 
 
-def _scrape_single_company(url: str) -> dict:
-    """Fetch and parse a single LinkedIn company page."""
-    resp = requests.get(url, headers=HEADERS, timeout=REQUEST_TIMEOUT)
-    sel = Selector(text=resp.text)
+def company_handle(handle_or_url: str) -> str:
+    """The bare handle ("openai") of a company handle or URL."""
+    url = _normalize_company_url(handle_or_url)
+    return url.split("/company/", 1)[-1].split("?")[0].strip("/").split("/")[0]
+
+
+# Inputs that could be handles are a single word; anything else ("Open AI",
+# "Ben & Jerry's") can only be a name.
+_HANDLE_RE = re.compile(r"[\w.%-]+")
 
-    item = {}
 
-    item["company_name"] = (
-        sel.css(".top-card-layout__entity-info h1::text").get(default="not-found") or "not-found"
-    ).strip()
+def _resolve_company(company: str) -> str | None:
+    """Handle or URL to scrape for a company input, resolving names with the name index.
+
+    URLs and indexed handles are used as they are. Anything else is looked up
+    as a name first ("Stripe" is a name as much as a handle); a single word
+    the index does not resolve is then tried as a handle, since the index
+    does not know every company. None when a name that cannot be a handle is
+    unknown or matches several companies equally well.
+    """
+    company = company.strip()
+    if company.lower().startswith("http") or "linkedin.com/" in company.lower():
+        return company
+    names = name_index.current()
+    if names is None or names.has_handle(company):
+        return company
+    handle = names.resolve(company)
+    if handle is None and _HANDLE_RE.fullmatch(company):
+        return company
+    return handle
+
+
+# Fields filled by the walk over the "Company details" section.
+_COMPANY_DETAIL_FIELDS = frozenset({
+    "website", "industry", "company_size_approx", "headquarters",
+    "type", "founded", "specialties",
+})
+
+# Fields filled from the funding aside (whole-document XPaths).
+_COMPANY_FUNDING_FIELDS = frozenset({
+    "funding", "funding_total_rounds", "funding_option", "last_funding_round",
+})
+
+_FUNDING_XPATH = '//section[contains(@class, "aside-section-container")]/div'
+
+
+def _text(value: str | None) -> str | None:
+    """Strip a selector result; empty or missing values become None."""
+    if value is None:
+        return None
+    return value.strip() or None
+
 
-    followers_text = sel.xpath(
-        '//h3[contains(@class, "top-card-layout__first-subline")]/span/following-sibling::text()'
-    ).get()
+def _first_int(value: str | None) -> int | None:
+    """Parse the leading number of texts like '2,610,704 followers'."""
     try:
-        item["linkedin_followers_count"] = int(
-            (followers_text or "").split()[0].strip().replace(",", "")
-        )
+        return int(value.split()[0].replace(",", ""))
     except (ValueError, IndexError, AttributeError):
-        item["linkedin_followers_count"] = 0
+        return None
+
+
+def _scrape_single_company(url: str, fields=None) -> CompanyItem:
+    """Fetch and parse a single LinkedIn company page."""
+    resp = _get(url)
+    return _parse_company(resp.text, fields)
+
 
-    item["company_logo_url"] = sel.css(
-        "div.top-card-layout__entity-image-container img::attr(data-delayed-url)"
-    ).get("not-found")
+def _parse_company(text: str, fields=None) -> CompanyItem:
+    """Parse a LinkedIn company page.
+
+    ``fields`` limits extraction to the given field names; selectors that only
+    feed unwanted fields are never evaluated. ``None`` extracts everything.
+    """
+    want = frozenset(COMPANY_FIELDS) if fields is None else frozenset(fields)
+    sel = Selector(text=text)
 
-    item["about_us"] = sel.css(
-        ".core-section-container__content p::text"
-    ).get(default="not-found").strip()
+    item = CompanyItem()
+
+    if "company_name" in want:
+        item.company_name = _text(sel.css(".top-card-layout__entity-info h1::text").get())
+
+    if "linkedin_followers_count" in want:
+        item.linkedin_followers_count = _first_int(sel.xpath(
+            '//h3[contains(@class, "top-card-layout__first-subline")]/span/following-sibling::text()'
+        ).get())
+
+    if "company_logo_url" in want:
+        item.company_logo_url = sel.css(
+            "div.top-card-layout__entity-image-container img::attr(data-delayed-url)"
+        ).get()
+
+    if "about_us" in want:
+        item.about_us = _text(sel.css(".core-section-container__content p::text").get())
 
     # Employee count
-    try:
-        emp_raw = sel.css("a.face-pile__cta::text").get(default="not-found").strip()
+    if "num_of_employees" in want:
+        emp_raw = sel.css("a.face-pile__cta::text").get() or ""
         nums = re.findall(r"\d{1,3}(?:,\d{3})*", emp_raw)
         if nums:
-            item["num_of_employees"] = int(nums[0].replace(",", ""))
-        else:
-            item["num_of_employees"] = emp_raw
-    except Exception:
-        item["num_of_employees"] = "not-found"
+            item.num_of_employees = int(nums[0].replace(",", ""))
 
-    # Company details section
     try:
-        details = sel.css(".core-section-container__content .mb-2")
+        # Company details section
+        if want & _COMPANY_DETAIL_FIELDS:
+            details = sel.css(".core-section-container__content .mb-2")
 
-        item["website"] = details[0].css("a::text").get(default="not-found").strip()
+            item.website = _text(details[0].css("a::text").get())
 
-        industry_line = details[1].css(".text-md::text").getall()
-        item["industry"] = industry_line[1].strip()
+            industry_line = details[1].css(".text-md::text").getall()
+            item.industry = _text(industry_line[1])
 
-        size_line = details[2].css(".text-md::text").getall()
-        item["company_size_approx"] = size_line[1].strip().split()[0]
+            size_line = details[2].css(".text-md::text").getall()
+            item.company_size_approx = size_line[1].strip().split()[0]
 
-        hq = details[3].css(".text-md::text").getall()
-        if hq[0].lower().strip() == "headquarters":
-            item["headquarters"] = hq[1].strip()
-        else:
-            item["headquarters"] = "not-found"
-
-        comp_type = details[4].css(".text-md::text").getall()
-        item["type"] = comp_type[1].strip()
-
-        unsure = details[5].css(".text-md::text").getall()
-        key = unsure[0].lower().strip()
-        item[key] = unsure[1].strip()
-        if key == "founded":
-            specs = details[6].css(".text-md::text").getall()
-            if specs[0].lower().strip() == "specialties":
-                item["specialties"] = specs[1].strip()
-            else:
-                item["specialties"] = "not-found"
-        elif key != "specialties":
-            item["founded"] = "not-found"
-            item["specialties"] = "not-found"
+            hq = details[3].css(".text-md::text").getall()
+            if hq[0].lower().strip() == "headquarters":
+                item.headquarters = _text(hq[1])
+
+            comp_type = details[4].css(".text-md::text").getall()
+            item.type = _text(comp_type[1])
+
+            # `founded` comes before `specialties` when present
+            unsure = details[5].css(".text-md::text").getall()
+            key = unsure[0].lower().strip()
+            if key == "founded":
+                item.founded = _text(unsure[1])
+                specs = details[6].css(".text-md::text").getall()
+                if specs[0].lower().strip() == "specialties":
+                    item.specialties = _text(specs[1])
+            elif key == "specialties":
+                item.specialties = _text(unsure[1])
 
         # Funding
-        item["funding"] = sel.css("p.text-display-lg::text").get(default="not-found").strip()
-        rounds_raw = sel.xpath(
-            '//section[contains(@class, "aside-section-container")]/div'
-            '/a[contains(@class, "link-styled")]'
-            '//span[contains(@class, "before:middot")]/text()'
-        ).get() or ""
-        try:
-            item["funding_total_rounds"] = int(str(rounds_raw).strip().split()[0].replace(",", ""))
-        except (ValueError, IndexError):
-            item["funding_total_rounds"] = 0
-        item["funding_option"] = sel.xpath(
-            '//section[contains(@class, "aside-section-container")]/div'
-            '//div[contains(@class, "my-2")]'
-            '/a[contains(@class, "link-styled")]/text()'
-        ).get("not-found").strip()
-        item["last_funding_round"] = sel.xpath(
-            '//section[contains(@class, "aside-section-container")]/div'
-            '//div[contains(@class, "my-2")]'
-            '/a[contains(@class, "link-styled")]'
-            '//time[contains(@class, "before:middot")]/text()'
-        ).get("not-found").strip()
+        if "funding" in want:
+            item.funding = _text(sel.css("p.text-display-lg::text").get())
+        if "funding_total_rounds" in want:
+            item.funding_total_rounds = _first_int(sel.xpath(
+                _FUNDING_XPATH + '/a[contains(@class, "link-styled")]'
+                '//span[contains(@class, "before:middot")]/text()'
+            ).get())
+        if "funding_option" in want:
+            item.funding_option = _text(sel.xpath(
+                _FUNDING_XPATH + '//div[contains(@class, "my-2")]'
+                '/a[contains(@class, "link-styled")]/text()'
+            ).get())
+        if "last_funding_round" in want:
+            item.last_funding_round = _text(sel.xpath(
+                _FUNDING_XPATH + '//div[contains(@class, "my-2")]'
+                '/a[contains(@class, "link-styled")]'
+                '//time[contains(@class, "before:middot")]/text()'
+            ).get())
     except IndexError:
         pass  # some details missing — keep what we have
 
     return item
 
 
-async def run_company_scraper(companies: list[str]) -> list[dict]:
-    """Scrape company profiles from LinkedIn. Returns list of company dicts."""
+def _company_found(data: dict) -> bool:
+    # company_url is set for every page, found or not
+    return data["error"] is None and any(
+        data.get(name) is not None for name in COMPANY_FIELDS if name != "company_url"
+    )
+
+
+def _unfinished_company(handle: str, status: str) -> CompanyItem:
+    return CompanyItem(company_name=handle, status=status)
+
+
+async def _fetch_company(url: str, fields=None) -> dict:
+    item = await backend.company(url, fields)
+    item.company_url = url
+    data = item.to_dict()
+    if _company_found(data):
+        if fields is None:
+            search_index.add(item, company_handle(url))
+        if snapshot_store is not None:
+            await asyncio.to_thread(snapshot_store.record, company_handle(url), item)
+    return data
+
+
+async def _scrape_company(handle: str, fields=None) -> CompanyItem:
+    url = _normalize_company_url(handle)
+    prefix = f"company:{url}"
+    prefetcher.record(prefix, url, functools.partial(
+        _refresh, prefix, functools.partial(_fetch_company, url), _company_found,
+    ))
+    fetch = functools.partial(_fetch_company, url, fields)
+
+    try:
+        return CompanyItem(**await _cached(prefix, fields, fetch, _company_found))
+    except deadlines.DeadlineExceeded:
+        raise
+    except Exception as e:
+        return CompanyItem(company_name=handle, error=str(e), status="error")
+
+
+async def run_company_scraper(
+    companies: list[str],
+    fields: list[str] = None,
+    deadline: float = None,
+    priority: str = None,
+    assets: bool = False,
+) -> list[CompanyItem]:
+    """Scrape company profiles from LinkedIn. Returns one CompanyItem per input.
+
+    ``fields`` restricts extraction to those field names. ``deadline`` is a
+    ``time.monotonic()`` value; companies not scraped by then are returned
+    with status "timeout" or "skipped". ``priority`` is the scheduler class;
+    by default it depends on the number of companies. ``assets`` stores each
+    logo (``ASSET_DIR``) and sets ``company_logo_key``.
+    """
+    _check_assets(assets)
     if not companies:
         return []
-    results = []
-    for handle in companies:
-        handle = handle.strip()
-        if not handle:
-            continue
-        url = _normalize_company_url(handle)
-        try:
-            item = _scrape_single_company(url)
-            results.append(item)
-        except Exception as e:
-            results.append({"company_name": handle, "error": str(e)})
-    return results
+    handles = [h.strip() for h in companies if h.strip()]
+    if assets:
+        fields = _asset_fields(fields, "company_logo_url", "company_logo_key")
+
+    async def scrape(company: str) -> CompanyItem:
+        handle = _resolve_company(company)
+        if handle is None:
+            return CompanyItem(
+                company_name=company, error="No unique company with this name", status="error"
+            )
+        return await _within_deadline(
+            _scrape_company(handle, fields), functools.partial(_unfinished_company, handle)
+        )
+
+    priority = priority or priorities.for_size(len(handles))
+    with deadlines.scope(deadline), priorities.scope(priority):
+        items = list(await asyncio.gather(*(scrape(h) for h in handles)))
+        if assets:
+            await _store_assets(items, "company_logo_url", "company_logo_key")
+        return items
 
 
 # ────────────────────────────────────────────
@@ -172,7 +413,7 @@ async def run_company_scraper(companies: list[str]) -> list[dict]:
 #  LinkedIn returns 999 for /in/ — uses li_at cookie or DDG fallback
 # ────────────────────────────────────────────
 
-DDG_HTML_URL = "https://html.duckduckgo.com/html/"
+DDG_HTML_URL = settings.DDG_HTML_URL
 
 
 def _extract_handle(profile_input: str) -> str:
@@ -182,33 +423,30 @@ def _extract_handle(profile_input: str) -> str:
     return profile_input
 
 
-def _empty_profile(handle: str) -> dict:
-    return {
-        "profile_url": f"https://www.linkedin.com/in/{handle}",
-        "name": "not-found",
-        "headline": "not-found",
-        "location": "not-found",
-        "profile_photo_url": "not-found",
-        "connections": "not-found",
-        "about": "not-found",
-        "current_role": "not-found",
-    }
+# Fields the authenticated page (embedded JSON or CSS fallback) can fill.
+_PROFILE_PAGE_FIELDS = frozenset({
+    "name", "headline", "location", "profile_photo_url", "about",
+})
+
 
+def _empty_profile(handle: str, status: str = "ok") -> ProfileItem:
+    return ProfileItem(profile_url=f"https://www.linkedin.com/in/{handle}", status=status)
 
-def _scrape_profile_authenticated(handle: str, li_at: str) -> dict:
+
+def _scrape_profile_authenticated(handle: str, li_at: str, fields=None) -> ProfileItem:
     """Scrape LinkedIn profile using li_at session cookie.
 
     LinkedIn's authenticated pages embed profile data as JSON inside <code>
     tags (React SPA). We extract from that JSON.
-    Returns None if the cookie is expired/invalid so the caller can fallback.
+    Returns None if the cookie is expired/invalid so the caller can fallback;
+    a login wall or 999 raises ``page_class.UnusablePage`` from ``_get``,
+    which the caller treats the same way.
+    When ``fields`` names none of the page fields, the page is not parsed.
     """
-    url = f"https://www.linkedin.com/in/{handle}"
+    url = f"{settings.LINKEDIN_BASE_URL}/in/{handle}"
     cookies = {"li_at": li_at}
     try:
-        resp = requests.get(
-            url, headers=HEADERS, cookies=cookies,
-            timeout=REQUEST_TIMEOUT, allow_redirects=False,
-        )
+        resp = _get(url, cookies=cookies, allow_redirects=False)
     except requests.exceptions.TooManyRedirects:
         return None  # cookie expired → redirect loop
 
@@ -216,14 +454,13 @@ def _scrape_profile_authenticated(handle: str, li_at: str) -> dict:
     if resp.status_code in (302, 303, 301):
         return None
 
-    if resp.status_code == 999:
-        return None  # signal to fallback
-
     if resp.status_code != 200:
         return None
 
     item = _empty_profile(handle)
-    item["profile_url"] = url
+
+    if fields is not None and not _PROFILE_PAGE_FIELDS.intersection(fields):
+        return item
 
     # LinkedIn authenticated pages store profile data as JSON in <code> tags.
     # Extract miniProfile objects from the JSON.
@@ -249,20 +486,20 @@ def _scrape_profile_authenticated(handle: str, li_at: str) -> dict:
             pid = inc.get("publicIdentifier", "")
             fname = inc.get("firstName", "")
             if fname and pid and pid.lower() == handle.lower():
-                item["name"] = f"{fname} {inc.get('lastName', '')}".strip()
-                item["headline"] = inc.get("occupation", "not-found")
+                item.name = f"{fname} {inc.get('lastName', '')}".strip()
+                item.headline = inc.get("occupation") or None
                 # Photo
                 pic = inc.get("picture", {}) or {}
                 root_url = pic.get("rootUrl", "")
                 for art in pic.get("artifacts", []):
                     seg = art.get("fileIdentifyingUrlPathSegment", "")
                     if "200_200" in seg or "400_400" in seg:
-                        item["profile_photo_url"] = f"{root_url}{seg}"
+                        item.profile_photo_url = f"{root_url}{seg}"
                         break
 
             # Location data
             if "geoLocationName" in inc and inc.get("publicIdentifier", "").lower() == handle.lower():
-                item["location"] = inc.get("geoLocationName", "not-found")
+                item.location = inc.get("geoLocationName") or None
 
         # Also look for summary/about in profile data
         for inc in data.get("included", []):
@@ -270,10 +507,10 @@ def _scrape_profile_authenticated(handle: str, li_at: str) -> dict:
                 continue
             summary = inc.get("summary", "")
             if summary and handle.lower() in str(inc.get("publicIdentifier", "")).lower():
-                item["about"] = summary
+                item.about = summary
 
     # If we got a name, the extraction worked
-    if item["name"] != "not-found":
+    if item.name is not None:
         return item
 
     # Fallback: try CSS selectors (works for unauthenticated public profiles)
@@ -285,115 +522,277 @@ def _scrape_profile_authenticated(handle: str, li_at: str) -> dict:
         or sel.xpath("//h1//text()").get()
     )
     if name and name.strip() not in ("", "Join LinkedIn", "Sign Up"):
-        item["name"] = name.strip()
+        item.name = name.strip()
 
-        headline = sel.css(".top-card-layout__headline::text").get()
-        item["headline"] = headline.strip() if headline else item["headline"]
+        headline = _text(sel.css(".top-card-layout__headline::text").get())
+        item.headline = headline or item.headline
 
-        location = sel.css(".top-card__subline-item::text").get()
-        item["location"] = location.strip() if location else item["location"]
+        location = _text(sel.css(".top-card__subline-item::text").get())
+        item.location = location or item.location
 
-        item["profile_photo_url"] = (
+        item.profile_photo_url = (
             sel.css("img[data-delayed-url]::attr(data-delayed-url)").get()
             or sel.css(".top-card-layout__entity-image-container img::attr(src)").get()
-            or item["profile_photo_url"]
+            or item.profile_photo_url
         )
 
-        about = sel.css(".core-section-container__content p::text").get()
-        item["about"] = about.strip() if about else item["about"]
+        about = _text(sel.css(".core-section-container__content p::text").get())
+        item.about = about or item.about
 
     return item
 
 
-def _scrape_profile_ddg(handle: str) -> dict:
-    """Scrape profile data from DuckDuckGo search results (fallback)."""
+def _scrape_profile_ddg(handle: str, fields=None) -> ProfileItem:
+    """Scrape profile data from DuckDuckGo search results (fallback).
+
+    The result snippet is only used when ``about`` or ``headline`` is wanted.
+    """
+    want = frozenset(PROFILE_FIELDS) if fields is None else frozenset(fields)
     item = _empty_profile(handle)
     query = quote_plus(f"site:linkedin.com/in/{handle}")
-    try:
-        resp = requests.get(
-            f"{DDG_HTML_URL}?q={query}", headers=HEADERS, timeout=REQUEST_TIMEOUT
-        )
-    except Exception:
-        return item
+    resp = _get(f"{DDG_HTML_URL}?q={query}")
 
-    sel = Selector(text=resp.text)
-    results = sel.css("div.result") or sel.css("div.results_links")
-
-    best = None
-    for r in results:
-        url_text = (
-            r.css("a.result__url::text").get("") or r.css("a.result__a::attr(href)").get("")
-        ).strip()
-        if handle.lower() in url_text.lower():
-            best = r
-            break
-    if best is None and results:
-        best = results[0]
+    best = ddg_results.best_result(resp.text, handle)
     if best is None:
         return item
 
-    raw_title = best.css("a.result__a").get("")
-    raw_title = re.sub(r"<[^>]+>", "", raw_title).strip()
-    raw_title = html_module.unescape(raw_title)
-    raw_title = re.sub(r"\s*[-|]\s*LinkedIn\s*$", "", raw_title, flags=re.IGNORECASE)
+    raw_title = re.sub(r"\s*[-|]\s*LinkedIn\s*$", "", best.title, flags=re.IGNORECASE)
 
     parts = re.split(r"\s+-\s+", raw_title, maxsplit=1)
     if len(parts) == 2:
-        item["name"] = parts[0].strip()
-        item["headline"] = parts[1].strip()
+        item.name = _text(parts[0])
+        item.headline = _text(parts[1])
     elif raw_title:
-        item["name"] = raw_title.strip()
+        item.name = _text(raw_title)
 
-    raw_snippet = best.css("a.result__snippet").get("")
-    raw_snippet = re.sub(r"<[^>]+>", "", raw_snippet).strip()
-    raw_snippet = html_module.unescape(raw_snippet)
+    raw_snippet = ""
+    if "about" in want or "headline" in want:
+        raw_snippet = best.snippet
     if raw_snippet:
         snippet_parts = raw_snippet.split(" · ", maxsplit=1)
         if len(snippet_parts) == 2:
-            item["about"] = snippet_parts[1].strip()
-            if item["headline"] == "not-found":
-                item["headline"] = snippet_parts[0].strip()
+            item.about = _text(snippet_parts[1])
+            if item.headline is None:
+                item.headline = _text(snippet_parts[0])
         else:
-            item["about"] = raw_snippet.strip()
+            item.about = _text(raw_snippet)
 
-    href = best.css("a.result__a::attr(href)").get("")
-    if "linkedin.com/in/" in href:
-        item["profile_url"] = href.split("?")[0]
-    else:
-        url_text = best.css("a.result__url::text").get("").strip()
-        if "linkedin.com/in/" in url_text:
-            if not url_text.startswith("http"):
-                url_text = "https://" + url_text
-            item["profile_url"] = url_text.split("?")[0]
+    if "linkedin.com/in/" in best.href:
+        item.profile_url = best.href.split("?")[0]
+    elif "linkedin.com/in/" in best.url:
+        url_text = best.url
+        if not url_text.startswith("http"):
+            url_text = "https://" + url_text
+        item.profile_url = url_text.split("?")[0]
 
     return item
 
 
-async def run_profile_scraper(profiles: list[str], li_at: str = None) -> list[dict]:
-    """Scrape user profiles. Uses li_at cookie if provided, else DDG fallback."""
-    if not profiles:
-        return []
-    results = []
-    for i, raw in enumerate(profiles):
-        handle = _extract_handle(raw.strip())
-        if not handle:
-            continue
+async def _fetch_profile(handle: str, li_at: str = None, fields=None) -> dict:
+    item = await backend.profile(handle, li_at, fields)
+    return item.to_dict()
+
+
+def _profile_found(data: dict) -> bool:
+    return data["name"] is not None
+
+
+def _session_key(li_at: str | None) -> str:
+    """Cache key part for a lookup made with ``li_at``: a hash, not the cookie itself."""
+    if not li_at:
+        return "public"
+    return "auth-" + hashlib.blake2b(li_at.encode(), digest_size=16).hexdigest()
+
+
+async def _scrape_profile(handle: str, li_at: str = None, fields=None) -> ProfileItem:
+    # Authenticated lookups are cached per cookie, so what one account can
+    # see is never served to the holder of another
+    prefix = f"profile:{handle.lower()}:{_session_key(li_at)}"
+    if not li_at:
+        # Only public lookups are refreshed ahead: cookies are not kept
+        prefetcher.record(prefix, DDG_HTML_URL, functools.partial(
+            _refresh, prefix, functools.partial(_fetch_profile, handle), _profile_found,
+        ))
+    fetch = functools.partial(_fetch_profile, handle, li_at, fields)
+    data = await _cached(prefix, fields, fetch, _profile_found)
+    return ProfileItem(**data)
 
+
+# ────────────────────────────────────────────
+#  Fetch backends
+# ────────────────────────────────────────────
+
+class FetchBackend(ABC):
+    """Fetches and parses one company page or profile."""
+
+    @abstractmethod
+    async def company(self, url: str, fields=None) -> CompanyItem:
+        """Company at ``url``; raises when the page cannot be fetched."""
+
+    @abstractmethod
+    async def profile(self, handle: str, li_at: str = None, fields=None) -> ProfileItem:
+        """Profile of ``handle``; status "error" when no lookup succeeded."""
+
+    async def close(self) -> None:
+        pass
+
+
+class HttpBackend(FetchBackend):
+    """Blocking ``requests`` calls through the per-host scheduler."""
+
+    async def company(self, url: str, fields=None) -> CompanyItem:
+        return await scheduler.run(url, _scrape_single_company, url, fields)
+
+    async def profile(self, handle: str, li_at: str = None, fields=None) -> ProfileItem:
+        if li_at and settings.PROFILE_RACE_AFTER > 0:
+            return await self._race(handle, li_at, fields)
         item = None
         if li_at:
-            try:
-                item = _scrape_profile_authenticated(handle, li_at)
-            except Exception:
-                item = None  # fallback to DDG
+            item = await self._authenticated(handle, li_at, fields)
 
         # Fallback to DDG if no cookie, or cookie failed (returned None)
         if item is None:
-            item = _scrape_profile_ddg(handle)
+            item = await self._ddg(handle, fields) or _empty_profile(handle, status="error")
+        return item
+
+    async def _authenticated(self, handle: str, li_at: str, fields) -> ProfileItem | None:
+        """The profile from LinkedIn, or None if the cookie did not get it."""
+        try:
+            return await scheduler.run(
+                f"{settings.LINKEDIN_BASE_URL}/in/{handle}",
+                _scrape_profile_authenticated, handle, li_at, fields,
+            )
+        except deadlines.DeadlineExceeded:
+            raise
+        except Exception:
+            return None
+
+    async def _ddg(self, handle: str, fields) -> ProfileItem | None:
+        """The profile from DuckDuckGo, or None once retries are exhausted."""
+        try:
+            return await scheduler.run(DDG_HTML_URL, _scrape_profile_ddg, handle, fields)
+        except deadlines.DeadlineExceeded:
+            raise
+        except Exception:
+            return None
+
+    async def _race(self, handle: str, li_at: str, fields) -> ProfileItem:
+        """The authenticated fetch raced against DuckDuckGo (``PROFILE_RACE_AFTER``).
+
+        DuckDuckGo starts once the authenticated fetch has run for the head
+        start. A DuckDuckGo record holding every wanted field ends the race;
+        otherwise the LinkedIn record is awaited and its values override
+        DuckDuckGo's (or stand in for them if the deadline ends the
+        LinkedIn fetch). The loser is cancelled; its thread runs to
+        completion in the background, as with hedging.
+        """
+        want = PROFILE_FIELDS if fields is None else fields
+        auth = asyncio.create_task(self._authenticated(handle, li_at, fields))
+        ddg = None
+        try:
+            done, _ = await asyncio.wait({auth}, timeout=settings.PROFILE_RACE_AFTER)
+            if not done:
+                ddg = asyncio.create_task(self._ddg(handle, fields))
+                done, _ = await asyncio.wait({auth, ddg}, return_when=asyncio.FIRST_COMPLETED)
+                if auth not in done:
+                    found = ddg.result()
+                    if found is not None and all(getattr(found, name) is not None for name in want):
+                        return found
+            found = None
+            try:
+                item = await auth
+            except deadlines.DeadlineExceeded:
+                if ddg is not None and ddg.done() and ddg.exception() is None:
+                    found = ddg.result()
+                if found is None:
+                    raise
+                return found  # the deadline hit LinkedIn, but DuckDuckGo answered
+            if item is None:
+                found = await ddg if ddg is not None else await self._ddg(handle, fields)
+                return found or _empty_profile(handle, status="error")
+            if ddg is not None and ddg.done() and ddg.exception() is None:
+                found = ddg.result()
+            return _merge_profiles(item, found)
+        finally:
+            for task in (auth, ddg):
+                if task is not None and not task.done():
+                    task.cancel()
+
+
+def _merge_profiles(item: ProfileItem, fallback: ProfileItem | None) -> ProfileItem:
+    """``item`` with its missing fields taken from ``fallback``."""
+    if fallback is None:
+        return item
+    for name in PROFILE_FIELDS:
+        if getattr(item, name) is None:
+            setattr(item, name, getattr(fallback, name))
+    return item
+
+
+def make_backend(name: str) -> FetchBackend:
+    if name == "http":
+        return HttpBackend()
+    if name == "scrapy":
+        from api.scrapy_backend import ScrapyBackend
+
+        return ScrapyBackend()
+    raise ValueError(f"Unknown fetch backend: {name}")
 
-        results.append(item)
 
-        # Rate-limit between requests
-        if i < len(profiles) - 1:
-            time.sleep(2)
+backend = make_backend(settings.FETCH_BACKEND)
 
-    return results
+
+async def run_profile_scraper(
+    profiles: list[str],
+    li_at: str = None,
+    fields: list[str] = None,
+    deadline: float = None,
+    priority: str = None,
+    assets: bool = False,
+) -> list[ProfileItem]:
+    """Scrape user profiles. Uses li_at cookie if provided, else DDG fallback.
+
+    Rate limiting between requests is handled per host by the scheduler.
+    ``fields`` restricts extraction to those field names. ``deadline``,
+    ``priority`` and ``assets`` (here ``profile_photo_key``) work as in
+    ``run_company_scraper``.
+    """
+    _check_assets(assets)
+    if not profiles:
+        return []
+    handles = [_extract_handle(raw.strip()) for raw in profiles]
+    handles = [h for h in handles if h]
+    if assets:
+        fields = _asset_fields(fields, "profile_photo_url", "profile_photo_key")
+    priority = priority or priorities.for_size(len(handles))
+    with deadlines.scope(deadline), priorities.scope(priority):
+        items = list(await asyncio.gather(*(
+            _within_deadline(_scrape_profile(h, li_at, fields), functools.partial(_empty_profile, h))
+            for h in handles
+        )))
+        if assets:
+            await _store_assets(items, "profile_photo_url", "profile_photo_key")
+        return items
+
+
+async def run_batch_scraper(
+    companies: list[str],
+    profiles: list[str],
+    li_at: str = None,
+    deadline: float = None,
+    priority: str = None,
+    assets: bool = False,
+) -> dict:
+    """Scrape companies and profiles together.
+
+    Both groups are submitted to the scheduler at once, so profile lookups
+    against DuckDuckGo proceed while company fetches wait on LinkedIn's rate
+    limit. Results are grouped by kind and keep the input order. The default
+    priority depends on the total number of lookups.
+    """
+    priority = priority or priorities.for_size(len(companies) + len(profiles))
+    company_data, profile_data = await asyncio.gather(
+        run_company_scraper(companies, deadline=deadline, priority=priority, assets=assets),
+        run_profile_scraper(profiles, li_at=li_at, deadline=deadline, priority=priority, assets=assets),
+    )
+    return {"companies": company_data, "profiles": profile_data}
@@ -0,0 +1,223 @@
+"""
+Fetch backend running the Scrapy spiders in-process.
+
+``CompanyProfileScraperSpider`` and ``UserProfileScraperSpider`` each run in
+one long-lived crawl on the API's own event loop (Scrapy's reactorless mode:
+``AsyncCrawlerRunner`` with ``TWISTED_REACTOR_ENABLED = False``, downloads
+through aiohttp). A crawl starts on first use and is kept open while idle.
+Every lookup is a request from the spider's ``request_for``, handed to the
+engine directly; the item it produces (``item_scraped``), or the failure
+(request errback, ``spider_error``), completes the awaiting call.
+
+Politeness and retries are Scrapy's, configured from the API settings: one
+download slot per host with ``*_MIN_INTERVAL`` as its delay and
+``HOST_CONCURRENCY`` as its concurrency, ``RETRY_ATTEMPTS`` and
+``READ_TIMEOUT``; pages are fetched from ``LINKEDIN_BASE_URL`` and
+``DDG_HTML_URL``. The priority class becomes the request priority and the
+deadline caps the download timeout. ``fields`` is not pushed down: the
+spiders always parse whole pages.
+
+Select with ``FETCH_BACKEND=scrapy``; needs Scrapy >= 2.15 and aiohttp.
+"""
+
+import asyncio
+import itertools
+import logging
+import os
+import sys
+from urllib.parse import urlsplit
+
+from api import deadlines, priorities, settings
+from api.scraper_runner import FetchBackend, _empty_profile
+from scraper_common.items import CompanyItem, ProfileItem
+
+logger = logging.getLogger(__name__)
+
+# The Scrapy projects sit next to the api package, each in its own directory
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROJECTS = ("company_data_scraper", "profile_scraper")
+
+# Scrapy serves higher priorities first
+REQUEST_PRIORITY = {cls: 10 * (len(priorities.CLASSES) - i) for i, cls in enumerate(priorities.CLASSES)}
+
+try:
+    import aiohttp  # noqa: F401  (Scrapy's download handler without a reactor)
+    from itemadapter import ItemAdapter
+    from scrapy import signals
+    from scrapy.crawler import AsyncCrawlerRunner
+    from scrapy.exceptions import DontCloseSpider
+    from scrapy.settings import Settings
+    from scrapy.utils.reactorless import is_reactorless  # noqa: F401  (Scrapy >= 2.15)
+except ImportError as e:  # pragma: no cover
+    raise RuntimeError(f"FETCH_BACKEND=scrapy needs Scrapy >= 2.15 and aiohttp ({e})") from e
+
+for _project in PROJECTS:
+    _path = os.path.join(_ROOT, _project)
+    if _path not in sys.path:
+        sys.path.append(_path)
+
+
+def crawl_settings(project: str) -> Settings:
+    """The project's Scrapy settings, with throttling and retries taken from the API settings."""
+    crawl = Settings()
+    crawl.setmodule(f"{project}.settings", priority="project")
+    slots = {
+        urlsplit(settings.LINKEDIN_BASE_URL).hostname: settings.LINKEDIN_MIN_INTERVAL,
+        urlsplit(settings.DDG_HTML_URL).hostname: settings.DDG_MIN_INTERVAL,
+    }
+    crawl.setdict({
+        "TWISTED_REACTOR_ENABLED": False,
+        "TWISTED_REACTOR": None,
+        "REMOTE_CONTROL_ENABLED": False,
+        "TELNETCONSOLE_ENABLED": False,
+        "CRAWL_STATS_DIR": None,  # no report per crawl; the callback timings stay in the stats
+        # First come, first served within a priority, like the HTTP backend
+        # (Scrapy's default is LIFO, which suits crawling depth-first)
+        "SCHEDULER_MEMORY_QUEUE": "scrapy.squeues.FifoMemoryQueue",
+        "DOWNLOAD_DELAY": settings.DEFAULT_MIN_INTERVAL,
+        "CONCURRENT_REQUESTS_PER_DOMAIN": settings.HOST_CONCURRENCY,
+        "DOWNLOAD_SLOTS": {
+            host: {"delay": delay, "concurrency": settings.HOST_CONCURRENCY}
+            for host, delay in slots.items()
+        },
+        "RETRY_TIMES": max(0, settings.RETRY_ATTEMPTS - 1),
+        # Pages the spiders build URLs for themselves (the profile spider's)
+        "LINKEDIN_BASE_URL": settings.LINKEDIN_BASE_URL,
+        "DDG_HTML_URL": settings.DDG_HTML_URL,
+        "DOWNLOAD_TIMEOUT": settings.READ_TIMEOUT,
+    }, priority="cmdline")
+    return crawl
+
+
+def _fed(spidercls):
+    """``spidercls`` without start requests: its lookups are fed one by one."""
+
+    async def start(self):
+        return
+        yield
+
+    return type(spidercls.__name__, (spidercls,), {"start": start})
+
+
+class _Crawl:
+    """One spider kept open, with the lookups waiting on it."""
+
+    def __init__(self, spidercls, project: str):
+        self.runner = AsyncCrawlerRunner(crawl_settings(project))
+        self.crawler = self.runner.create_crawler(spidercls)
+        self.pending: dict[str, asyncio.Future] = {}
+        self._keys = itertools.count()
+        self._opened = asyncio.get_running_loop().create_future()
+        self.task = None
+        signals_ = self.crawler.signals
+        signals_.connect(self._spider_opened, signal=signals.spider_opened)
+        signals_.connect(self._spider_idle, signal=signals.spider_idle)
+        signals_.connect(self._item_scraped, signal=signals.item_scraped)
+        signals_.connect(self._spider_error, signal=signals.spider_error)
+
+    async def start(self, **spider_args) -> None:
+        self.task = self.runner.crawl(self.crawler, **spider_args)
+        await asyncio.wait({self.task, self._opened}, return_when=asyncio.FIRST_COMPLETED)
+        if self.task.done():
+            self.task.result()  # raises why the crawl could not start
+            raise RuntimeError(f"{self.crawler.spidercls.name} closed before opening")
+
+    async def stop(self) -> None:
+        if self.task is not None and not self.task.done():
+            await self.crawler.stop_async()
+            await self.task
+        for fut in self.pending.values():
+            if not fut.done():
+                fut.set_exception(RuntimeError("Scrapy backend closed"))
+
+    @property
+    def spider(self):
+        return self.crawler.spider
+
+    async def fetch(self, request):
+        """Schedule ``request`` and wait for the item it produces."""
+        key = f"api:{next(self._keys)}"
+        request.meta["work_key"] = key  # carried onto follow-up requests by the spiders
+        request.meta["download_timeout"] = deadlines.timeout(settings.READ_TIMEOUT)
+        request.errback = self._errback
+        request.priority = REQUEST_PRIORITY[priorities.current()]
+        fut = self.pending[key] = asyncio.get_running_loop().create_future()
+        try:
+            self.crawler.engine.crawl(request)
+            return await fut
+        finally:
+            self.pending.pop(key, None)
+
+    def _resolve(self, meta: dict, result=None, error: BaseException = None) -> None:
+        fut = self.pending.get(meta.get("work_key"))
+        if fut is None or fut.done():
+            return
+        if error is not None:
+            fut.set_exception(error)
+        else:
+            fut.set_result(result)
+
+    def _spider_opened(self, spider):
+        if not self._opened.done():
+            self._opened.set_result(None)
+
+    def _spider_idle(self, spider):
+        raise DontCloseSpider
+
+    def _item_scraped(self, item, response, spider):
+        self._resolve(response.meta, ItemAdapter(item).asdict())
+
+    def _spider_error(self, failure, response, spider):
+        self._resolve(response.meta, error=failure.value)
+
+    def _errback(self, failure):
+        # Download errors after retries, and non-2xx responses (HttpError)
+        self._resolve(failure.request.meta, error=failure.value)
+
+
+class ScrapyBackend(FetchBackend):
+    def __init__(self):
+        self._crawls: dict[str, _Crawl] = {}
+        self._lock = None
+
+    async def _crawl(self, kind: str) -> _Crawl:
+        crawl = self._crawls.get(kind)
+        if crawl is not None:
+            return crawl
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if kind not in self._crawls:
+                if kind == "company":
+                    from company_data_scraper.spiders.company_profile_scraper import (
+                        CompanyProfileScraperSpider as spidercls,
+                    )
+                    project = "company_data_scraper"
+                else:
+                    from profile_scraper.spiders.user_profile_scraper import (
+                        UserProfileScraperSpider as spidercls,
+                    )
+                    project = "profile_scraper"
+                crawl = _Crawl(_fed(spidercls), project)
+                await crawl.start()
+                self._crawls[kind] = crawl
+                logger.info("Started in-process %s crawl", spidercls.name)
+        return self._crawls[kind]
+
+    async def company(self, url: str, fields=None) -> CompanyItem:
+        crawl = await self._crawl("company")
+        return CompanyItem(**await crawl.fetch(crawl.spider.request_for(url)))
+
+    async def profile(self, handle: str, li_at: str = None, fields=None) -> ProfileItem:
+        crawl = await self._crawl("profile")
+        try:
+            data = await crawl.fetch(crawl.spider.request_for(handle, li_at=li_at))
+        except deadlines.DeadlineExceeded:
+            raise
+        except Exception:
+            return _empty_profile(handle, status="error")
+        return ProfileItem(**data)
+
+    async def close(self) -> None:
+        crawls, self._crawls = list(self._crawls.values()), {}
+        await asyncio.gather(*(crawl.stop() for crawl in crawls))
@@ -0,0 +1,348 @@
+"""
+In-process search index over scraped company records.
+
+Categorical fields get inverted postings (term -> sorted doc ids):
+``industry``, ``type`` and ``company_size_approx`` by their whole normalized
+value, ``headquarters`` by each comma-separated part ("London, England" ->
+"london", "england") and ``specialties`` by word. Followers and employees are
+numeric columns indexed by doc id, with a sorted copy for range queries.
+
+Queries are conjunctive across fields (several values for one field are
+OR-ed). Candidates come from intersecting the shortest postings first, or
+from a range of a sorted numeric column when no term filter is given; the
+remaining conditions are checked on the candidate ids with array operations,
+and top-k sorts use ``argpartition``.
+
+The index grows incrementally. A company is keyed by its handle: the one it
+was scraped under, or that of a record's ``key``/``handle`` field
+(``distributed.py`` exports have one) or ``company_url``, so a company in a
+feed and scraped through the API is indexed once. Records with none of
+these (older crawl output) are keyed by their source and position. A company that is added again gets a new doc
+id and its old one is tombstoned; once tombstones outnumber live docs the
+index is rebuilt from the live ones, so re-scraping the same companies does
+not grow it. New doc ids go to an unsorted tail of each numeric column,
+which is merged into the sorted part once it grows past a fraction of it.
+Sources (Scrapy ``-O`` JSON files, JSON lines and rotating feed directories)
+are re-read on ``refresh`` when they change; feed directories only for their
+new segments.
+
+Updates and queries take a lock, so ``refresh`` and ``search`` can run in a
+worker thread while the event loop adds scraped companies.
+"""
+
+import json
+import os
+import re
+import threading
+
+import numpy as np
+
+from api import settings
+from scraper_common.items import COMPANY_FIELDS, CompanyItem
+from scraper_common.records import read_file
+
+TERM_FIELDS = ("industry", "type", "company_size_approx", "headquarters", "specialties")
+NUMERIC_FIELDS = ("linkedin_followers_count", "num_of_employees")
+
+_WORD = re.compile(r"[a-z0-9][a-z0-9+#.&-]*")
+_INT = re.compile(r"\d{1,3}(?:,\d{3})*|\d+")
+
+
+def terms(field: str, value: str | None) -> list[str]:
+    """Index terms of a field value (also used to normalize query values)."""
+    if not value:
+        return []
+    value = value.strip().lower()
+    if field == "specialties":
+        return _WORD.findall(value)
+    if field == "headquarters":
+        return [part.strip() for part in value.split(",") if part.strip()]
+    return [value]
+
+
+class _Vector:
+    """Append-only numpy vector with amortized growth."""
+
+    def __init__(self, dtype, fill=0, capacity: int = 8):
+        self._data = np.full(capacity, fill, dtype=dtype)
+        self._fill = fill
+        self.n = 0
+
+    def append(self, value) -> None:
+        if self.n == len(self._data):
+            grown = np.full(2 * self.n, self._fill, dtype=self._data.dtype)
+            grown[: self.n] = self._data
+            self._data = grown
+        self._data[self.n] = value
+        self.n += 1
+
+    def __setitem__(self, i, value):
+        self._data[i] = value
+
+    def view(self) -> np.ndarray:
+        return self._data[: self.n]
+
+
+class _NumericColumn:
+    MISSING = -1
+
+    def __init__(self):
+        self.values = _Vector(np.int64, self.MISSING, capacity=1024)
+        self._sorted_ids = np.empty(0, dtype=np.int64)
+        self._sorted_values = np.empty(0, dtype=np.int64)
+        self._tail = []
+
+    def append(self, value: int | None) -> None:
+        doc = self.values.n
+        self.values.append(self.MISSING if value is None else value)
+        if value is not None:
+            self._tail.append(doc)
+            if len(self._tail) > max(1024, len(self._sorted_ids) // 8):
+                self._merge_tail()
+
+    def _merge_tail(self) -> None:
+        tail = np.array(self._tail, dtype=np.int64)
+        ids = np.concatenate([self._sorted_ids, tail])
+        vals = np.concatenate([self._sorted_values, self.values.view()[tail]])
+        order = np.argsort(vals, kind="stable")
+        self._sorted_ids, self._sorted_values = ids[order], vals[order]
+        self._tail = []
+
+    def range_ids(self, low: int | None, high: int | None) -> np.ndarray:
+        """Doc ids (unsorted, including tombstoned) with low <= value <= high."""
+        lo = 0 if low is None else np.searchsorted(self._sorted_values, low, "left")
+        hi = len(self._sorted_values) if high is None else np.searchsorted(
+            self._sorted_values, high, "right"
+        )
+        ids = self._sorted_ids[lo:hi]
+        if self._tail:
+            tail = np.array(self._tail, dtype=np.int64)
+            ids = np.concatenate([ids, tail[_in_range(self.values.view()[tail], low, high)]])
+        return ids
+
+
+def _in_range(values: np.ndarray, low: int | None, high: int | None) -> np.ndarray:
+    mask = values != _NumericColumn.MISSING
+    if low is not None:
+        mask &= values >= low
+    if high is not None:
+        mask &= values <= high
+    return mask
+
+
+def _coerce(record: dict) -> dict:
+    """Normalize older records ("not-found" strings, counts stored as text)."""
+    out = {}
+    for key in COMPANY_FIELDS:
+        value = record.get(key)
+        if value in ("", "not-found"):
+            value = None
+        if key in ("linkedin_followers_count", "num_of_employees", "funding_total_rounds") \
+                and value is not None and not isinstance(value, int):
+            match = _INT.search(str(value))
+            value = int(match.group().replace(",", "")) if match else None
+        out[key] = value
+    return out
+
+
+def _handle(value: str) -> str:
+    """Bare lower-cased handle of a company handle or URL."""
+    value = value.strip().lower()
+    if "/company/" in value:
+        value = value.split("/company/", 1)[1].split("?")[0]
+    return value.strip("/").split("/")[0]
+
+
+def _record_key(record: dict) -> str | None:
+    return record.get("key") or record.get("handle") or record.get("company_url")
+
+
+class CompanyIndex:
+    # Rebuild once tombstoned docs outnumber live ones (and at least this many)
+    COMPACT_MIN_DEAD = 1024
+
+    def __init__(self):
+        self._sources: dict[str, object] = {}
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._clear()
+
+    def _clear(self) -> None:
+        self.items: list[CompanyItem] = []
+        self.alive = _Vector(np.bool_, False, capacity=1024)
+        self.postings: dict[str, dict[str, _Vector]] = {f: {} for f in TERM_FIELDS}
+        self.columns = {f: _NumericColumn() for f in NUMERIC_FIELDS}
+        self._doc_by_key: dict[str, int] = {}
+        self.dead = 0
+
+    def __len__(self) -> int:
+        return len(self._doc_by_key)
+
+    # ── Updates ──
+
+    def add(self, record, key: str = None) -> int | None:
+        """Index a company record (dict or CompanyItem) under ``key`` (a handle or URL).
+
+        Without ``key`` the record's own ``key``, ``handle`` or ``company_url``
+        field is used; records with none of these are not indexed. Replaces an earlier
+        record of the same key.
+        """
+        if isinstance(record, CompanyItem):
+            record = record.to_dict()
+        key = key or _record_key(record)
+        return self._add_record(_handle(key), record) if key else None
+
+    def _add_record(self, key: str, record: dict) -> int | None:
+        record = _coerce(record)
+        if not record.get("company_name"):
+            return None
+        with self._lock:
+            return self._add(key, CompanyItem(**record))
+
+    def _add(self, key: str, item: CompanyItem) -> int:
+        old = self._doc_by_key.get(key)
+        if old is not None:
+            if self.items[old] == item:
+                return old  # unchanged, e.g. a refresh-ahead re-fetch
+            self.alive[old] = False
+            self.dead += 1
+        doc = len(self.items)
+        self.items.append(item)
+        self.alive.append(True)
+        self._doc_by_key[key] = doc
+        for field in TERM_FIELDS:
+            for term in set(terms(field, getattr(item, field))):
+                posting = self.postings[field].get(term)
+                if posting is None:
+                    posting = self.postings[field][term] = _Vector(np.int64)
+                posting.append(doc)
+        for field, column in self.columns.items():
+            column.append(getattr(item, field))
+        if self.dead >= max(self.COMPACT_MIN_DEAD, len(self._doc_by_key)):
+            self._compact()
+        return self._doc_by_key[key]
+
+    def _compact(self) -> None:
+        """Rebuild the index from its live docs, dropping tombstoned ones."""
+        live = sorted(self._doc_by_key.items(), key=lambda entry: entry[1])
+        items = self.items
+        self._clear()
+        for key, doc in live:
+            self._add(key, items[doc])
+
+    def refresh(self, paths) -> int:
+        """(Re)load sources that changed since the last call. Returns records added."""
+        with self._refresh_lock:
+            added = 0
+            for path in paths:
+                if os.path.isdir(path):
+                    added += self._load_feed(path)
+                    continue
+                try:
+                    mtime = os.stat(path).st_mtime_ns
+                except FileNotFoundError:
+                    continue
+                if self._sources.get(path) == mtime:
+                    continue
+                self._sources[path] = mtime
+                added += self._add_records(path)
+            return added
+
+    def _add_records(self, path: str) -> int:
+        added = 0
+        for position, record in enumerate(read_file(path)):
+            key = _record_key(record)
+            added += self._add_record(_handle(key) if key else f"{path}#{position}", record) is not None
+        return added
+
+    def _load_feed(self, directory: str) -> int:
+        """Index segments of a rotating feed directory not seen yet."""
+        manifest_path = os.path.join(directory, "manifest.json")
+        try:
+            with open(manifest_path, encoding="utf-8") as f:
+                segments = json.load(f)["segments"]
+        except (FileNotFoundError, ValueError):
+            return 0
+        seen = self._sources.get(directory, 0)
+        added = 0
+        for segment in segments[seen:]:
+            added += self._add_records(os.path.join(directory, segment["name"]))
+        self._sources[directory] = len(segments)
+        return added
+
+    # ── Queries ──
+
+    def search(
+        self,
+        filters: dict[str, list[str]] | None = None,
+        ranges: dict[str, tuple[int | None, int | None]] | None = None,
+        sort: str | None = None,
+        descending: bool = True,
+        limit: int = 20,
+    ) -> tuple[int, list[CompanyItem]]:
+        """Companies matching every filter. Returns (total matches, top ``limit`` items).
+
+        ``filters`` maps term fields to accepted values (any of them);
+        ``ranges`` maps numeric fields to inclusive (low, high) bounds.
+        """
+        with self._lock:
+            return self._search(filters, ranges, sort, descending, limit)
+
+    def _search(self, filters, ranges, sort, descending, limit) -> tuple[int, list[CompanyItem]]:
+        candidates = self._term_candidates(filters or {})
+        ranges = {f: r for f, r in (ranges or {}).items() if r != (None, None)}
+        if candidates is None and ranges:
+            # Most selective range would be better; the first one is good enough
+            field = next(iter(ranges))
+            candidates = np.sort(self.columns[field].range_ids(*ranges.pop(field)))
+        if candidates is None:
+            candidates = np.flatnonzero(self.alive.view())
+        else:
+            candidates = candidates[self.alive.view()[candidates]]
+        for field, (low, high) in ranges.items():
+            values = self.columns[field].values.view()[candidates]
+            candidates = candidates[_in_range(values, low, high)]
+
+        total = len(candidates)
+        if sort is not None and total:
+            values = self.columns[sort].values.view()[candidates]
+            # Missing values sort last in either direction
+            key = np.where(values == _NumericColumn.MISSING, np.iinfo(np.int64).max,
+                           -values if descending else values)
+            k = min(limit, total)
+            top = np.argpartition(key, k - 1)[:k] if k < total else np.arange(total)
+            candidates = candidates[top[np.argsort(key[top], kind="stable")]]
+        return total, [self.items[doc] for doc in candidates[:limit]]
+
+    def _term_candidates(self, filters: dict[str, list[str]]) -> np.ndarray | None:
+        lists = []
+        for field, values in filters.items():
+            if not values:
+                continue
+            if field == "specialties":
+                # Every word of each wanted specialty must appear
+                for value in values:
+                    lists.extend(self._posting(field, term) for term in terms(field, value))
+                continue
+            union = [self._posting(field, t) for v in values for t in terms(field, v)]
+            lists.append(union[0] if len(union) == 1 else np.unique(np.concatenate(union)))
+        if not lists:
+            return None
+        lists.sort(key=len)
+        result = lists[0]
+        for ids in lists[1:]:
+            if not len(result):
+                break
+            result = np.intersect1d(result, ids, assume_unique=True)
+        return result
+
+    def _posting(self, field: str, term: str) -> np.ndarray:
+        posting = self.postings[field].get(term)
+        return posting.view() if posting is not None else np.empty(0, dtype=np.int64)
+
+
+def source_paths() -> list[str]:
+    return [p for p in settings.SEARCH_INDEX_SOURCES.split(os.pathsep) if p]
+
+
+index = CompanyIndex()
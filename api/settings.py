@@ -0,0 +1,134 @@
+"""
+Runtime settings for the API.
+
+Values are read once at import time. Each one can be overridden with an
+environment variable of the same name (e.g. ``LINKEDIN_MIN_INTERVAL=2``).
+"""
+
+import os
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+# ── Upstream sites ──
+# Where pages are fetched from. Point both at a local stand-in for load tests
+# (see benchmarks/loadtest.py); returned URLs still name linkedin.com.
+LINKEDIN_BASE_URL = os.environ.get("LINKEDIN_BASE_URL", "https://www.linkedin.com").rstrip("/")
+DDG_HTML_URL = os.environ.get("DDG_HTML_URL", "https://html.duckduckgo.com/html/")
+
+# ── Fetch backend ──
+# "http": requests through the per-host scheduler (api/scheduler.py).
+# "scrapy": the Scrapy spiders, run in-process on the API's event loop
+# (api/scrapy_backend.py; needs Scrapy >= 2.15 and aiohttp).
+FETCH_BACKEND = os.environ.get("FETCH_BACKEND", "http")
+
+# ── Per-host scheduling ──
+# Minimum number of seconds between two requests starting against a host.
+LINKEDIN_MIN_INTERVAL = _env_float("LINKEDIN_MIN_INTERVAL", 1.0)
+DDG_MIN_INTERVAL = _env_float("DDG_MIN_INTERVAL", 2.0)
+DEFAULT_MIN_INTERVAL = _env_float("DEFAULT_MIN_INTERVAL", 1.0)
+
+# Maximum number of requests in flight against a single host.
+HOST_CONCURRENCY = _env_int("HOST_CONCURRENCY", 4)
+
+# Threads running the blocking fetches (they mostly wait on the network).
+FETCH_THREADS = _env_int("FETCH_THREADS", 32)
+
+# ── Priority classes ──
+# Share of each host's rate budget per class while several classes are waiting.
+PRIORITY_WEIGHT_INTERACTIVE = _env_float("PRIORITY_WEIGHT_INTERACTIVE", 8)
+PRIORITY_WEIGHT_BATCH = _env_float("PRIORITY_WEIGHT_BATCH", 3)
+PRIORITY_WEIGHT_BACKGROUND = _env_float("PRIORITY_WEIGHT_BACKGROUND", 1)
+# A request queued this many seconds is served next whatever its class (0 disables).
+PRIORITY_MAX_WAIT = _env_float("PRIORITY_MAX_WAIT", 30)
+# API calls with at most this many lookups are "interactive", larger ones "batch".
+INTERACTIVE_MAX_ITEMS = _env_int("INTERACTIVE_MAX_ITEMS", 3)
+
+# ── Timeouts, retries and hedging ──
+CONNECT_TIMEOUT = _env_float("CONNECT_TIMEOUT", 5)
+READ_TIMEOUT = _env_float("READ_TIMEOUT", 20)
+# Total tries per request (1 disables retries); only transient failures are retried.
+RETRY_ATTEMPTS = _env_int("RETRY_ATTEMPTS", 3)
+RETRY_BACKOFF_BASE = _env_float("RETRY_BACKOFF_BASE", 0.5)
+RETRY_BACKOFF_MAX = _env_float("RETRY_BACKOFF_MAX", 8.0)
+# Send a duplicate request once a call has run longer than this quantile of the
+# host's recent latencies (e.g. 0.95). 0 disables hedging.
+HEDGE_QUANTILE = _env_float("HEDGE_QUANTILE", 0)
+# With a li_at cookie, start the DuckDuckGo profile lookup this many seconds
+# into an authenticated fetch that has not finished, instead of after it
+# fails. 0 disables racing.
+PROFILE_RACE_AFTER = _env_float("PROFILE_RACE_AFTER", 0)
+
+# ── Responses ──
+# Bodies smaller than this are sent uncompressed.
+COMPRESSION_MIN_SIZE = _env_int("COMPRESSION_MIN_SIZE", 1024)
+GZIP_LEVEL = _env_int("GZIP_LEVEL", 6)
+BROTLI_QUALITY = _env_int("BROTLI_QUALITY", 4)
+
+# ── Shared state (cache and rate limits) ──
+# SQLite file shared by all uvicorn workers on the host (e.g. /dev/shm/linkedin-api.sqlite).
+# Empty keeps the cache and token buckets in process memory.
+SHARED_STATE_PATH = os.environ.get("SHARED_STATE_PATH", "")
+# Seconds a scraped company/profile is served from the cache; 0 disables caching.
+CACHE_TTL = _env_float("CACHE_TTL", 600)
+CACHE_MAX_ENTRIES = _env_int("CACHE_MAX_ENTRIES", 10000)
+# How long other workers wait on the worker fetching the same key, and how often they poll.
+SINGLE_FLIGHT_TIMEOUT = _env_float("SINGLE_FLIGHT_TIMEOUT", 60)
+SINGLE_FLIGHT_POLL = _env_float("SINGLE_FLIGHT_POLL", 0.1)
+
+# ── Refresh-ahead (api/prefetch.py) ──
+# Number of most looked-up companies/profiles kept warm; 0 disables refresh-ahead.
+PREFETCH_TOP_N = _env_int("PREFETCH_TOP_N", 0)
+# Re-fetch a hot record once its cache entry expires within this many seconds.
+PREFETCH_AHEAD = _env_float("PREFETCH_AHEAD", 60)
+# Seconds between checks for records due a refresh.
+PREFETCH_INTERVAL = _env_float("PREFETCH_INTERVAL", 5)
+# Share of each host's rate (1 / *_MIN_INTERVAL) refreshes may use.
+PREFETCH_RATE_SHARE = _env_float("PREFETCH_RATE_SHARE", 0.25)
+# Lookups (estimated, decaying) before an entity is refreshed ahead.
+PREFETCH_MIN_HITS = _env_int("PREFETCH_MIN_HITS", 3)
+
+# ── Logo and photo assets (scraper_common/assets.py) ──
+# Directory of the content-addressed image store; empty disables the `assets` request option.
+ASSET_DIR = os.environ.get("ASSET_DIR", "")
+# Image downloads in flight at once (their own threads, apart from FETCH_THREADS).
+ASSET_CONCURRENCY = _env_int("ASSET_CONCURRENCY", 8)
+# Larger images are not stored.
+ASSET_MAX_BYTES = _env_int("ASSET_MAX_BYTES", 5 * 1024 * 1024)
+
+# ── Memory profiling (api/memory.py) ──
+# Token callers of GET /debug/memory send in X-Debug-Token; empty disables
+# tracing, request sampling and the endpoint.
+DEBUG_MEMORY_TOKEN = os.environ.get("DEBUG_MEMORY_TOKEN", "")
+# Frames kept per traced allocation (1 is enough for lines and modules); 0 leaves tracemalloc off.
+MEMORY_TRACE_FRAMES = _env_int("MEMORY_TRACE_FRAMES", 1)
+# Share of requests whose peak traced memory is recorded.
+MEMORY_SAMPLE_RATE = _env_float("MEMORY_SAMPLE_RATE", 0.01)
+
+# ── Company snapshots (time series of follower/employee/funding counts) ──
+# Directory of the append-only snapshot store; empty disables recording and the endpoints.
+SNAPSHOT_DIR = os.environ.get("SNAPSHOT_DIR", "")
+# Fold the append log into the compacted history once it reaches this size.
+SNAPSHOT_COMPACT_BYTES = _env_int("SNAPSHOT_COMPACT_BYTES", 4 * 1024 * 1024)
+
+# ── Company search index ──
+# Scraped output loaded into the /company/search index, separated by os.pathsep
+# (":" on Linux): Scrapy -O JSON files, JSON lines files or rotating feed directories.
+SEARCH_INDEX_SOURCES = os.environ.get("SEARCH_INDEX_SOURCES", "")
+
+# ── Company name index ──
+# Directory built with `python -m api.name_index build` from the directory crawl output.
+# When set, /company accepts company names and /company/resolve is enabled.
+NAME_INDEX_PATH = os.environ.get("NAME_INDEX_PATH", "")
@@ -0,0 +1,350 @@
+"""
+State shared by all API worker processes: a result cache and per-host token buckets.
+
+With ``uvicorn api.main:app --workers N`` every process imports its own copy
+of the app, so anything kept in process memory is multiplied by N — N caches,
+N rate budgets, and the same company fetched by N workers at once. Setting
+``SHARED_STATE_PATH`` moves that state into one SQLite file that all workers
+on the host open. Every operation is a single short transaction, so reads and
+updates are atomic across processes. Point it at tmpfs (``/dev/shm/...``) to
+keep it in shared memory.
+
+A transaction can wait up to 30 s for another process's write lock, so code
+on the event loop uses the async methods (``aget``, ``aclaim``, ...). With
+SQLite they run in the state's own thread; ``MemoryState`` runs them inline.
+
+Without ``SHARED_STATE_PATH`` an in-process ``MemoryState`` with the same
+interface is used, which is all a single worker needs.
+"""
+
+import asyncio
+import functools
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from api import deadlines, settings
+
+
+class SharedState(ABC):
+    """Cache, single-flight claims and token buckets behind one interface."""
+
+    @abstractmethod
+    def get(self, key: str):
+        """Return the cached value for ``key``, or None if missing or expired."""
+
+    @abstractmethod
+    def set(self, key: str, value, ttl: float) -> None:
+        """Cache a JSON-serializable ``value`` for ``ttl`` seconds."""
+
+    @abstractmethod
+    def expires_in(self, key: str) -> float | None:
+        """Seconds until the cached ``key`` expires, or None if missing or expired."""
+
+    @abstractmethod
+    def claim(self, key: str, ttl: float) -> bool:
+        """Try to become the only fetcher of ``key`` for up to ``ttl`` seconds."""
+
+    @abstractmethod
+    def unclaim(self, key: str) -> None:
+        """Drop this process's claim on ``key``."""
+
+    @abstractmethod
+    def acquire_rate(self, host: str, rate: float, burst: float) -> float:
+        """Reserve one request against ``host``'s token bucket.
+
+        Returns how many seconds the caller must wait before sending it.
+        """
+
+    # Async versions for the event loop
+
+    async def _call(self, method, *args):
+        return method(*args)
+
+    async def aget(self, key: str):
+        return await self._call(self.get, key)
+
+    async def aset(self, key: str, value, ttl: float) -> None:
+        await self._call(self.set, key, value, ttl)
+
+    async def aexpires_in(self, key: str) -> float | None:
+        return await self._call(self.expires_in, key)
+
+    async def aclaim(self, key: str, ttl: float) -> bool:
+        return await self._call(self.claim, key, ttl)
+
+    async def aunclaim(self, key: str) -> None:
+        await self._call(self.unclaim, key)
+
+    async def aacquire_rate(self, host: str, rate: float, burst: float) -> float:
+        return await self._call(self.acquire_rate, host, rate, burst)
+
+
+def _take_token(tokens: float, updated: float, now: float, rate: float, burst: float) -> float:
+    """Refill a bucket and spend one token. A negative balance is a reservation."""
+    return min(burst, tokens + (now - updated) * rate) - 1
+
+
+class MemoryState(SharedState):
+    """Process-local state (one uvicorn worker)."""
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._cache = OrderedDict()
+        self._claims = {}
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires < time.time():
+                del self._cache[key]
+                return None
+            self._cache.move_to_end(key)
+            return value
+
+    def expires_in(self, key: str) -> float | None:
+        with self._lock:
+            entry = self._cache.get(key)
+        left = entry[1] - time.time() if entry is not None else -1
+        return left if left >= 0 else None
+
+    def set(self, key: str, value, ttl: float) -> None:
+        with self._lock:
+            self._cache[key] = (value, time.time() + ttl)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+
+    def claim(self, key: str, ttl: float) -> bool:
+        now = time.time()
+        with self._lock:
+            if self._claims.get(key, 0) > now:
+                return False
+            self._claims[key] = now + ttl
+            return True
+
+    def unclaim(self, key: str) -> None:
+        with self._lock:
+            self._claims.pop(key, None)
+
+    def acquire_rate(self, host: str, rate: float, burst: float) -> float:
+        now = time.time()
+        with self._lock:
+            tokens, updated = self._buckets.get(host, (burst, now))
+            tokens = _take_token(tokens, updated, now, rate, burst)
+            self._buckets[host] = (tokens, now)
+        return max(0.0, -tokens / rate)
+
+
+class SqliteState(SharedState):
+    """State in one SQLite file shared by every worker process on the host."""
+
+    def __init__(self, path: str, max_entries: int = 10000):
+        self.path = path
+        self.max_entries = max_entries
+        self.owner = str(os.getpid())
+        self._lock = threading.Lock()
+        self._writes = 0
+        # Async calls run here, off the event loop; one thread is enough since
+        # every operation holds self._lock
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="shared-state")
+        self.db = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")  # a cache may lose its tail on power loss
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                expires REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS cache_expires ON cache (expires);
+            CREATE TABLE IF NOT EXISTS claims (
+                key TEXT PRIMARY KEY,
+                owner TEXT NOT NULL,
+                expires REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS buckets (
+                host TEXT PRIMARY KEY,
+                tokens REAL NOT NULL,
+                updated REAL NOT NULL
+            );
+        """)
+
+    def _transaction(self):
+        return _Immediate(self.db, self._lock)
+
+    async def _call(self, method, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, method, *args)
+
+    def get(self, key: str):
+        with self._lock:
+            row = self.db.execute(
+                "SELECT value FROM cache WHERE key = ? AND expires >= ?", (key, time.time())
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def expires_in(self, key: str) -> float | None:
+        now = time.time()
+        with self._lock:
+            row = self.db.execute(
+                "SELECT expires FROM cache WHERE key = ? AND expires >= ?", (key, now)
+            ).fetchone()
+        return row[0] - now if row else None
+
+    def set(self, key: str, value, ttl: float) -> None:
+        data = json.dumps(value, ensure_ascii=False)
+        now = time.time()
+        with self._transaction():
+            self.db.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires) VALUES (?, ?, ?)",
+                (key, data, now + ttl),
+            )
+            self._writes += 1
+            if self._writes % 100 == 0:
+                self._prune(now)
+
+    def _prune(self, now: float) -> None:
+        self.db.execute("DELETE FROM cache WHERE expires < ?", (now,))
+        self.db.execute("DELETE FROM claims WHERE expires < ?", (now,))
+        self.db.execute(
+            "DELETE FROM cache WHERE key IN ("
+            "SELECT key FROM cache ORDER BY expires DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+
+    def claim(self, key: str, ttl: float) -> bool:
+        now = time.time()
+        with self._transaction():
+            row = self.db.execute(
+                "SELECT expires FROM claims WHERE key = ?", (key,)
+            ).fetchone()
+            if row and row[0] > now:
+                return False
+            self.db.execute(
+                "INSERT OR REPLACE INTO claims (key, owner, expires) VALUES (?, ?, ?)",
+                (key, self.owner, now + ttl),
+            )
+        return True
+
+    def unclaim(self, key: str) -> None:
+        with self._transaction():
+            self.db.execute(
+                "DELETE FROM claims WHERE key = ? AND owner = ?", (key, self.owner)
+            )
+
+    def acquire_rate(self, host: str, rate: float, burst: float) -> float:
+        now = time.time()
+        with self._transaction():
+            row = self.db.execute(
+                "SELECT tokens, updated FROM buckets WHERE host = ?", (host,)
+            ).fetchone()
+            tokens, updated = row if row else (burst, now)
+            tokens = _take_token(tokens, updated, now, rate, burst)
+            self.db.execute(
+                "INSERT OR REPLACE INTO buckets (host, tokens, updated) VALUES (?, ?, ?)",
+                (host, tokens, now),
+            )
+        return max(0.0, -tokens / rate)
+
+
+class _Immediate:
+    """``BEGIN IMMEDIATE`` … ``COMMIT``: takes the write lock up front."""
+
+    def __init__(self, db, lock):
+        self.db = db
+        self.lock = lock
+
+    def __enter__(self):
+        self.lock.acquire()
+        try:
+            self.db.execute("BEGIN IMMEDIATE")
+        except BaseException:
+            self.lock.release()
+            raise
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            self.db.execute("ROLLBACK" if exc_type else "COMMIT")
+        finally:
+            self.lock.release()
+
+
+def open_state(path: str | None, max_entries: int = 10000) -> SharedState:
+    if path:
+        return SqliteState(path, max_entries)
+    return MemoryState(max_entries)
+
+
+state = open_state(settings.SHARED_STATE_PATH, settings.CACHE_MAX_ENTRIES)
+
+# Fetches of the same key in flight in this process (see ``single_flight``).
+_inflight: dict[str, asyncio.Task] = {}
+
+
+async def single_flight(key: str, fetch, ttl: float, should_cache=None):
+    """Return the cached value for ``key``, or run ``fetch()`` exactly once for it.
+
+    Concurrent callers in this process share one task; callers in other
+    processes see the claim and poll the cache until the owner stores the
+    value (or the claim lapses, after which they fetch themselves).
+    ``should_cache(value)`` can veto caching, e.g. of error results.
+
+    The fetch runs detached from its callers: one caller giving up does not
+    cancel it for the others, and a late result still lands in the cache.
+    It runs under the deadline of the caller that started it, so a caller
+    with time left refetches if that deadline cut it short. Callers that
+    join a fetch already in flight count as started for their own deadline
+    (``deadlines.mark_started``): they report "timeout", not "skipped".
+    """
+    while True:
+        value = await state.aget(key)
+        if value is not None:
+            return value
+        task = _inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(_fetch_once(key, fetch, ttl, should_cache))
+            _inflight[key] = task
+            task.add_done_callback(functools.partial(_fetch_done, key))
+        else:
+            deadlines.mark_started()
+        try:
+            return await asyncio.shield(task)
+        except deadlines.DeadlineExceeded:
+            if deadlines.remaining() is None or deadlines.expired():
+                raise
+
+
+def _fetch_done(key: str, task: asyncio.Task) -> None:
+    if _inflight.get(key) is task:
+        del _inflight[key]
+    if not task.cancelled():
+        task.exception()  # retrieved: don't warn when every caller gave up
+
+
+async def _fetch_once(key: str, fetch, ttl: float, should_cache):
+    deadline = time.monotonic() + settings.SINGLE_FLIGHT_TIMEOUT
+    while not await state.aclaim(key, settings.SINGLE_FLIGHT_TIMEOUT):
+        deadlines.mark_started()  # another worker is fetching it
+        await asyncio.sleep(settings.SINGLE_FLIGHT_POLL)
+        value = await state.aget(key)
+        if value is not None:
+            return value
+        if time.monotonic() > deadline:
+            break  # owner is stuck or gone; fetch ourselves
+    try:
+        value = await fetch()
+        if should_cache is None or should_cache(value):
+            await state.aset(key, value, ttl)
+        return value
+    finally:
+        await state.aunclaim(key)
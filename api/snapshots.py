@@ -0,0 +1,14 @@
+"""
+The API's company snapshot store (``SNAPSHOT_DIR``; the store itself is
+``scraper_common.snapshots``). None when ``SNAPSHOT_DIR`` is not set.
+"""
+
+from api import settings
+from scraper_common.snapshots import SnapshotStore
+
+
+def open_store(directory: str | None) -> SnapshotStore | None:
+    return SnapshotStore(directory, settings.SNAPSHOT_COMPACT_BYTES) if directory else None
+
+
+store = open_store(settings.SNAPSHOT_DIR)
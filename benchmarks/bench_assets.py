@@ -0,0 +1,100 @@
+"""
+Downloading the logos behind scraped items: one request per item vs ``scraper_common.assets``.
+
+Items point at ``--urls`` distinct image URLs on the stand-in server, which
+serve ``--assets`` distinct images (a CDN serves one logo under several
+sizes and query strings); popular URLs are shared by many items.
+
+- per item (before): each item's image downloaded on its own, one after
+  another, and written to a file named after the URL.
+- asset store, cold: ``AssetFetcher.fetch_all`` with ``--concurrency``
+  threads; each URL downloaded once, each image stored once.
+- asset store, warm: the same items again; every URL is in the index.
+
+    python -m benchmarks.bench_assets
+"""
+
+import argparse
+import asyncio
+import hashlib
+import os
+import random
+import tempfile
+import time
+
+import requests
+
+from scraper_common.assets import AssetFetcher, AssetStore
+from benchmarks.standin import StandInServer
+
+
+def item_urls(server: StandInServer, args) -> list[str]:
+    rng = random.Random(1)
+    urls = [
+        f"{server.url}/media/logo-{i % args.assets}/{100 * (1 + i // args.assets)}_{100 * (1 + i // args.assets)}"
+        f"?e={i}"
+        for i in range(args.urls)
+    ]
+    weights = [1 / (rank + 1) for rank in range(len(urls))]
+    return rng.choices(urls, weights, k=args.items)
+
+
+def per_item(urls: list[str], root: str) -> None:
+    os.makedirs(root, exist_ok=True)
+    with requests.Session() as session:
+        for url in urls:
+            data = session.get(url, timeout=20).content
+            name = hashlib.sha1(url.encode()).hexdigest()
+            with open(os.path.join(root, f"{name}.png"), "wb") as f:
+                f.write(data)
+
+
+def disk_usage(root: str) -> tuple[int, int]:
+    files = size = 0
+    for directory, _, names in os.walk(root):
+        for name in names:
+            if name.endswith((".png", ".jpg")):
+                files += 1
+                size += os.path.getsize(os.path.join(directory, name))
+    return files, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=1000)
+    parser.add_argument("--urls", type=int, default=300)
+    parser.add_argument("--assets", type=int, default=100)
+    parser.add_argument("--delay", type=float, default=0.02, help="seconds per image request")
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    server = StandInServer(delay=args.delay)
+    with server, tempfile.TemporaryDirectory() as tmp:
+        urls = item_urls(server, args)
+        print(
+            f"{args.items} items, {len(set(urls))} distinct URLs of {args.assets} images, "
+            f"{args.delay * 1000:.0f} ms per request\n"
+        )
+        print(f"{'':<22}{'time':>8}{'requests':>10}{'files':>7}{'on disk':>10}")
+
+        def report(label, run, root):
+            sent, begin = server.requests, time.perf_counter()
+            run()
+            elapsed = time.perf_counter() - begin
+            files, size = disk_usage(root)
+            print(f"{label:<22}{elapsed:7.2f}s{server.requests - sent:10d}{files:7d}{size / 1e6:8.1f}MB")
+
+        flat = os.path.join(tmp, "per-item")
+        report("per item (before)", lambda: per_item(urls, flat), flat)
+        root = os.path.join(tmp, "store")
+        fetcher = AssetFetcher(AssetStore(root), concurrency=args.concurrency)
+        try:
+            report("asset store, cold", lambda: asyncio.run(fetcher.fetch_all(urls)), root)
+            report("asset store, warm", lambda: asyncio.run(fetcher.fetch_all(urls)), root)
+            print(f"\nfetcher stats: {dict(fetcher.stats)}")
+        finally:
+            fetcher.close()
+
+
+if __name__ == "__main__":
+    main()
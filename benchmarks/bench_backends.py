@@ -0,0 +1,130 @@
+"""
+Company and profile lookups through the plain HTTP backend vs the in-process Scrapy backend.
+
+Starts the stand-in server in a subprocess, points the API settings at it
+(no minimum interval, caching off) and runs the same ``/company`` and
+``/profile`` batches (profiles without ``li_at``, so through the DuckDuckGo
+stand-in) through ``run_company_scraper`` / ``run_profile_scraper`` with each
+``FetchBackend``. Reports throughput, per-batch latency, CPU time per lookup
+in this process, and lookups that came back without data.
+
+    python -m benchmarks.bench_backends
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+
+
+def percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+# Lookup function and the field a successful lookup fills, per kind
+KINDS = {
+    "company": ("run_company_scraper", "company_name"),
+    "profile": ("run_profile_scraper", "name"),
+}
+
+
+async def measure(runner, kind: str, args) -> dict:
+    name, filled = KINDS[kind]
+    lookup = getattr(runner, name)
+    batches, errors, latencies = 0, 0, []
+    # Warm-up: starts the Scrapy crawl, opens connections
+    await lookup([f"warmup{i}" for i in range(args.concurrency)])
+    cpu, begin = time.process_time(), time.perf_counter()
+
+    async def client(c: int):
+        nonlocal batches, errors
+        for b in range(args.batches):
+            handles = [f"{kind[0]}{c}-{b}-{i}" for i in range(args.batch_size)]
+            start = time.perf_counter()
+            items = await lookup(handles, priority="batch")
+            latencies.append(time.perf_counter() - start)
+            errors += sum(item.status != "ok" or getattr(item, filled) is None for item in items)
+            batches += 1
+
+    await asyncio.gather(*(client(c) for c in range(args.clients)))
+    elapsed, cpu = time.perf_counter() - begin, time.process_time() - cpu
+    lookups = batches * args.batch_size
+    return {
+        "lookups_per_s": lookups / elapsed,
+        "p50": percentile(latencies, 0.5),
+        "p95": percentile(latencies, 0.95),
+        "cpu_ms": 1000 * cpu / lookups,
+        "errors": errors,
+    }
+
+
+async def run(args):
+    from api import scraper_runner
+    from api.scrapy_backend import ScrapyBackend
+
+    backends = {
+        "http (before)": scraper_runner.HttpBackend,
+        "scrapy": ScrapyBackend,
+    }
+    print(
+        f"{args.clients} clients x {args.batches} batches of {args.batch_size} lookups; "
+        f"host concurrency {args.concurrency}, stand-in delay {args.delay * 1000:.0f} ms\n"
+    )
+    print(f"{'':<24}{'lookups/s':>10}{'batch p50':>11}{'batch p95':>11}{'CPU/lookup':>12}{'errors':>8}")
+    for label, backend in backends.items():
+        scraper_runner.backend = backend()
+        for kind in KINDS:
+            r = await measure(scraper_runner, kind, args)
+            row = f"{label} {kind}"
+            print(
+                f"{row:<24}{r['lookups_per_s']:10.1f}"
+                f"{r['p50'] * 1000:9.0f}ms{r['p95'] * 1000:9.0f}ms"
+                f"{r['cpu_ms']:10.2f}ms{r['errors']:8d}"
+            )
+        await scraper_runner.backend.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, default=4)
+    parser.add_argument("--batches", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=16, help="HOST_CONCURRENCY")
+    parser.add_argument("--delay", type=float, default=0.05, help="stand-in seconds per response")
+    args = parser.parse_args()
+
+    port = _free_port()
+    standin = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.standin", "--port", str(port), "--delay", str(args.delay)],
+        stdout=subprocess.DEVNULL,
+    )
+    try:
+        # The API reads its settings at import time
+        os.environ.update({
+            "LINKEDIN_BASE_URL": f"http://127.0.0.1:{port}",
+            "DDG_HTML_URL": f"http://127.0.0.1:{port}/html/",
+            "LINKEDIN_MIN_INTERVAL": "0",
+            "DDG_MIN_INTERVAL": "0",
+            "DEFAULT_MIN_INTERVAL": "0",
+            "HOST_CONCURRENCY": str(args.concurrency),
+            "CACHE_TTL": "0",
+        })
+        time.sleep(1)
+        asyncio.run(run(args))
+    finally:
+        standin.terminate()
+        standin.wait()
+
+
+if __name__ == "__main__":
+    main()
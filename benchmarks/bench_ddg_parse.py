@@ -0,0 +1,81 @@
+"""
+Parse time of a DuckDuckGo results page: parsel selectors vs ``ddg_results``.
+
+Both sides pick the profile fallback's result (first whose URL has the
+handle, else the first) and return its link, displayed URL, title and
+snippet as text; the outputs are checked to be equal.
+
+- parsel (before): a ``Selector`` over the whole page, ``div.result`` blocks,
+  the anchors serialized back to HTML, tags stripped and unescaped.
+- one pass: ``ddg_results.best_result``.
+
+Pages come from ``pages.ddg_page`` (matching result mid-list), plus one where
+no result matches and the whole page is scanned.
+
+    python -m benchmarks.bench_ddg_parse
+"""
+
+import argparse
+import html
+import re
+import timeit
+
+from parsel import Selector
+
+from benchmarks.pages import SAMPLE_PROFILE, ddg_page
+from scraper_common import ddg_results
+
+
+def selector_result(page: str, handle: str) -> ddg_results.Result | None:
+    """The result the previous parsel-based code used."""
+    sel = Selector(text=page)
+    results = sel.css("div.result") or sel.css("div.results_links")
+    best = None
+    for r in results:
+        url_text = (r.css("a.result__url::text").get("") or r.css("a.result__a::attr(href)").get("")).strip()
+        if handle.lower() in url_text.lower():
+            best = r
+            break
+    if best is None and results:
+        best = results[0]
+    if best is None:
+        return None
+
+    def text(css: str) -> str:
+        return html.unescape(re.sub(r"<[^>]+>", "", best.css(css).get("")).strip())
+
+    return ddg_results.Result(
+        best.css("a.result__a::attr(href)").get(""),
+        best.css("a.result__url::text").get("").strip(),
+        text("a.result__a"),
+        text("a.result__snippet"),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=2000)
+    args = parser.parse_args()
+
+    name = f"{SAMPLE_PROFILE['first_name']} {SAMPLE_PROFILE['last_name']}"
+    cases = {}
+    for n_results in (10, 30):
+        page = ddg_page(SAMPLE_PROFILE["handle"], name, SAMPLE_PROFILE["headline"],
+                        SAMPLE_PROFILE["about"], n_results)
+        cases[f"{n_results} results, match mid-list"] = (page, SAMPLE_PROFILE["handle"])
+    cases["30 results, no match"] = (page, "no-such-handle")
+
+    print(f"{args.number} parses per case\n")
+    print(f"{'':<30}{'page KB':>8}{'parsel µs':>11}{'one pass µs':>13}{'speed-up':>10}")
+    for label, (page, handle) in cases.items():
+        assert ddg_results.best_result(page, handle) == selector_result(page, handle), label
+        before = timeit.timeit(lambda: selector_result(page, handle), number=args.number)
+        after = timeit.timeit(lambda: ddg_results.best_result(page, handle), number=args.number)
+        print(
+            f"{label:<30}{len(page) / 1024:8.1f}{before / args.number * 1e6:11.1f}"
+            f"{after / args.number * 1e6:13.1f}{before / after:9.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
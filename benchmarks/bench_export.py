@@ -0,0 +1,124 @@
+"""
+Loading and filtering scraped companies: JSON lines vs the columnar export.
+
+Writes synthetic company records the way crawls produce them (counts
+sometimes as text, ``"not-found"`` sentinels, sizes like ``"201-500"``,
+funding dates as ``"Sep 14, 2023"``) to a JSON lines file, exports them with
+``api.export`` and runs the same query both ways:
+
+- JSON (before): load the file, re-parse the strings of every record and
+  filter in Python.
+- Parquet: ``pyarrow.parquet.read_table`` with the columns and filters
+  (statistics skip row groups; rows clustered with ``--sort-by``).
+
+The query: companies of at least 201 people, funded since 2023, with more
+than 1,000 employees on LinkedIn; names and follower counts.
+
+    python -m benchmarks.bench_export
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import tempfile
+import time
+from datetime import datetime
+
+import pyarrow.parquet as pq
+
+from api import export
+from benchmarks.bench_search import generate
+
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+
+def scraped(records: list[dict]) -> list[dict]:
+    """``records`` with the string forms and sentinels found in crawl output."""
+    for i, record in enumerate(records):
+        record["num_of_employees"] = "not-found" if i % 7 == 0 else f"{record['num_of_employees']:,}"
+        record["last_funding_round"] = (
+            "not-found" if i % 5 == 0 else f"{MONTHS[i % 12]} {1 + i % 28}, {2015 + i % 11}"
+        )
+        record["funding"] = "not-found" if i % 3 == 0 else f"US$ {1 + i % 900 / 10:.1f}M"
+    return records
+
+
+def json_query(path: str) -> list[tuple]:
+    since = datetime(2023, 1, 1)
+    found = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            record = json.loads(line)
+            size = re.match(r"\s*(\d[\d,]*)", record.get("company_size_approx") or "")
+            employees = record.get("num_of_employees")
+            funded = record.get("last_funding_round")
+            if not size or int(size.group(1).replace(",", "")) < 201:
+                continue
+            if employees in (None, "not-found") or int(str(employees).replace(",", "")) <= 1000:
+                continue
+            if funded in (None, "not-found") or datetime.strptime(funded, "%b %d, %Y") < since:
+                continue
+            found.append((record["company_name"], record["linkedin_followers_count"]))
+    return found
+
+
+def parquet_query(path: str) -> list[tuple]:
+    table = pq.read_table(
+        path,
+        columns=["company_name", "linkedin_followers_count"],
+        filters=[
+            ("company_size_min", ">=", 201),
+            ("last_funding_round", ">=", datetime(2023, 1, 1)),
+            ("num_of_employees", ">", 1000),
+        ],
+    )
+    return list(zip(*table.to_pydict().values()))
+
+
+def timed(fn, repeat: int):
+    runs, result = [], None
+    for _ in range(repeat):
+        begin = time.perf_counter()
+        result = fn()
+        runs.append(time.perf_counter() - begin)
+    return statistics.median(runs) * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--companies", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--sort-by", default="last_funding_round")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "companies.jsonl")
+        with open(source, "w", encoding="utf-8") as f:
+            for record in scraped(generate(args.companies)):
+                f.write(json.dumps(record) + "\n")
+        target = os.path.join(tmp, "companies.parquet")
+        begin = time.perf_counter()
+        table = export.company_table(export.read_records([source]))
+        normalized = time.perf_counter() - begin
+        export.write(table, target, sort_by=args.sort_by)
+        exported = time.perf_counter() - begin
+
+        print(f"{args.companies} companies; export {exported:.1f} s "
+              f"(reading and normalizing {normalized:.1f} s, writing the rest)\n")
+        print(f"{'':<16}{'file MB':>9}{'load + filter':>15}{'full load':>11}{'matches':>9}")
+        json_ms, expected = timed(lambda: json_query(source), max(1, args.repeat // 5))
+        parquet_ms, found = timed(lambda: parquet_query(target), args.repeat)
+        full_ms, _ = timed(lambda: pq.read_table(target), args.repeat)
+        assert sorted(found) == sorted(expected), (len(found), len(expected))
+        for label, path, query_ms, load_ms in (
+            ("JSON (before)", source, json_ms, None),
+            ("Parquet", target, parquet_ms, full_ms),
+        ):
+            load = f"{load_ms:9.0f}ms" if load_ms is not None else f"{'-':>11}"
+            print(f"{label:<16}{os.path.getsize(path) / 1e6:9.1f}{query_ms:13.0f}ms{load}{len(found):9d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""
+Per-item parse time of a company page with and without field projection.
+
+    python -m benchmarks.bench_field_projection
+"""
+
+import argparse
+import timeit
+
+from api.scraper_runner import _parse_company
+from benchmarks.pages import company_page
+
+PROJECTIONS = {
+    "all fields": None,
+    "followers + employees": ["linkedin_followers_count", "num_of_employees"],
+    "details only": ["industry", "headquarters", "company_size_approx"],
+    "funding only": ["funding_total_rounds", "last_funding_round"],
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=200)
+    parser.add_argument("--filler", type=int, default=400)
+    args = parser.parse_args()
+
+    page = company_page(n_filler=args.filler)
+    print(f"page size: {len(page) / 1024:.0f} KB, {args.number} iterations\n")
+
+    baseline = None
+    for label, fields in PROJECTIONS.items():
+        best = min(timeit.repeat(
+            lambda: _parse_company(page, fields), number=args.number, repeat=3
+        ))
+        per_item_ms = best / args.number * 1000
+        baseline = baseline or per_item_ms
+        print(f"{label:<24} {per_item_ms:7.3f} ms/item  ({per_item_ms / baseline:4.0%} of all fields)")
+
+
+if __name__ == "__main__":
+    main()
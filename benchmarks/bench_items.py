@@ -0,0 +1,70 @@
+"""
+Per-item memory and serialization time: free-form dicts vs typed items.
+
+    python -m benchmarks.bench_items
+"""
+
+import argparse
+import gc
+import json
+import timeit
+import tracemalloc
+
+from benchmarks.pages import SAMPLE_COMPANY
+from scraper_common.items import CompanyItem, dumps, orjson
+
+
+def legacy_dict(i: int) -> dict:
+    item = dict(SAMPLE_COMPANY)
+    item["company_name"] = f"Company {i}"
+    item["funding"] = "not-found"
+    return item
+
+
+def typed_item(i: int) -> CompanyItem:
+    item = CompanyItem(**SAMPLE_COMPANY)
+    item.company_name = f"Company {i}"
+    return item
+
+
+def bytes_per_item(factory, n: int) -> float:
+    """Memory held by ``n`` records, excluding the shared string values."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    records = [factory(i) for i in range(n)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del records
+    return (after - before) / n
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=20000)
+    parser.add_argument("--number", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{args.items} company records, orjson {'installed' if orjson else 'not installed'}\n")
+
+    print("memory per record")
+    print(f"  dict            {bytes_per_item(legacy_dict, args.items):7.0f} B")
+    print(f"  CompanyItem     {bytes_per_item(typed_item, args.items):7.0f} B")
+
+    dicts = [legacy_dict(i) for i in range(args.items)]
+    items = [typed_item(i) for i in range(args.items)]
+    cases = {
+        "json.dumps(dicts)": lambda: json.dumps(dicts, ensure_ascii=False).encode("utf-8"),
+        "json.dumps(to_dict)": lambda: json.dumps(
+            [item.to_dict() for item in items], ensure_ascii=False
+        ).encode("utf-8"),
+        "items.dumps(items)": lambda: dumps(items),
+    }
+    print("\nserialization per record")
+    for label, fn in cases.items():
+        best = min(timeit.repeat(fn, number=args.number, repeat=3))
+        print(f"  {label:<20} {best / args.number / args.items * 1e6:6.2f} us")
+
+
+if __name__ == "__main__":
+    main()
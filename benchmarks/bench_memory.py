@@ -0,0 +1,77 @@
+"""
+What memory profiling (``api.memory``) costs a worker.
+
+Parses company pages with ``_parse_company``, the allocation-heavy part of a
+lookup, under each setting:
+
+- off (before, and with ``DEBUG_MEMORY_TOKEN`` unset): tracemalloc is not
+  started and no middleware runs, so this is the cost when disabled.
+- tracing with ``MEMORY_TRACE_FRAMES`` of 1 and 10.
+- tracing with every parse measured as a sampled request.
+
+Then times one ``/debug/memory`` report after the parses, and checks that
+it finds the retained pages when some are kept alive on purpose.
+
+    python -m benchmarks.bench_memory
+"""
+
+import argparse
+import time
+import tracemalloc
+
+from api.memory import MemoryProfiler
+from api.scraper_runner import _parse_company
+from benchmarks.pages import company_page
+
+
+def per_parse(page: str, number: int, profiler: MemoryProfiler = None) -> float:
+    begin = time.perf_counter()
+    for _ in range(number):
+        start = profiler.begin_sample() if profiler else None
+        _parse_company(page)
+        if start is not None:
+            profiler.end_sample("/company", start, 0)
+    return (time.perf_counter() - begin) / number
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=300)
+    parser.add_argument("--keep", type=int, default=50, help="pages kept alive for the report to find")
+    args = parser.parse_args()
+
+    page = company_page()
+    print(f"{args.number} parses of a {len(page) / 1024:.0f} KB company page\n")
+    print(f"{'':<32}{'µs/parse':>10}{'overhead':>10}")
+    per_parse(page, 20)
+    base = per_parse(page, args.number)
+    print(f"{'off (before)':<32}{base * 1e6:10.0f}{'':>10}")
+    for label, frames, rate in (
+        ("tracing, 1 frame", 1, 0), ("tracing, 10 frames", 10, 0), ("tracing, every request sampled", 1, 1),
+    ):
+        profiler = MemoryProfiler(token="bench", frames=frames, sample_rate=rate)
+        profiler.start()
+        try:
+            took = per_parse(page, args.number, profiler if rate else None)
+        finally:
+            profiler.stop()
+        print(f"{label:<32}{took * 1e6:10.0f}{took / base - 1:10.0%}")
+
+    profiler = MemoryProfiler(token="bench", frames=1, sample_rate=1)
+    profiler.start()
+    try:
+        kept = [(page + str(i)).encode().decode() for i in range(args.keep)]  # like resp.text
+        begin = time.perf_counter()
+        report = profiler.report(limit=5)
+        took = time.perf_counter() - begin
+    finally:
+        profiler.stop()
+    grown = report["growth"][0]
+    print(f"\nreport: {took * 1000:.0f} ms, traced {report['traced']['current'] / 1e6:.1f} MB")
+    print(f"top growth: {grown['module']}:{grown['line']} +{grown['size_diff'] / 1e6:.1f} MB ({grown['code']})")
+    assert len(kept) == args.keep and grown["module"] == __name__
+    assert not tracemalloc.is_tracing()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Company name resolution: index size, open time and lookup latency.
+
+Builds the name index for synthetic directory output and times exact,
+prefix and one-typo lookups against a scan over the same normalized names
+(what resolving a name without the index would take, short of a network
+search).
+
+    python -m benchmarks.bench_name_index
+"""
+
+import argparse
+import os
+import random
+import statistics
+import string
+import tempfile
+import time
+
+from api.name_index import LEGAL_SUFFIXES, NameIndex, build, normalize, within_one_edit
+
+SYLLABLES = ["ka", "lo", "ri", "to", "ne", "va", "mi", "so", "ter", "nex", "bri", "quo", "zen",
+             "sol", "tec", "dat", "vio", "ra", "pix", "lum"]
+WORDS = ["Labs", "Systems", "Group", "Health", "Capital", "Solutions", "Digital", "Media",
+         "Partners", "Technologies", "Analytics", "Energy", "Foods", "Logistics"]
+SUFFIXES = sorted(s.title() for s in LEGAL_SUFFIXES) + [""] * 20
+
+
+def generate(n: int) -> dict[str, str]:
+    rng = random.Random(0)
+    pairs = {}
+    while len(pairs) < n:
+        stem = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).title()
+        name = " ".join(filter(None, [stem, rng.choice(WORDS) if rng.random() < 0.6 else "",
+                                      rng.choice(SUFFIXES)]))
+        pairs[name] = f"{stem.lower()}-{len(pairs)}"
+    return pairs
+
+
+def typo(rng: random.Random, text: str) -> str:
+    i = rng.randrange(len(text))
+    return rng.choice([
+        text[:i] + text[i + 1:],
+        text[:i] + rng.choice(string.ascii_lowercase) + text[i + 1:],
+        text[:i] + rng.choice(string.ascii_lowercase) + text[i:],
+    ])
+
+
+def timed(fn, queries) -> float:
+    """Median microseconds per call."""
+    runs = []
+    for q in queries:
+        begin = time.perf_counter()
+        fn(q)
+        runs.append(time.perf_counter() - begin)
+    return statistics.median(runs) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--names", type=int, default=200_000)
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+
+    pairs = generate(args.names)
+    rng = random.Random(1)
+    sample = rng.sample(list(pairs), args.queries)
+    typos = [typo(rng, normalize(name)) for name in sample]
+    prefixes = [normalize(name)[:4] for name in sample]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        begin = time.perf_counter()
+        rows = build(pairs, tmp)
+        built = time.perf_counter() - begin
+        size = sum(os.path.getsize(os.path.join(tmp, f)) for f in os.listdir(tmp))
+        begin = time.perf_counter()
+        index = NameIndex(tmp)
+        opened = time.perf_counter() - begin
+        print(f"{rows} names: built in {built:.1f} s, {size / 2**20:.1f} MB on disk, "
+              f"opened in {opened * 1000:.1f} ms\n")
+
+        keys = sorted(normalize(name) for name in pairs)
+        scans = {
+            "exact": lambda q: (lambda key: [k for k in keys if k == key])(normalize(q)),
+            "prefix": lambda q: (lambda key: [k for k in keys if k.startswith(key)][:10])(normalize(q)),
+            "one typo": lambda q: (lambda key: [k for k in keys if within_one_edit(key, k)])(normalize(q)),
+        }
+        lookups = {"exact": index.exact, "prefix": index.prefix, "one typo": index.fuzzy}
+        queries = {"exact": sample, "prefix": prefixes, "one typo": typos}
+
+        resolved = sum(index.resolve(q) == pairs[name] for q, name in zip(typos, sample))
+        listed = sum(any(m.handle == pairs[name] for m in index.lookup(q))
+                     for q, name in zip(typos, sample))
+        print(f"{'lookup':10} {'scan µs':>10} {'index µs':>10}")
+        for kind, fn in lookups.items():
+            slow = timed(scans[kind], queries[kind][:20])
+            fast = timed(fn, queries[kind])
+            print(f"{kind:10} {slow:10.0f} {fast:10.1f}")
+        print(f"\nnames with one typo: resolved to the right handle {resolved / len(typos):.1%}, "
+              f"right handle among the top 10 {listed / len(typos):.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Cost of telling a login wall or challenge from a company page.
+
+- parse everything (before): every 200 went through ``_parse_company``, so a
+  login wall came back as a record of empty fields.
+- classify first: ``page_class.classify`` on the status, URL and first
+  ``SNIFF_BYTES``; only ok pages are parsed.
+
+Also checks the label of each sample page, including a company whose name
+starts like a wall's title.
+
+    python -m benchmarks.bench_page_class
+"""
+
+import argparse
+import timeit
+
+from api.scraper_runner import _parse_company
+from benchmarks.pages import SAMPLE_COMPANY, authwall_page, challenge_page, company_page
+from scraper_common import page_class
+
+BASE = "https://www.linkedin.com"
+
+
+def filled(item) -> int:
+    return sum(value is not None for value in item.to_dict().values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=200)
+    args = parser.parse_args()
+
+    tricky = dict(SAMPLE_COMPANY, company_name="Sign Up Genius")
+    cases = {
+        "company page": (200, f"{BASE}/company/openai", company_page(), page_class.OK),
+        "company 'Sign Up Genius'": (200, f"{BASE}/company/scl", company_page(tricky), page_class.OK),
+        "login wall": (200, f"{BASE}/authwall?trk=x", authwall_page(), page_class.AUTHWALL),
+        "wall, same URL": (200, f"{BASE}/company/openai", authwall_page(), page_class.AUTHWALL),
+        "security check": (200, f"{BASE}/company/openai", challenge_page(), page_class.CHALLENGE),
+        "999": (999, f"{BASE}/company/openai", "", page_class.CHALLENGE),
+        "too many requests": (429, f"{BASE}/company/openai", "", page_class.RATE_LIMITED),
+    }
+
+    print(f"{args.number} pages per case\n")
+    print(f"{'':<24}{'KB':>6}{'label':>14}{'parse µs':>10}{'classify µs':>13}{'fields':>8}")
+    for label, (status, url, page, expected) in cases.items():
+        head = page.encode()
+        got = page_class.classify(status, url, head[:page_class.SNIFF_BYTES])
+        assert got == expected, (label, got)
+        parse = timeit.timeit(lambda: _parse_company(page), number=args.number)
+        classify = timeit.timeit(
+            lambda: page_class.classify(status, url, head[:page_class.SNIFF_BYTES]), number=args.number,
+        )
+        print(
+            f"{label:<24}{len(head) / 1024:6.0f}{got:>14}{parse / args.number * 1e6:10.0f}"
+            f"{classify / args.number * 1e6:13.1f}{filled(_parse_company(page)):8d}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Company lookups served warm with and without refresh-ahead (``api.prefetch``).
+
+Clients look up companies drawn from a Zipf distribution (a few handles get
+most lookups) through ``run_company_scraper`` against the stand-in server,
+with a short ``CACHE_TTL`` so entries expire many times during the run.
+
+- cache only (before): whoever asks after an entry expires waits for the fetch.
+- refresh-ahead: the top ``--top-n`` handles are re-fetched ``--ahead``
+  seconds before expiry, within ``--rate-share`` of the host's rate.
+
+A lookup counts as cold when it takes longer than half the stand-in's delay.
+
+    python -m benchmarks.bench_prefetch
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import time
+
+from benchmarks.standin import StandInServer
+
+
+def percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def zipf_handles(n: int, s: float, rng: random.Random, case: str):
+    weights = [1 / (rank + 1) ** s for rank in range(n)]
+    handles = [f"{case}-{rank}" for rank in range(n)]
+    while True:
+        yield from rng.choices(handles, weights, k=1000)
+
+
+async def measure(args, server: StandInServer, case: str, top_n: int):
+    from api.prefetch import prefetcher
+    from api.scraper_runner import run_company_scraper
+
+    prefetcher.top_n = top_n
+    prefetcher.start()
+    rng = random.Random(1)
+    handles = zipf_handles(args.companies, args.zipf, rng, case)
+    hot = {f"{case}-{rank}" for rank in range(args.top_n)}
+    latencies = {"hot": [], "other": []}
+    sent_before = server.requests
+    stop_at = time.monotonic() + args.duration
+
+    async def client():
+        while time.monotonic() < stop_at:
+            handle = next(handles)
+            begin = time.perf_counter()
+            await run_company_scraper([handle])
+            latencies["hot" if handle in hot else "other"].append(time.perf_counter() - begin)
+            await asyncio.sleep(rng.expovariate(1 / args.think))
+
+    await asyncio.gather(*(client() for _ in range(args.clients)))
+    refreshed = prefetcher.refreshed
+    await prefetcher.stop()
+    prefetcher.refreshed = 0
+    return latencies, server.requests - sent_before, refreshed
+
+
+async def run(args, server: StandInServer):
+    print(
+        f"{args.clients} clients for {args.duration:g}s each, {args.companies} companies (Zipf s={args.zipf}), "
+        f"CACHE_TTL={args.ttl:g}s, fetch {args.delay * 1000:.0f} ms\n"
+    )
+    print(f"{'':<22}{'lookups':>8}{'cold':>7}{'hot cold':>10}{'p50':>8}{'p95':>8}{'p99':>8}{'fetches':>9}{'refreshes':>11}")
+    cold_after = args.delay / 2
+    for label, top_n in (("cache only (before)", 0), (f"refresh-ahead top {args.top_n}", args.top_n)):
+        latencies, sent, refreshed = await measure(args, server, label.split()[0], top_n)
+        every = latencies["hot"] + latencies["other"]
+        cold = sum(t > cold_after for t in every) / len(every)
+        hot_cold = sum(t > cold_after for t in latencies["hot"]) / max(1, len(latencies["hot"]))
+        print(
+            f"{label:<22}{len(every):8d}{cold:7.1%}{hot_cold:10.1%}"
+            f"{percentile(every, 0.5) * 1000:6.0f}ms{percentile(every, 0.95) * 1000:6.0f}ms"
+            f"{percentile(every, 0.99) * 1000:6.0f}ms{sent:9d}{refreshed:11d}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--clients", type=int, default=4)
+    parser.add_argument("--think", type=float, default=0.02, help="mean seconds between a client's lookups")
+    parser.add_argument("--companies", type=int, default=500)
+    parser.add_argument("--zipf", type=float, default=1.1)
+    parser.add_argument("--ttl", type=float, default=6)
+    parser.add_argument("--delay", type=float, default=0.3, help="seconds per company fetch")
+    parser.add_argument("--min-interval", type=float, default=0.05, help="LINKEDIN_MIN_INTERVAL")
+    parser.add_argument("--top-n", type=int, default=20)
+    parser.add_argument("--ahead", type=float, default=2)
+    parser.add_argument("--rate-share", type=float, default=0.25)
+    args = parser.parse_args()
+
+    server = StandInServer(delay=args.delay)
+    with server:
+        # The API reads its settings at import time
+        os.environ.update({
+            "LINKEDIN_BASE_URL": server.url,
+            "LINKEDIN_MIN_INTERVAL": str(args.min_interval),
+            "CACHE_TTL": str(args.ttl),
+            "PREFETCH_AHEAD": str(args.ahead),
+            "PREFETCH_INTERVAL": "0.5",
+            "PREFETCH_RATE_SHARE": str(args.rate_share),
+            "PREFETCH_MIN_HITS": "3",
+            "HEDGE_QUANTILE": "0",
+        })
+        asyncio.run(run(args, server))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Queue wait of single interactive lookups while a bulk job saturates the host.
+
+A bulk job queues ``--bulk`` fetches against one rate-limited host at once;
+meanwhile single lookups arrive every ``--every`` seconds. Fetches are
+simulated (a fixed sleep in the scheduler's thread pool), so only the
+scheduling differs between the cases:
+
+- FIFO (before): everything in one class, lookups wait behind the backlog.
+- classes: lookups are interactive, the bulk job batch (``PRIORITY_WEIGHT_*``).
+
+    python -m benchmarks.bench_priority
+"""
+
+import argparse
+import asyncio
+import time
+
+from api import priorities
+from api.retry import RetryPolicy
+from api.scheduler import HostScheduler
+from api.shared_state import MemoryState
+
+URL = "https://host.test/item"
+
+
+def percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def measure(args, scheduler: HostScheduler, bulk_class: str):
+    def fetch():
+        time.sleep(args.fetch_ms / 1000)
+
+    async def bulk():
+        with priorities.scope(bulk_class):
+            await asyncio.gather(*(scheduler.run(URL, fetch) for _ in range(args.bulk)))
+
+    async def lookup():
+        begin = time.perf_counter()
+        with priorities.scope("interactive"):
+            await scheduler.run(URL, fetch)
+        return time.perf_counter() - begin
+
+    begin = time.perf_counter()
+    job = asyncio.create_task(bulk())
+    lookups = []
+    for _ in range(args.lookups):
+        await asyncio.sleep(args.every)
+        lookups.append(asyncio.create_task(lookup()))
+    waits = await asyncio.gather(*lookups)
+    await job
+    return waits, time.perf_counter() - begin
+
+
+async def run(args):
+    cases = {
+        "FIFO (before)": "interactive",
+        "classes": "batch",
+    }
+    print(
+        f"bulk job of {args.bulk} fetches, {args.lookups} single lookups every {args.every:g}s; "
+        f"host: {1 / args.interval:.0f} req/s, concurrency {args.concurrency}, "
+        f"{args.fetch_ms:g} ms per fetch\n"
+    )
+    print(f"{'':<16}{'lookup p50':>12}{'lookup p95':>12}{'lookup max':>12}{'bulk done':>11}")
+    for label, bulk_class in cases.items():
+        scheduler = HostScheduler(
+            default_min_interval=args.interval, concurrency=args.concurrency,
+            limiter=MemoryState(), retry=RetryPolicy(attempts=1), max_wait=args.max_wait or None,
+        )
+        waits, elapsed = await measure(args, scheduler, bulk_class)
+        print(
+            f"{label:<16}{percentile(waits, 0.5) * 1000:10.0f}ms{percentile(waits, 0.95) * 1000:10.0f}ms"
+            f"{max(waits) * 1000:10.0f}ms{elapsed:10.1f}s"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--bulk", type=int, default=300)
+    parser.add_argument("--lookups", type=int, default=20)
+    parser.add_argument("--every", type=float, default=0.25)
+    parser.add_argument("--interval", type=float, default=0.02, help="min seconds between requests")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--fetch-ms", type=float, default=30)
+    parser.add_argument("--max-wait", type=float, default=30)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Profile lookup latency with a li_at cookie, DuckDuckGo fallback after vs raced.
+
+Two stand-in servers play LinkedIn and DuckDuckGo. The LinkedIn one sends
+some authenticated fetches to the login wall (expired cookie), answers some
+with 503 and makes some slower than ``READ_TIMEOUT``, so those lookups end on
+DuckDuckGo. A few clients look up profiles back to back through the HTTP
+backend:
+
+- fallback (before): DuckDuckGo starts once the authenticated fetch fails.
+- race: DuckDuckGo starts ``--head-start`` seconds into an authenticated
+  fetch that has not finished (``PROFILE_RACE_AFTER``).
+
+Latency is reported separately for lookups LinkedIn answered and those
+DuckDuckGo answered, with the DuckDuckGo requests each case sent. With
+``--fields`` limited to what DuckDuckGo has (e.g. ``name,headline``), a
+DuckDuckGo record can end the race before LinkedIn answers.
+
+    python -m benchmarks.bench_profile_race
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+from benchmarks.standin import StandInServer
+
+
+def percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def tracked(backend_cls):
+    """``backend_cls`` noting the handles LinkedIn answered."""
+
+    class Tracked(backend_cls):
+        def __init__(self):
+            self.answered = set()
+
+        async def _authenticated(self, handle, li_at, fields):
+            item = await super()._authenticated(handle, li_at, fields)
+            if item is not None:
+                self.answered.add(handle)
+            return item
+
+    return Tracked
+
+
+async def measure(backend, ddg: StandInServer, args, case: str):
+    by_source = {"linkedin": [], "duckduckgo": []}
+    errors = 0
+    remaining = iter(range(args.lookups))
+
+    async def client():
+        nonlocal errors
+        for i in remaining:
+            begin = time.perf_counter()
+            handle = f"{case}-{i}"
+            item = await backend.profile(handle, li_at="cookie", fields=args.fields)
+            elapsed = time.perf_counter() - begin
+            if item.status != "ok" or item.name is None:
+                errors += 1
+            by_source["linkedin" if handle in backend.answered else "duckduckgo"].append(elapsed)
+
+    sent_before = ddg.requests
+    await asyncio.gather(*(client() for _ in range(args.clients)))
+    return by_source, errors, ddg.requests - sent_before
+
+
+async def run(args, linkedin: StandInServer, ddg: StandInServer):
+    from api import settings
+    from api.scraper_runner import HttpBackend
+
+    cases = {
+        "fallback (before)": 0,
+        f"race after {args.head_start:g}s": args.head_start,
+    }
+    print(
+        f"{args.lookups} profile lookups, {args.clients} clients; authenticated fetch "
+        f"{args.delay * 1000:.0f} ms, {args.expired:.0%} login wall, {args.error_rate:.0%} 503, "
+        f"{args.slow_rate:.0%} slower than READ_TIMEOUT={settings.READ_TIMEOUT:g}s\n"
+    )
+    print(f"{'':<20}{'p50':>8}{'p95':>8}{'mean':>8}{'linkedin':>10}{'DDG':>10}{'errors':>8}{'DDG sent':>10}")
+    for label, head_start in cases.items():
+        settings.PROFILE_RACE_AFTER = head_start
+        by_source, errors, sent = await measure(tracked(HttpBackend)(), ddg, args, label.split()[0])
+        latencies = by_source["linkedin"] + by_source["duckduckgo"]
+        means = {
+            source: f"{statistics.mean(values) * 1000:.0f}ms" if values else "-"
+            for source, values in by_source.items()
+        }
+        print(
+            f"{label:<20}{percentile(latencies, 0.5) * 1000:6.0f}ms{percentile(latencies, 0.95) * 1000:6.0f}ms"
+            f"{statistics.mean(latencies) * 1000:6.0f}ms{means['linkedin']:>10}{means['duckduckgo']:>10}"
+            f"{errors:8d}{sent:10d}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lookups", type=int, default=300)
+    parser.add_argument("--clients", type=int, default=4)
+    parser.add_argument("--head-start", type=float, default=0.3, help="PROFILE_RACE_AFTER")
+    parser.add_argument("--delay", type=float, default=0.15, help="seconds per authenticated fetch")
+    parser.add_argument("--ddg-delay", type=float, default=0.1, help="seconds per DuckDuckGo search")
+    parser.add_argument("--expired", type=float, default=0.2, help="share sent to the login wall")
+    parser.add_argument("--error-rate", type=float, default=0.05)
+    parser.add_argument("--slow-rate", type=float, default=0.05)
+    parser.add_argument("--read-timeout", type=float, default=2)
+    parser.add_argument("--fields", type=lambda s: s.split(","), default=None,
+                        help="comma-separated fields to request (default: all)")
+    args = parser.parse_args()
+
+    linkedin = StandInServer(
+        delay=args.delay, redirect_rate=args.expired, error_rate=args.error_rate,
+        slow_rate=args.slow_rate, slow_delay=args.read_timeout + 1,
+    )
+    ddg = StandInServer(delay=args.ddg_delay)
+    with linkedin, ddg:
+        # The API reads its settings at import time
+        os.environ.update({
+            "LINKEDIN_BASE_URL": linkedin.url,
+            "DDG_HTML_URL": f"{ddg.url}/html/",
+            "LINKEDIN_MIN_INTERVAL": "0",
+            "DDG_MIN_INTERVAL": "0",
+            "HOST_CONCURRENCY": str(args.clients),
+            "READ_TIMEOUT": str(args.read_timeout),
+            "CACHE_TTL": "0",
+        })
+        asyncio.run(run(args, linkedin, ddg))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Serialization time and bytes on the wire for a 50-item /company response.
+
+Compares the previous path (``response_model`` validation + stdlib JSON, no
+compression) with the current one (FastJSONResponse + CompressionMiddleware).
+The scraper is replaced by a stub returning synthetic items, so only the
+response path is measured.
+
+    python -m benchmarks.bench_responses
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from unittest import mock
+
+from fastapi import FastAPI
+
+from api.main import app
+from api.routes.company import CompanyResponse
+from benchmarks.pages import SAMPLE_COMPANY
+from scraper_common.items import CompanyItem
+
+WORDS = (
+    "platform data customers global teams cloud research mission build products "
+    "people services enterprise security innovation industry growth partners "
+    "technology solutions community world leading software health finance"
+).split()
+
+
+def make_items(n: int) -> list[CompanyItem]:
+    items = []
+    for i in range(n):
+        rng = random.Random(i)
+        about = " ".join(rng.choice(WORDS) for _ in range(150))  # ~1 KB, like real about_us
+        items.append(CompanyItem(**{
+            **SAMPLE_COMPANY,
+            "company_name": f"Company {i}",
+            "about_us": about,
+            "linkedin_followers_count": rng.randrange(10**6),
+        }))
+    return items
+
+
+def legacy_app(items) -> FastAPI:
+    legacy = FastAPI()
+
+    @legacy.post("/company", response_model=CompanyResponse)
+    async def search_companies():
+        data = [item.to_dict() for item in items]
+        return CompanyResponse(success=True, count=len(data), data=data)
+
+    return legacy
+
+
+async def post(asgi_app, path: str, body: bytes, accept_encoding: str) -> bytes:
+    """Call the ASGI app directly (no network, no test-client thread hop)."""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "POST", "scheme": "http", "path": path, "raw_path": path.encode(),
+        "query_string": b"", "root_path": "", "server": ("bench", 80), "client": ("bench", 1),
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"accept-encoding", accept_encoding.encode()),
+        ],
+    }
+    chunks = []
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    await asgi_app(scope, receive, send)
+    return b"".join(chunks)
+
+
+async def time_requests(asgi_app, accept_encoding: str, number: int) -> tuple[float, int]:
+    body = json.dumps({"companies": ["x"]}).encode()
+    await post(asgi_app, "/company", body, accept_encoding)  # warm-up
+    start = time.perf_counter()
+    for _ in range(number):
+        payload = await post(asgi_app, "/company", body, accept_encoding)
+    return (time.perf_counter() - start) / number, len(payload)
+
+
+async def run(args):
+    items = make_items(args.items)
+
+    async def fake_runner(companies, fields=None, **options):
+        return items
+
+    cases = [
+        ("response_model + json", legacy_app(items), "identity"),
+        ("FastJSONResponse", app, "identity"),
+        ("FastJSONResponse + gzip", app, "gzip"),
+        ("FastJSONResponse + br", app, "br, gzip"),
+    ]
+    print(f"{args.items}-item /company response, {args.number} requests each\n")
+    with mock.patch("api.routes.company.run_company_scraper", fake_runner):
+        for label, asgi_app, accept_encoding in cases:
+            elapsed, size = await time_requests(asgi_app, accept_encoding, args.number)
+            print(f"{label:<26} {elapsed * 1000:6.3f} ms/request  {size / 1024:6.1f} KB on the wire")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=50)
+    parser.add_argument("--number", type=int, default=500)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Company fetch latency (p50/p99) and error rate with retries and hedging.
+
+Runs ``_scrape_single_company`` through a ``HostScheduler`` against the
+local stand-in server, which answers most requests quickly but makes some
+slow, answers some with 503 and resets some connections. A few clients
+issue requests back to back; each request's latency is measured end to end,
+including retries, backoff and hedges.
+
+    python -m benchmarks.bench_retry
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from api.retry import RetryPolicy
+from api.scheduler import HostScheduler
+from api.scraper_runner import _scrape_single_company
+from api.shared_state import MemoryState
+from benchmarks.standin import StandInServer
+
+
+def percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def measure(server: StandInServer, scheduler: HostScheduler, requests: int, clients: int):
+    latencies, errors = [], 0
+    remaining = iter(range(requests))
+
+    async def client():
+        nonlocal errors
+        for i in remaining:
+            url = f"{server.url}/company/c{i}"
+            begin = time.perf_counter()
+            try:
+                await scheduler.run(url, _scrape_single_company, url, ["company_name"])
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - begin)
+
+    sent_before = server.requests
+    await asyncio.gather(*(client() for _ in range(clients)))
+    return latencies, errors, server.requests - sent_before
+
+
+async def run(args):
+    cases = {
+        "no retry (before)": dict(retry=RetryPolicy(attempts=1)),
+        "retry": dict(retry=RetryPolicy()),
+        "retry + hedge at p95": dict(retry=RetryPolicy(), hedge_quantile=0.95),
+    }
+    print(
+        f"{args.requests} requests, {args.clients} clients; stand-in: {args.slow_rate:.0%} slow "
+        f"({args.slow_delay:.0f}s), {args.error_rate:.0%} 503, {args.reset_rate:.0%} reset\n"
+    )
+    print(f"{'':<22}{'p50':>9}{'p99':>9}{'mean':>9}{'errors':>8}{'sent':>7}")
+    for label, options in cases.items():
+        scheduler = HostScheduler(
+            default_min_interval=0, concurrency=args.clients * 2, limiter=MemoryState(), **options
+        )
+        with StandInServer(
+            slow_rate=args.slow_rate, slow_delay=args.slow_delay,
+            error_rate=args.error_rate, reset_rate=args.reset_rate,
+        ) as server:
+            latencies, errors, sent = await measure(server, scheduler, args.requests, args.clients)
+        print(
+            f"{label:<22}{percentile(latencies, 0.5) * 1000:7.0f}ms"
+            f"{percentile(latencies, 0.99) * 1000:7.0f}ms"
+            f"{statistics.mean(latencies) * 1000:7.0f}ms{errors:8d}{sent:7d}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--clients", type=int, default=4)
+    parser.add_argument("--slow-rate", type=float, default=0.03)
+    parser.add_argument("--slow-delay", type=float, default=3.0)
+    parser.add_argument("--error-rate", type=float, default=0.01)
+    parser.add_argument("--reset-rate", type=float, default=0.01)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
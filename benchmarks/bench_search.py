@@ -0,0 +1,122 @@
+"""
+Company search: index build time and query latency vs a Python scan.
+
+Indexes synthetic company records and runs a few typical searches (term
+filters, numeric ranges, top-k by followers) through ``CompanyIndex.search``
+and through a list comprehension over the same records.
+
+    python -m benchmarks.bench_search
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from api.search_index import CompanyIndex, terms
+from benchmarks.pages import SAMPLE_COMPANY
+
+INDUSTRIES = ["Software Development", "Financial Services", "IT Services and IT Consulting",
+              "Hospital & Health Care", "Retail", "Education", "Manufacturing", "Marketing Services"]
+CITIES = ["London, England", "Paris, Île-de-France", "Berlin, Berlin", "New York, New York",
+          "San Francisco, California", "Austin, Texas", "Bangalore, Karnataka", "Toronto, Ontario"]
+SIZES = ["1-10", "11-50", "51-200", "201-500", "501-1,000", "1,001-5,000", "10,001+"]
+TYPES = ["Privately Held", "Public Company", "Self-Employed", "Nonprofit"]
+SPECIALTIES = ["fintech", "payments", "machine learning", "saas", "cloud", "security", "analytics",
+               "e-commerce", "healthcare", "consulting", "marketing", "edtech", "blockchain", "devops"]
+
+QUERIES = {
+    "fintech in London, 10k+ followers, top 20": dict(
+        filters={"headquarters": ["london"], "specialties": ["fintech"]},
+        ranges={"linkedin_followers_count": (10_000, None)},
+        sort="linkedin_followers_count",
+    ),
+    "industry + size, by employees": dict(
+        filters={"industry": ["software development"], "company_size_approx": ["51-200"]},
+        sort="num_of_employees",
+    ),
+    "followers range only": dict(
+        ranges={"linkedin_followers_count": (1_000_000, 1_200_000)},
+    ),
+    "top 20 by followers, no filter": dict(sort="linkedin_followers_count"),
+}
+
+
+def generate(n: int) -> list[dict]:
+    rng = random.Random(0)
+    return [
+        {
+            **SAMPLE_COMPANY,
+            "company_name": f"company-{i}",
+            "industry": rng.choice(INDUSTRIES),
+            "headquarters": rng.choice(CITIES),
+            "company_size_approx": rng.choice(SIZES),
+            "type": rng.choice(TYPES),
+            "specialties": ", ".join(rng.sample(SPECIALTIES, 3)),
+            "linkedin_followers_count": int(rng.paretovariate(1.2) * 500),
+            "num_of_employees": rng.randrange(1, 20_000),
+        }
+        for i in range(n)
+    ]
+
+
+def scan(records: list[dict], filters=None, ranges=None, sort=None, limit=20):
+    """Baseline: test every record, then sort the matches."""
+    wanted = {f: [terms(f, v) for v in values] for f, values in (filters or {}).items()}
+
+    def match(record):
+        for field, options in wanted.items():
+            have = set(terms(field, record[field]))
+            if field == "specialties":
+                if not all(set(words) <= have for words in options):
+                    return False
+            elif not any(set(words) <= have for words in options):
+                return False
+        for field, (low, high) in (ranges or {}).items():
+            value = record[field]
+            if value is None or (low is not None and value < low) or (high is not None and value > high):
+                return False
+        return True
+
+    hits = [r for r in records if match(r)]
+    if sort:
+        hits.sort(key=lambda r: r[sort], reverse=True)
+    return len(hits), hits[:limit]
+
+
+def timed(fn, repeat: int) -> float:
+    runs = []
+    for _ in range(repeat):
+        begin = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - begin)
+    return statistics.median(runs) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--companies", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    records = generate(args.companies)
+    index = CompanyIndex()
+    begin = time.perf_counter()
+    for record in records:
+        index.add(record, record["company_name"])
+    build = time.perf_counter() - begin
+    print(f"{args.companies} companies indexed in {build:.1f} s "
+          f"({build / args.companies * 1e6:.1f} µs/company)\n")
+
+    print(f"{'query':44} {'matches':>8} {'scan ms':>9} {'index ms':>9}")
+    for name, query in QUERIES.items():
+        total, _ = index.search(**query)
+        expected, _ = scan(records, **query)
+        assert total == expected, (name, total, expected)
+        slow = timed(lambda: scan(records, **query), max(1, args.repeat // 10))
+        fast = timed(lambda: index.search(**query), args.repeat)
+        print(f"{name:44} {total:8d} {slow:9.1f} {fast:9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Cost per shared-state operation under contention from several worker processes.
+
+Each process opens the state itself (as a uvicorn worker would) and runs a
+tight loop of cache hits, cache writes or token-bucket reservations against
+the same keys. The process-local ``MemoryState`` is the baseline.
+
+    python -m benchmarks.bench_shared_state
+    python -m benchmarks.bench_shared_state --path /dev/shm/bench-state.sqlite
+"""
+
+import argparse
+import multiprocessing as mp
+import os
+import tempfile
+import time
+
+from api.shared_state import MemoryState, SqliteState
+from benchmarks.pages import SAMPLE_COMPANY
+
+OPERATIONS = {
+    "get (hit)": lambda state, i: state.get(f"company:{i % 100}"),
+    "set": lambda state, i: state.set(f"company:{i % 100}", SAMPLE_COMPANY, 600),
+    "acquire_rate": lambda state, i: state.acquire_rate("www.linkedin.com", 1e9, 1e9),
+}
+
+
+def worker(path, op, number, start, results):
+    state = SqliteState(path) if path else MemoryState()
+    for i in range(100):
+        state.set(f"company:{i}", SAMPLE_COMPANY, 600)
+    fn = OPERATIONS[op]
+    start.wait()
+    begin = time.perf_counter()
+    for i in range(number):
+        fn(state, i)
+    results.put(time.perf_counter() - begin)
+
+
+def measure(path, op, processes, number) -> float:
+    """Mean wall time per operation, as seen by one worker."""
+    start = mp.Event()
+    results = mp.Queue()
+    procs = [
+        mp.Process(target=worker, args=(path, op, number, start, results))
+        for _ in range(processes)
+    ]
+    for p in procs:
+        p.start()
+    time.sleep(0.5)  # let every worker open the state
+    start.set()
+    elapsed = [results.get() for _ in procs]
+    for p in procs:
+        p.join()
+    return sum(elapsed) / len(elapsed) / number
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--path", help="SQLite file (default: a temporary file)")
+    parser.add_argument("--processes", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--number", type=int, default=5000)
+    args = parser.parse_args()
+
+    tmpdir = None
+    path = args.path
+    if path is None:
+        tmpdir = tempfile.TemporaryDirectory()
+        path = os.path.join(tmpdir.name, "state.sqlite")
+
+    print(f"{args.number} operations per process, SQLite file {path}\n")
+    header = "".join(f"{n:>8} proc" for n in args.processes)
+    print(f"{'':<28}{header}")
+    for op in OPERATIONS:
+        for label, backend in (("memory", None), ("sqlite", path)):
+            row = "".join(
+                f"{measure(backend, op, n, args.number) * 1e6:10.1f} us"
+                for n in args.processes
+            )
+            print(f"{op + ' / ' + label:<28}{row}")
+    if tmpdir is not None:
+        tmpdir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
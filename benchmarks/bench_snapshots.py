@@ -0,0 +1,99 @@
+"""
+Snapshot store: bytes on disk and top-movers query time.
+
+Simulates daily scrapes of many companies. The store is compared with
+appending every scraped record as a JSON line (what the feeds produce), and
+its vectorized movers query with the same computation as a Python loop over
+the records.
+
+    python -m benchmarks.bench_snapshots
+"""
+
+import argparse
+import gzip
+import json
+import os
+import random
+import tempfile
+import time
+
+from scraper_common.snapshots import SnapshotStore
+from benchmarks.pages import SAMPLE_COMPANY
+
+DAY = 86400
+
+
+def simulate(store: SnapshotStore, companies: int, days: int, json_path: str):
+    rng = random.Random(0)
+    followers = [rng.randrange(100, 3_000_000) for _ in range(companies)]
+    employees = [rng.randrange(1, 50_000) for _ in range(companies)]
+    start = int(time.time()) - days * DAY
+    with gzip.open(json_path, "wt", encoding="utf-8") as out:
+        for day in range(days):
+            records = []
+            for c in range(companies):
+                followers[c] += rng.randrange(0, 1 + followers[c] // 500)
+                if rng.random() < 0.05:
+                    employees[c] += rng.randrange(-20, 40)
+                item = {
+                    **SAMPLE_COMPANY,
+                    "company_name": f"company-{c}",
+                    "linkedin_followers_count": followers[c],
+                    "num_of_employees": employees[c],
+                }
+                records.append((f"company-{c}", item))
+                out.write(json.dumps({"ts": start + day * DAY, **item}) + "\n")
+            store.append(records, ts=start + day * DAY)
+    store.compact()
+
+
+def movers_loop(json_path: str, window: float, n: int):
+    """Baseline: scan every record and keep first/last value per company in a dict."""
+    cutoff = time.time() - window
+    first, last = {}, {}
+    with gzip.open(json_path, "rt", encoding="utf-8") as f:
+        for line in f:
+            record = json.loads(line)
+            if record["ts"] < cutoff:
+                continue
+            name = record["company_name"]
+            first.setdefault(name, record["linkedin_followers_count"])
+            last[name] = record["linkedin_followers_count"]
+    return sorted(((last[k] - first[k], k) for k in first), reverse=True)[:n]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--companies", type=int, default=5000)
+    parser.add_argument("--days", type=int, default=60)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SnapshotStore(os.path.join(tmp, "store"), compact_bytes=1 << 40)
+        json_path = os.path.join(tmp, "records.jsonl.gz")
+        simulate(store, args.companies, args.days, json_path)
+
+        rows = args.companies * args.days
+        print(f"{args.companies} companies x {args.days} daily snapshots = {rows} rows\n")
+        print("bytes on disk")
+        print(f"  full records, JSON lines (gzip)  {os.path.getsize(json_path) / 1024:9.0f} KB")
+        print(f"  snapshot store                   {store.disk_usage() / 1024:9.0f} KB"
+              f"  ({store.disk_usage() / rows:.2f} B/row)")
+
+        print("\ntop 10 follower movers over 30 days")
+        begin = time.perf_counter()
+        store.columns()
+        load = time.perf_counter() - begin
+        begin = time.perf_counter()
+        store.movers("linkedin_followers_count", 30 * DAY, n=10)
+        query = time.perf_counter() - begin
+        begin = time.perf_counter()
+        movers_loop(json_path, 30 * DAY, 10)
+        loop = time.perf_counter() - begin
+        print(f"  Python loop over JSON records    {loop * 1000:9.1f} ms")
+        print(f"  store: load + decode (once)      {load * 1000:9.1f} ms")
+        print(f"  store: movers query              {query * 1000:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,343 @@
+"""
+End-to-end load test of the API against the local stand-in server.
+
+Starts the stand-in (``standin.py``) and ``api.main:app`` under uvicorn in
+two child processes, with the API pointed at the stand-in through
+``LINKEDIN_BASE_URL`` / ``DDG_HTML_URL``, per-host rate limits off and the
+cache off (``--cache-ttl``). Then drives ``/company`` and ``/profile`` from
+``--concurrency`` keep-alive connections for ``--duration`` seconds, every
+request for handles not asked for before.
+
+Reported: requests and items per second, request latency p50/p95/p99,
+item statuses, event-loop lag inside the API (a task that sleeps 10 ms and
+records how late it wakes up) and the API process's memory.
+
+    python -m benchmarks.loadtest
+    python -m benchmarks.loadtest --concurrency 64 --mix company=1 --block-rate 0.05
+    python -m benchmarks.loadtest --json > before.json
+
+Everything runs on one machine, so the stand-in and the load generator take
+CPU from the API; compare runs made with the same options on the same host.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter
+from urllib.parse import urlsplit
+
+PROBE_PATH = "/__loadtest__"
+
+
+def percentile(values: list[float], q: float) -> float | None:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+# ── Inside the API process ──
+
+class LoopLagProbe:
+    """Measures how late a periodic sleep wakes up on the event loop."""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.lags: list[float] = []
+        self._task = None
+
+    async def _run(self):
+        # perf_counter: uvloop's loop.time() only has millisecond resolution
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.lags.append(time.perf_counter() - start - self.interval)
+
+    async def snapshot(self, reset: bool = False) -> dict:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+        lags, rss = [round(lag * 1000, 3) for lag in self.lags], None
+        try:
+            with open("/proc/self/statm") as f:
+                rss = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except OSError:
+            pass
+        if reset:
+            self.lags = []
+        return {
+            "loop_lag_p50_ms": percentile(lags, 0.5),
+            "loop_lag_p99_ms": percentile(lags, 0.99),
+            "loop_lag_max_ms": max(lags, default=None),
+            "rss_bytes": rss,
+            # ru_maxrss is in KB on Linux
+            "peak_rss_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+        }
+
+
+def serve(port: int) -> None:
+    import uvicorn
+
+    from api.main import app
+
+    probe = LoopLagProbe()
+    app.add_api_route(PROBE_PATH, probe.snapshot, methods=["GET"], include_in_schema=False)
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
+
+
+# ── Load generator ──
+
+class Connection:
+    """Minimal keep-alive HTTP/1.1 client (JSON in, JSON out)."""
+
+    def __init__(self, host: str, port: int):
+        self.host, self.port = host, port
+        self._reader = self._writer = None
+
+    async def request(self, method: str, path: str, body: dict | None = None) -> tuple[int, bytes]:
+        reused = self._writer is not None
+        if not reused:
+            self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        payload = json.dumps(body).encode() if body is not None else b""
+        self._writer.write(
+            f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(payload)}\r\n\r\n".encode()
+            + payload
+        )
+        try:
+            status_line = await self._reader.readline()
+            if not status_line and reused:
+                # The server closed the idle connection: reconnect once
+                self.close()
+                return await self.request(method, path, body)
+            status = int(status_line.split()[1])
+            headers = {}
+            while (line := await self._reader.readline()) not in (b"\r\n", b""):
+                name, _, value = line.decode().partition(":")
+                headers[name.strip().lower()] = value.strip()
+            if "content-length" in headers:
+                data = await self._reader.readexactly(int(headers["content-length"]))
+            else:
+                data = await self._read_chunked()
+        except (OSError, ValueError, IndexError, asyncio.IncompleteReadError):
+            self.close()
+            raise
+        if headers.get("connection") == "close":
+            self.close()
+        return status, data
+
+    async def _read_chunked(self) -> bytes:
+        chunks = []
+        while size := int((await self._reader.readline()).strip(), 16):
+            chunks.append(await self._reader.readexactly(size))
+            await self._reader.readline()
+        await self._reader.readline()
+        return b"".join(chunks)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = None
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _parse_mix(text: str) -> dict[str, float]:
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name not in ("company", "profile"):
+            raise argparse.ArgumentTypeError(f"unknown endpoint {name!r}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+async def _wait_ready(conn: Connection, timeout: float = 30) -> None:
+    end = time.monotonic() + timeout
+    while True:
+        try:
+            status, _ = await conn.request("GET", "/health")
+            if status == 200:
+                return
+        except OSError:
+            pass
+        if time.monotonic() > end:
+            raise RuntimeError("API did not start")
+        await asyncio.sleep(0.2)
+
+
+async def drive(args, api: str) -> dict:
+    parts = urlsplit(api)
+    control = Connection(parts.hostname, parts.port)
+    await _wait_ready(control)
+    # Only APIs started by this script have the probe
+    probe = (await control.request("GET", f"{PROBE_PATH}?reset=true"))[0] == 200
+
+    rng = random.Random(0)
+    endpoints, weights = zip(*args.mix.items())
+    counter = iter(range(10**12))
+    latencies = {name: [] for name in endpoints}
+    statuses, http_errors, items = Counter(), Counter(), 0
+    measuring = False
+
+    def body(endpoint: str) -> dict:
+        handles = [f"load-{next(counter)}" for _ in range(args.batch)]
+        if endpoint == "company":
+            return {"companies": handles}
+        return {"profiles": handles, **({"li_at": args.li_at} if args.li_at else {})}
+
+    async def worker():
+        nonlocal items
+        conn = Connection(parts.hostname, parts.port)
+        while time.monotonic() < stop:
+            endpoint = rng.choices(endpoints, weights)[0]
+            begin = time.perf_counter()
+            try:
+                status, data = await conn.request("POST", f"/{endpoint}", body(endpoint))
+            except OSError as e:
+                status, data = type(e).__name__, b""
+            elapsed = time.perf_counter() - begin
+            if not measuring:
+                continue
+            latencies[endpoint].append(elapsed)
+            if status != 200:
+                http_errors[str(status)] += 1
+                continue
+            for item in json.loads(data)["data"]:
+                items += 1
+                statuses[item.get("status", "ok")] += 1
+        conn.close()
+
+    start = time.monotonic()
+    stop = start + args.warmup + args.duration
+    workers = [asyncio.create_task(worker()) for _ in range(args.concurrency)]
+    await asyncio.sleep(args.warmup)
+    if probe:
+        await control.request("GET", f"{PROBE_PATH}?reset=true")
+    measuring, measured_from = True, time.monotonic()
+    await asyncio.gather(*workers)
+    elapsed = time.monotonic() - measured_from
+    server = {}
+    if probe:
+        server = json.loads((await control.request("GET", PROBE_PATH))[1])
+    control.close()
+
+    every = [lat for values in latencies.values() for lat in values]
+
+    def ms(value):
+        return round(value * 1000, 1) if value is not None else None
+
+    return {
+        "options": {k: v for k, v in vars(args).items() if k not in ("json", "func")},
+        "duration_s": round(elapsed, 2),
+        "requests": len(every),
+        "requests_per_s": round(len(every) / elapsed, 2),
+        "items_per_s": round(items / elapsed, 2),
+        "latency_ms": {
+            name: {"p50": ms(percentile(v, 0.5)), "p95": ms(percentile(v, 0.95)),
+                   "p99": ms(percentile(v, 0.99)), "mean": ms(statistics.mean(v) if v else None)}
+            for name, v in {"all": every, **latencies}.items()
+        },
+        "http_errors": dict(http_errors),
+        "item_statuses": dict(statuses),
+        "api": server,
+    }
+
+
+def _print_report(report: dict, standin: str) -> None:
+    o = report["options"]
+    print(f"{o['concurrency']} connections, {report['duration_s']} s, mix {o['mix']}, "
+          f"{o['batch']} handles per request; stand-in {standin}\n")
+    print(f"requests/s {report['requests_per_s']:>10}    items/s {report['items_per_s']:>10}")
+    print(f"\n{'latency ms':<12}{'p50':>9}{'p95':>9}{'p99':>9}{'mean':>9}")
+    for name, lat in report["latency_ms"].items():
+        print(f"{name:<12}" + "".join(f"{str(lat[q]):>9}" for q in ("p50", "p95", "p99", "mean")))
+    print(f"\nitem statuses {report['item_statuses']}   HTTP errors {report['http_errors'] or 0}")
+    api = report["api"]
+    if api:
+        print(f"event-loop lag ms: p50 {api['loop_lag_p50_ms']:.2f}  p99 {api['loop_lag_p99_ms']:.2f}"
+              f"  max {api['loop_lag_max_ms']:.2f}")
+        print(f"API memory: RSS {api['rss_bytes'] / 2**20:.0f} MB, peak {api['peak_rss_bytes'] / 2**20:.0f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=32, help="connections to the API")
+    parser.add_argument("--duration", type=float, default=20, help="seconds measured")
+    parser.add_argument("--warmup", type=float, default=2, help="seconds of load before measuring")
+    parser.add_argument("--mix", type=_parse_mix, default=_parse_mix("company=3,profile=1"),
+                        help="endpoint weights, e.g. company=3,profile=1")
+    parser.add_argument("--batch", type=int, default=5, help="handles per request")
+    parser.add_argument("--li-at", default="load-test", help="li_at sent with /profile ('' for DDG only)")
+    parser.add_argument("--cache-ttl", type=float, default=0, help="API CACHE_TTL")
+    parser.add_argument("--host-concurrency", type=int, default=64, help="API HOST_CONCURRENCY")
+    parser.add_argument("--api-url", help="drive an API that is already running (and pointed at "
+                        "a stand-in started with python -m benchmarks.standin) instead")
+    # Stand-in behaviour
+    parser.add_argument("--delay", type=float, default=0.05, help="stand-in seconds per response")
+    parser.add_argument("--slow-rate", type=float, default=0.0)
+    parser.add_argument("--slow-delay", type=float, default=3.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="503 responses")
+    parser.add_argument("--reset-rate", type=float, default=0.0, help="connection resets")
+    parser.add_argument("--block-rate", type=float, default=0.0, help="999 responses")
+    parser.add_argument("--redirect-rate", type=float, default=0.0, help="302s to the login wall")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    parser.add_argument("--serve", type=int, metavar="PORT", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve)
+        return
+
+    children, standin = [], "started separately"
+    try:
+        api = args.api_url
+        if api is None:
+            standin_port = _free_port()
+            standin = f"http://127.0.0.1:{standin_port}"
+            children.append(subprocess.Popen([
+                sys.executable, "-m", "benchmarks.standin", "--port", str(standin_port),
+                "--delay", str(args.delay), "--slow-rate", str(args.slow_rate),
+                "--slow-delay", str(args.slow_delay), "--error-rate", str(args.error_rate),
+                "--reset-rate", str(args.reset_rate), "--block-rate", str(args.block_rate),
+                "--redirect-rate", str(args.redirect_rate),
+            ], stdout=subprocess.DEVNULL))
+            api_port = _free_port()
+            api = f"http://127.0.0.1:{api_port}"
+            env = {
+                **os.environ,
+                "LINKEDIN_BASE_URL": standin,
+                "DDG_HTML_URL": f"{standin}/html/",
+                "LINKEDIN_MIN_INTERVAL": "0",
+                "DDG_MIN_INTERVAL": "0",
+                "DEFAULT_MIN_INTERVAL": "0",
+                "HOST_CONCURRENCY": str(args.host_concurrency),
+                "CACHE_TTL": str(args.cache_ttl),
+            }
+            children.append(subprocess.Popen(
+                [sys.executable, "-m", "benchmarks.loadtest", "--serve", str(api_port)], env=env
+            ))
+        report = asyncio.run(drive(args, api))
+    finally:
+        for child in children:
+            child.terminate()
+            child.wait()
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        _print_report(report, standin)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""
+Synthetic LinkedIn / DuckDuckGo pages for benchmarks.
+
+The markup mirrors the structure the scrapers select on (class names, nesting,
+the detail rows and the funding aside). ``filler`` pads the page with
+unrelated markup so parse cost is in the range of a real page (~200 KB).
+"""
+
+import html
+import json
+
+SAMPLE_COMPANY = {
+    "company_name": "OpenAI",
+    "linkedin_followers_count": 2610704,
+    "company_logo_url": "https://media.licdn.com/dms/image/C4E0BAQG0lRhNgYJCXw/company-logo_200_200/0/1678382029586",
+    "about_us": "OpenAI is an AI research and deployment company dedicated to ensuring "
+                "that general-purpose artificial intelligence benefits all of humanity.",
+    "num_of_employees": 1230,
+    "website": "https://openai.com/",
+    "industry": "Research Services",
+    "company_size_approx": "201-500",
+    "headquarters": "San Francisco, CA",
+    "type": "Partnership",
+    "founded": "2015",
+    "specialties": "artificial intelligence and machine learning",
+    "funding_total_rounds": 10,
+    "funding_option": "Secondary market",
+    "last_funding_round": "Sep 14, 2023",
+}
+
+SAMPLE_PROFILE = {
+    "handle": "satya-nadella",
+    "first_name": "Satya",
+    "last_name": "Nadella",
+    "headline": "Chairman and CEO at Microsoft",
+    "location": "Redmond, Washington, United States",
+    "about": "As chairman and CEO of Microsoft, I define my mission and that of my company "
+             "as empowering every person and every organization on the planet to achieve more.",
+    "photo_root": "https://media.licdn.com/dms/image/v2/C5603AQHHUuOSlRVA1w/",
+}
+
+
+def filler(n_blocks: int = 400) -> str:
+    """Unrelated markup (similar-pages lists, nav, tracking blobs)."""
+    block = (
+        '<li class="show-more-less-html__item"><div class="base-aside-card">'
+        '<a class="base-aside-card--link" href="https://www.linkedin.com/company/x{i}">'
+        '<div class="base-aside-card__info"><h3 class="base-aside-card__title">Company {i}</h3>'
+        '<p class="base-aside-card__subtitle">Software Development</p>'
+        '<span class="text-body-small">{i},000 followers</span></div></a></div></li>'
+    )
+    return '<ul class="aside-list">' + "".join(block.format(i=i) for i in range(n_blocks)) + "</ul>"
+
+
+def company_page(item: dict = None, n_filler: int = 400) -> str:
+    item = item or SAMPLE_COMPANY
+    esc = html.escape
+
+    def row(label, value):
+        return (
+            f'<div class="mb-2"><dt class="text-md">{esc(label)}</dt>'
+            f'<dd class="text-md">{esc(str(value))}</dd></div>'
+        )
+
+    details = (
+        f'<div class="mb-2"><dt>Website</dt><dd><a href="{esc(item["website"])}">'
+        f'{esc(item["website"])}</a></dd></div>'
+        + row("Industry", item["industry"])
+        + row("Company size", f'{item["company_size_approx"]} employees')
+        + row("Headquarters", item["headquarters"])
+        + row("Type", item["type"])
+        + row("Founded", item["founded"])
+        + row("Specialties", item["specialties"])
+    )
+    funding = (
+        '<section class="aside-section-container"><div>'
+        '<a class="link-styled" href="#">Crunchbase '
+        f'<span class="before:middot">{item["funding_total_rounds"]} total rounds</span></a>'
+        '<div class="my-2"><a class="link-styled" href="#">'
+        f'{esc(item["funding_option"])}'
+        f'<time class="before:middot">{esc(item["last_funding_round"])}</time></a></div>'
+        '</div></section>'
+    )
+    return (
+        "<!DOCTYPE html><html><head><title>"
+        f'{esc(item["company_name"])} | LinkedIn</title></head><body>'
+        f"{filler(n_filler // 2)}"
+        '<section class="top-card-layout"><div class="top-card-layout__entity-image-container">'
+        f'<img data-delayed-url="{esc(item["company_logo_url"])}"></div>'
+        f'<div class="top-card-layout__entity-info"><h1>{esc(item["company_name"])}</h1>'
+        '<h3 class="top-card-layout__first-subline"><span>Research Services</span>'
+        f'{item["linkedin_followers_count"]:,} followers</h3></div>'
+        f'<a class="face-pile__cta">View all {item["num_of_employees"]:,} employees</a></section>'
+        '<section class="core-section-container"><div class="core-section-container__content">'
+        f'<p>{esc(item["about_us"])}</p><dl>{details}</dl></div></section>'
+        f"{funding}"
+        f"{filler(n_filler // 2)}"
+        "</body></html>"
+    )
+
+
+def profile_page(profile: dict = None, n_filler: int = 400) -> str:
+    """Authenticated profile page with the profile JSON embedded in <code>."""
+    profile = profile or SAMPLE_PROFILE
+    payload = {
+        "included": [
+            {
+                "publicIdentifier": profile["handle"],
+                "firstName": profile["first_name"],
+                "lastName": profile["last_name"],
+                "occupation": profile["headline"],
+                "geoLocationName": profile["location"],
+                "summary": profile["about"],
+                "picture": {
+                    "rootUrl": profile["photo_root"],
+                    "artifacts": [
+                        {"fileIdentifyingUrlPathSegment": "100_100/photo.jpg"},
+                        {"fileIdentifyingUrlPathSegment": "200_200/photo.jpg"},
+                    ],
+                },
+            }
+        ]
+    }
+    blob = html.escape(json.dumps(payload))
+    return (
+        "<!DOCTYPE html><html><head><title>LinkedIn</title></head><body>"
+        f"{filler(n_filler)}"
+        f'<code style="display: none" id="bpr-guid-1">{blob}</code>'
+        "</body></html>"
+    )
+
+
+def ddg_page(handle: str, name: str, headline: str, about: str, n_results: int = 10) -> str:
+    """DuckDuckGo HTML results page whose best match sits mid-list."""
+    esc = html.escape
+
+    def result(url, title, snippet):
+        return (
+            '<div class="result results_links results_links_deep web-result">'
+            '<div class="links_main links_deep result__body"><h2 class="result__title">'
+            f'<a rel="nofollow" class="result__a" href="{esc(url)}">{title}</a></h2>'
+            f'<div class="result__extras"><a class="result__url" href="{esc(url)}">'
+            f'{esc(url.replace("https://", ""))}</a></div>'
+            f'<a class="result__snippet" href="{esc(url)}">{snippet}</a>'
+            "</div></div>"
+        )
+
+    results = []
+    for i in range(n_results):
+        if i == n_results // 2:
+            results.append(result(
+                f"https://www.linkedin.com/in/{handle}",
+                f"<b>{esc(name)}</b> - {esc(headline)} | LinkedIn",
+                f"{esc(headline)} · {esc(about)}",
+            ))
+        else:
+            results.append(result(
+                f"https://www.linkedin.com/in/other-{i}",
+                f"Other Person {i} - Engineer | LinkedIn",
+                f"Engineer · Works on <b>things</b> number {i}.",
+            ))
+    return (
+        "<!DOCTYPE html><html><head><title>DuckDuckGo</title></head><body>"
+        f'<div id="links" class="results">{"".join(results)}</div>'
+        "</body></html>"
+    )
+
+
+def authwall_page(n_filler: int = 400) -> str:
+    """LinkedIn's sign-up wall, as served to a logged-out or blocked client."""
+    return (
+        "<!DOCTYPE html><html><head><title>Sign Up | LinkedIn</title>"
+        '<meta name="pageKey" content="d_authwall_join"></head><body>'
+        '<main class="authwall-join-form"><h1>Join LinkedIn</h1>'
+        '<form action="/signup/cold-join" method="post"><input name="email-address"></form></main>'
+        f"{filler(n_filler)}"
+        "</body></html>"
+    )
+
+
+def challenge_page() -> str:
+    """LinkedIn's security check (captcha) page."""
+    return (
+        "<!DOCTYPE html><html><head><title>Security Verification | LinkedIn</title></head><body>"
+        '<form id="captcha-challenge" action="/checkpoint/challenge/verify" method="post">'
+        '<div class="g-recaptcha" data-sitekey="x"></div></form>'
+        "</body></html>"
+    )
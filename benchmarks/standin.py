@@ -0,0 +1,199 @@
+"""
+Local stand-in for LinkedIn and DuckDuckGo with fault injection.
+
+Serves the synthetic pages from ``pages.py`` on 127.0.0.1:
+
+    /company/<handle>   company page
+    /in/<handle>        authenticated profile page (for that handle)
+    /html/?q=...        DuckDuckGo results page
+    /authwall           LinkedIn login wall
+    /media/<asset>/...  image (PNG) for <asset>, the same bytes under every path
+
+Each request can be delayed, slowed down, answered with a 503 or LinkedIn's
+999, redirected to the login wall (302) or have its connection reset, at
+configurable rates, so latency and retry behaviour can be measured without
+touching the real sites. Used as a context manager:
+
+    with StandInServer(slow_rate=0.05, slow_delay=3) as server:
+        requests.get(f"{server.url}/company/openai")
+
+or on its own, for an API started separately (see benchmarks/loadtest.py):
+
+    python -m benchmarks.standin --port 8900 --delay 0.05 --block-rate 0.02
+"""
+
+import argparse
+import hashlib
+import random
+import socket
+import struct
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from benchmarks.pages import SAMPLE_PROFILE, company_page, ddg_page, profile_page
+
+_HANDLE = "__standin_handle__"
+
+
+def image(asset: str, size: int = 20 * 1024) -> bytes:
+    """Stand-in image bytes, the same for the same ``asset``."""
+    seed = hashlib.sha256(asset.encode()).digest()
+    return b"\x89PNG\r\n\x1a\n" + (seed * (size // len(seed) + 1))[:size]
+
+
+class StandInServer:
+    def __init__(
+        self,
+        delay: float = 0.005,
+        slow_rate: float = 0.0,
+        slow_delay: float = 3.0,
+        error_rate: float = 0.0,
+        reset_rate: float = 0.0,
+        block_rate: float = 0.0,
+        redirect_rate: float = 0.0,
+        seed: int = 0,
+        port: int = 0,
+    ):
+        self.delay = delay
+        self.slow_rate = slow_rate
+        self.slow_delay = slow_delay
+        self.error_rate = error_rate
+        self.reset_rate = reset_rate
+        self.block_rate = block_rate
+        self.redirect_rate = redirect_rate
+        self.requests = 0
+        self.faults = Counter()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._pages = {
+            "company": company_page().encode(),
+            # Rendered once; the handle is filled in per request
+            "profile": profile_page({**SAMPLE_PROFILE, "handle": _HANDLE}).encode(),
+            "authwall": b"<!DOCTYPE html><html><body><h1>Sign in</h1></body></html>",
+        }
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def _fault(self, path: str) -> str | None:
+        """Pick this request's fault (None, "reset", "error", "block", "redirect" or "slow")."""
+        with self._lock:
+            self.requests += 1
+            roll = self._rng.random()
+        linkedin = not path.startswith("/html")
+        for fault, rate in (("reset", self.reset_rate), ("error", self.error_rate),
+                            ("block", self.block_rate if linkedin else 0),
+                            ("redirect", self.redirect_rate if linkedin else 0),
+                            ("slow", self.slow_rate)):
+            if roll < rate:
+                with self._lock:
+                    self.faults[fault] += 1
+                return fault
+            roll -= rate
+        return None
+
+    def _body(self, path: str, query: str) -> bytes | None:
+        if path.startswith("/company/"):
+            return self._pages["company"]
+        if path.startswith("/in/"):
+            handle = path[len("/in/"):].strip("/").encode()
+            return self._pages["profile"].replace(_HANDLE.encode(), handle)
+        if path.startswith("/authwall"):
+            return self._pages["authwall"]
+        if path.startswith("/media/"):
+            return image(path.split("/")[2])
+        if path.startswith("/html"):
+            q = parse_qs(query).get("q", [""])[0]
+            handle = q.rsplit("/", 1)[-1] or SAMPLE_PROFILE["handle"]
+            name = f"{SAMPLE_PROFILE['first_name']} {SAMPLE_PROFILE['last_name']}"
+            return ddg_page(handle, name, SAMPLE_PROFILE["headline"], SAMPLE_PROFILE["about"]).encode()
+        return None
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                fault = server._fault(parts.path)
+                time.sleep(server.slow_delay if fault == "slow" else server.delay)
+                if fault == "reset":
+                    # SO_LINGER 0: close() sends RST instead of FIN
+                    self.connection.setsockopt(
+                        socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0)
+                    )
+                    self.close_connection = True
+                    self.connection.close()
+                    return
+                body = server._body(parts.path, parts.query)
+                status = {"error": 503, "block": 999, "redirect": 302}.get(fault)
+                status = status or (200 if body is not None else 404)
+                body = body if status == 200 else b""
+                self.send_response(status)
+                if status == 302:
+                    self.send_header("Location", f"/authwall?sessionRedirect={parts.path}")
+                media = parts.path.startswith("/media/")
+                self.send_header("Content-Type", "image/png" if media else "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                try:
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # client gave up (timeout, lost hedge)
+
+            def finish(self):
+                try:
+                    super().finish()
+                except OSError:
+                    pass  # connection was reset on purpose
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the LinkedIn/DuckDuckGo stand-in")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--delay", type=float, default=0.05, help="seconds per response")
+    parser.add_argument("--slow-rate", type=float, default=0.0)
+    parser.add_argument("--slow-delay", type=float, default=3.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="503 responses")
+    parser.add_argument("--reset-rate", type=float, default=0.0, help="connection resets")
+    parser.add_argument("--block-rate", type=float, default=0.0, help="999 responses (LinkedIn only)")
+    parser.add_argument("--redirect-rate", type=float, default=0.0,
+                        help="302 to the login wall (LinkedIn only)")
+    args = parser.parse_args()
+    server = StandInServer(
+        delay=args.delay, slow_rate=args.slow_rate, slow_delay=args.slow_delay,
+        error_rate=args.error_rate, reset_rate=args.reset_rate, block_rate=args.block_rate,
+        redirect_rate=args.redirect_rate, port=args.port,
+    )
+    with server:
+        print(f"Stand-in listening on {server.url}", flush=True)
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -3,11 +3,34 @@
 # Don't forget to add your pipeline to the ITEM_PIPELINES setting
 # See: https://docs.scrapy.org/en/latest/topics/item-pipeline.html
 
+import re
 
-# useful for handling different item types with a single interface
-from itemadapter import ItemAdapter
+from scraper_common.items import COMPANY_FIELDS, CompanyItem
+
+INT_FIELDS = ("linkedin_followers_count", "num_of_employees", "funding_total_rounds")
+
+
+def _coerce(key, value):
+    if value in (None, "", "not-found"):
+        return None
+    if key in INT_FIELDS and not isinstance(value, int):
+        digits = re.findall(r"\d{1,3}(?:,\d{3})*", str(value))
+        return int(digits[0].replace(",", "")) if digits else None
+    return value
 
 
 class CompanyDataScraperPipeline:
-    def process_item(self, item, spider):
-        return item
+    """Put free-form company dicts on the CompanyItem schema.
+
+    The spiders yield typed items already; this catches plain dicts (e.g. from
+    older spiders) with "not-found" sentinels and numbers stored as text.
+    Directory listings (company name -> URL dicts) pass through untouched.
+    """
+
+    def process_item(self, item):
+        if not isinstance(item, dict) or "company_name" not in item:
+            return item
+        return CompanyItem(
+            **{key: _coerce(key, item.get(key)) for key in COMPANY_FIELDS}
+        )
+
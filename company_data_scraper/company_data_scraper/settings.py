@@ -9,4 +9,66 @@ ROBOTSTXT_OBEY = False
 
 REQUEST_FINGERPRINTER_IMPLEMENTATION = "2.7"
 TWISTED_REACTOR = "twisted.internet.asyncioreactor.AsyncioSelectorReactor"
-FEED_EXPORT_ENCODING = "utf-8"
\ No newline at end of file
+FEED_EXPORT_ENCODING = "utf-8"
+
+ITEM_PIPELINES = {
+    "company_data_scraper.pipelines.CompanyDataScraperPipeline": 300,
+    "scraper_common.pipelines.AssetsPipeline": 400,
+}
+
+# Closest to the spider, so only the callbacks themselves are timed (see scraper_common/crawl_stats.py)
+SPIDER_MIDDLEWARES = {
+    "scraper_common.crawl_stats.CallbackTimingMiddleware": 950,
+}
+
+DOWNLOADER_MIDDLEWARES = {
+    "scraper_common.distributed.SharedRateLimitMiddleware": 540,
+    "scraper_common.middlewares.PageClassMiddleware": 560,
+}
+
+EXTENSIONS = {
+    "scraper_common.feeds.RotatingJsonLinesFeed": 500,
+    "scraper_common.distributed.DistributedCrawl": 510,
+    "scraper_common.crawl_stats.CrawlStats": 530,
+    "company_data_scraper.snapshots.SnapshotRecorder": 520,
+}
+
+# Rotating gzip JSON lines output (see scraper_common/feeds.py), off unless a directory is set:
+#   scrapy crawl company_profile_scraper -s ROTATING_FEED_DIR=output/%(name)s
+ROTATING_FEED_DIR = None
+ROTATING_FEED_MAX_ITEMS = 50000
+ROTATING_FEED_MAX_BYTES = 64 * 1024 * 1024
+ROTATING_FEED_BATCH_SIZE = 100
+
+# Distributed crawl mode (see scraper_common/distributed.py), off unless a queue path is set:
+#   scrapy crawl company_profile_scraper -s WORK_QUEUE_PATH=crawl.sqlite
+WORK_QUEUE_PATH = None
+WORK_QUEUE_BATCH_SIZE = 20
+WORK_QUEUE_LEASE_TTL = 120
+WORK_QUEUE_MAX_ATTEMPTS = 3
+# Requests per second per host shared by all workers (0 disables the shared budget)
+WORK_QUEUE_HOST_RATE = 0.5
+WORK_QUEUE_HOST_BURST = 1
+
+# Append follower/employee/funding counts of every scraped company to a
+# snapshot store (see scraper_common/snapshots.py), off unless a directory is set:
+#   scrapy crawl company_profile_scraper -s SNAPSHOT_DIR=snapshots
+SNAPSHOT_DIR = None
+SNAPSHOT_BATCH_SIZE = 100
+SNAPSHOT_COMPACT_BYTES = 4 * 1024 * 1024
+
+# Download logos into a content-addressed store (see scraper_common/assets.py) and
+# record their keys on the items, off unless a directory is set:
+#   scrapy crawl company_profile_scraper -s ASSET_DIR=assets
+ASSET_DIR = None
+# Image downloads in flight at once, in their own threads (not CONCURRENT_REQUESTS)
+ASSET_CONCURRENCY = 8
+ASSET_MAX_BYTES = 5 * 1024 * 1024
+
+# Per-callback timing, throughput logged every CRAWL_STATS_INTERVAL seconds and a
+# JSON report per crawl in CRAWL_STATS_DIR (see scraper_common/crawl_stats.py; None: no report).
+# From the repository root:
+#   python -m scraper_common.crawl_stats compare company_data_scraper/crawl_stats/a.json company_data_scraper/crawl_stats/b.json
+CRAWL_STATS_ENABLED = True
+CRAWL_STATS_INTERVAL = 30
+CRAWL_STATS_DIR = "crawl_stats"
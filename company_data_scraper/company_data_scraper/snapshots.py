@@ -0,0 +1,58 @@
+"""
+Records the follower/employee/funding counts of every scraped company.
+
+``SnapshotRecorder`` appends them to the snapshot store in
+``scraper_common/snapshots.py``; enable it with ``-s SNAPSHOT_DIR=snapshots``
+(the same directory the API's ``SNAPSHOT_DIR`` points at, to serve the
+history from ``/company/history``). Inspect the store with:
+
+    python -m scraper_common.snapshots history SNAPSHOT_DIR openai
+"""
+
+from scrapy import signals
+from scrapy.exceptions import NotConfigured
+
+from scraper_common.snapshots import SnapshotStore
+
+
+class SnapshotRecorder:
+    """Appends a snapshot for every company profile the spider scrapes.
+
+    The company handle is taken from the URL the page was requested with
+    (before redirects); items are written in batches of ``SNAPSHOT_BATCH_SIZE``.
+    """
+
+    def __init__(self, store: SnapshotStore, batch_size: int):
+        self.store = store
+        self.batch_size = batch_size
+        self.pending = []
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        directory = settings.get("SNAPSHOT_DIR")
+        if not directory:
+            raise NotConfigured
+        store = SnapshotStore(
+            directory, settings.getint("SNAPSHOT_COMPACT_BYTES", 4 * 1024 * 1024)
+        )
+        ext = cls(store, settings.getint("SNAPSHOT_BATCH_SIZE", 100))
+        crawler.signals.connect(ext.item_scraped, signal=signals.item_scraped)
+        crawler.signals.connect(ext.spider_closed, signal=signals.spider_closed)
+        return ext
+
+    def item_scraped(self, item, response, spider):
+        url = response.meta.get("redirect_urls", [response.url])[0]
+        if "/company/" not in url or not hasattr(item, "linkedin_followers_count"):
+            return  # directory listings and other records
+        handle = url.split("/company/", 1)[1].split("?")[0].strip("/").split("/")[0]
+        self.pending.append((handle, item))
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        self.store.append(self.pending)
+        self.pending = []
+
+    def spider_closed(self, spider, reason):
+        self.flush()
@@ -1,10 +1,29 @@
 import re
 import scrapy
+from scrapy import signals
+
+from scraper_common import inputs
+from scraper_common.items import CompanyItem
 
 
 DEFAULT_COMPANIES = ["openai", "microsoft"]
 
 
+def _text(value):
+    """Strip a selector result; empty or missing values become None."""
+    if value is None:
+        return None
+    return value.strip() or None
+
+
+def _first_int(value):
+    """Parse the leading number of texts like '2,610,704 followers'."""
+    try:
+        return int(value.split()[0].replace(',', ''))
+    except (ValueError, IndexError, AttributeError):
+        return None
+
+
 def normalize_company_url(handle_or_url: str) -> str:
     """Convert company handle or full URL to LinkedIn company page URL."""
     s = handle_or_url.strip().lower()
@@ -21,128 +40,121 @@ def normalize_company_url(handle_or_url: str) -> str:
 class CompanyProfileScraperSpider(scrapy.Spider):
     name = "company_profile_scraper"
 
-    def __init__(self, companies: str = None, *args, **kwargs):
+    def __init__(self, companies: str = None, input: str = None, column: str = None,
+                 format: str = None, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        handles = [c.strip() for c in (companies or "").split(",") if c.strip()]
-        if not handles:
-            handles = DEFAULT_COMPANIES
-        self.company_pages = list({normalize_company_url(h) for h in handles})
-        if not self.company_pages:
-            raise ValueError("No company handles provided. Use -a companies=handle1,handle2")
+        # -a input=PATH (or - for stdin) is read lazily, see scraper_common/inputs.py
+        self.input, self.column, self.format = input, column, format
+        self.companies = [c.strip() for c in (companies or "").split(",") if c.strip()]
+        if not self.companies and not input:
+            self.companies = DEFAULT_COMPANIES
+        self.seen = inputs.Dedupe()
+
+    def company_pages(self):
+        """Company page URLs from the arguments, without repeats, read as needed."""
+        handles = self.companies
+        if self.input:
+            handles = inputs.iter_values(self.input, self.column, self.format)
+        return inputs.unique((normalize_company_url(h) for h in handles), self.seen)
+
+    async def start(self):
+        # Read further input only once the scheduler runs dry, so a huge input
+        # is not queued up front
+        for request in self.start_requests():
+            if self.crawler.engine.needs_backout():
+                await self.crawler.signals.wait_for(signals.scheduler_empty)
+            yield request
 
     def start_requests(self):
-        company_index_tracker = 0
+        # In distributed mode the DistributedCrawl extension feeds leased handles
+        if self.settings.get('WORK_QUEUE_PATH'):
+            return
+
+        # Input is already deduplicated, so the dupe filter need not keep every URL
+        for company_index_tracker, url in enumerate(self.company_pages()):
+            yield scrapy.Request(url=url, callback=self.parse_response, dont_filter=True,
+                                 meta={'company_index_tracker': company_index_tracker})
 
-        first_url = self.company_pages[company_index_tracker]
-        yield scrapy.Request(url=first_url, callback=self.parse_response,
-                             meta={'company_index_tracker': company_index_tracker})
+    def request_for(self, handle):
+        """Request for one handle leased from the distributed work queue."""
+        return scrapy.Request(url=normalize_company_url(handle), callback=self.parse_response,
+                              meta={'work_key': handle}, dont_filter=True)
 
     def parse_response(self, response):
-        company_index_tracker = response.meta['company_index_tracker']
-        print('********')
-        print(
-            f'Scraping page: {str(company_index_tracker + 1)} of {str(len(self.company_pages))}')
-        print('********')
+        company_index_tracker = response.meta.get('company_index_tracker')
+        if company_index_tracker is None:
+            self.logger.info(f"Scraping leased company: {response.meta.get('work_key')}")
+        else:
+            self.logger.info(f"Scraping company #{company_index_tracker + 1}: {response.url}")
 
-        company_item = {}
+        company_item = CompanyItem()
 
-        company_item['company_name'] = (response.css('.top-card-layout__entity-info h1::text').get(
-            default='not-found') or 'not-found').strip()
+        # The page asked for, not where LinkedIn redirected to: the API keys companies the same way
+        company_item.company_url = response.meta.get('redirect_urls', [response.url])[0]
 
-        followers_text = response.xpath(
-            '//h3[contains(@class, "top-card-layout__first-subline")]/span/following-sibling::text()').get()
-        try:
-            company_item['linkedin_followers_count'] = int(
-                (followers_text or '').split()[0].strip().replace(',', ''))
-        except (ValueError, IndexError, AttributeError):
-            company_item['linkedin_followers_count'] = 0
+        company_item.company_name = _text(response.css('.top-card-layout__entity-info h1::text').get())
+
+        company_item.linkedin_followers_count = _first_int(response.xpath(
+            '//h3[contains(@class, "top-card-layout__first-subline")]/span/following-sibling::text()').get())
         # attr(src) didn't work, I saw the img element response and found out `src` has changed to `data-delayed-url` for which there was logo link.
-        company_item['company_logo_url'] = response.css(
-            'div.top-card-layout__entity-image-container img::attr(data-delayed-url)').get('not-found')
+        company_item.company_logo_url = response.css(
+            'div.top-card-layout__entity-image-container img::attr(data-delayed-url)').get()
 
-        company_item['about_us'] = response.css('.core-section-container__content p::text').get(
-            default='not-found').strip()
+        company_item.about_us = _text(response.css('.core-section-container__content p::text').get())
 
-        try:
-            followers_num_match = re.findall(r'\d{1,3}(?:,\d{3})*',
-                                             response.css('a.face-pile__cta::text').get(default='not-found').strip())
-            if followers_num_match:
-                company_item['num_of_employees'] = int(
-                    followers_num_match[0].replace(',', ''))
-            else:
-                company_item['num_of_employees'] = response.css('a.face-pile__cta::text').get(
-                    default='not-found').strip()
-        except Exception as e:
-            print("Error occurred while getting number of employees: {e}")
+        followers_num_match = re.findall(r'\d{1,3}(?:,\d{3})*',
+                                         response.css('a.face-pile__cta::text').get(default=''))
+        if followers_num_match:
+            company_item.num_of_employees = int(followers_num_match[0].replace(',', ''))
 
         try:
             company_details = response.css(
                 '.core-section-container__content .mb-2')
 
-            company_item['website'] = company_details[0].css(
-                'a::text').get(default='not-found').strip()
+            company_item.website = _text(company_details[0].css('a::text').get())
 
             company_industry_line = company_details[1].css(
                 '.text-md::text').getall()
-            company_item['industry'] = company_industry_line[1].strip()
+            company_item.industry = _text(company_industry_line[1])
 
             company_size_line = company_details[2].css(
                 '.text-md::text').getall()
-            company_item['company_size_approx'] = company_size_line[1].strip().split()[
+            company_item.company_size_approx = company_size_line[1].strip().split()[
                 0]
 
             company_headquarters = company_details[3].css(
                 '.text-md::text').getall()
             if company_headquarters[0].lower().strip() == 'headquarters':
-                company_item['headquarters'] = company_headquarters[1].strip()
-            else:
-                company_item['headquarters'] = 'not-found'
+                company_item.headquarters = _text(company_headquarters[1])
 
             company_type = company_details[4].css('.text-md::text').getall()
-            company_item['type'] = company_type[1].strip()
+            company_item.type = _text(company_type[1])
 
             # specialities or founded, one among them -> storing in `unsure_parameter`
             unsure_parameter = company_details[5].css(
                 '.text-md::text').getall()
             unsure_parameter_key = unsure_parameter[0].lower().strip()
-            company_item[unsure_parameter_key] = unsure_parameter[1].strip()
             # `founded` comes before specialties if exists, or else `specialties` at first means that `founded` parameter isn't defined
             if unsure_parameter_key == 'founded':
+                company_item.founded = _text(unsure_parameter[1])
                 company_specialties = company_details[6].css(
                     '.text-md::text').getall()
                 # after `founded` is extracted, check if `specialties` is defined
                 if company_specialties[0].lower().strip() == 'specialties':
-                    company_item['specialties'] = company_specialties[1].strip()
-                else:
-                    company_item['specialties'] = 'not-found'
-            elif unsure_parameter_key != 'specialties' or unsure_parameter_key == 'founded':
-                company_item['founded'] = 'not-found'
-                company_item['specialties'] = 'not-found'
+                    company_item.specialties = _text(company_specialties[1])
+            elif unsure_parameter_key == 'specialties':
+                company_item.specialties = _text(unsure_parameter[1])
 
             # funding parameters, more feasible error handling to be implemented, if sir needs to have..
-            company_item['funding'] = response.css(
-                'p.text-display-lg::text').get(default='not-found').strip()
-            funding_rounds_raw = response.xpath(
-                '//section[contains(@class, "aside-section-container")]/div/a[contains(@class, "link-styled")]//span[contains(@class, "before:middot")]/text()').get() or ''
-            try:
-                company_item['funding_total_rounds'] = int(str(funding_rounds_raw).strip().split()[0].replace(',', ''))
-            except (ValueError, IndexError, AttributeError):
-                company_item['funding_total_rounds'] = 0
-            company_item['funding_option'] = response.xpath(
-                '//section[contains(@class, "aside-section-container")]/div//div[contains(@class, "my-2")]/a[contains(@class, "link-styled")]/text()').get(
-                'not-found').strip()
-            company_item['last_funding_round'] = response.xpath(
-                '//section[contains(@class, "aside-section-container")]/div//div[contains(@class, "my-2")]/a[contains(@class, "link-styled")]//time[contains(@class, "before:middot")]/text()').get(
-                'not-found').strip()
+            company_item.funding = _text(response.css('p.text-display-lg::text').get())
+            company_item.funding_total_rounds = _first_int(response.xpath(
+                '//section[contains(@class, "aside-section-container")]/div/a[contains(@class, "link-styled")]//span[contains(@class, "before:middot")]/text()').get())
+            company_item.funding_option = _text(response.xpath(
+                '//section[contains(@class, "aside-section-container")]/div//div[contains(@class, "my-2")]/a[contains(@class, "link-styled")]/text()').get())
+            company_item.last_funding_round = _text(response.xpath(
+                '//section[contains(@class, "aside-section-container")]/div//div[contains(@class, "my-2")]/a[contains(@class, "link-styled")]//time[contains(@class, "before:middot")]/text()').get())
 
         except IndexError:
-            print("Error: *****Skipped index, as some details are missing*********")
+            self.logger.debug(f"Some details are missing on {response.url}")
 
         yield company_item
-
-        company_index_tracker += 1
-
-        if (company_index_tracker <= len(self.company_pages) - 1):
-            next_url = self.company_pages[company_index_tracker]
-            yield scrapy.Request(url=next_url, callback=self.parse_response,
-                                 meta={'company_index_tracker': company_index_tracker})
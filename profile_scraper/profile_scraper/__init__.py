@@ -1 +1,10 @@
 # Profile scraper package
+
+import os
+import sys
+
+# Modules shared with the API and the other project live in scraper_common/,
+# at the repository root
+_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if _ROOT not in sys.path:
+    sys.path.append(_ROOT)
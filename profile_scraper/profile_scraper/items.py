@@ -1,10 +0,0 @@
-# Define here the models for your scraped items
-#
-# See documentation:
-# https://docs.scrapy.org/en/latest/topics/items.html
-
-import scrapy
-
-
-class ProfileScraperItem(scrapy.Item):
-    pass
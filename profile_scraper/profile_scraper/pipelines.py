@@ -3,7 +3,21 @@
 # Don't forget to add your pipeline to the ITEM_PIPELINES setting
 # See: https://docs.scrapy.org/en/latest/topics/item-pipeline.html
 
+from scraper_common.items import PROFILE_FIELDS, ProfileItem
+
 
 class ProfileScraperPipeline:
-    def process_item(self, item, spider):
-        return item
+    """Put free-form profile dicts on the ProfileItem schema.
+
+    The spider yields typed items already; this catches plain dicts with
+    "not-found" sentinels.
+    """
+
+    def process_item(self, item):
+        if not isinstance(item, dict):
+            return item
+        return ProfileItem(**{
+            key: None if item.get(key) in ("", "not-found") else item.get(key)
+            for key in PROFILE_FIELDS
+        })
+
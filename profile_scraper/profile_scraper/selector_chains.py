@@ -0,0 +1,122 @@
+"""
+Adaptive selector chains.
+
+A chain is an ordered list of CSS/XPath alternatives for one field; the first
+one that yields a value wins. LinkedIn serves a few layout variants and one of
+them usually dominates, so each chain counts hits per alternative and keeps
+the most successful one first. Broad whole-document fallbacks (``//h1`` and
+friends) are never promoted: they always run last, only when every specific
+alternative missed.
+
+Hit counts are persisted to a JSON file between runs and reported in the
+crawl stats under ``selector_chains/<field>/...``.
+"""
+
+import json
+import os
+
+# Once an alternative reaches this many hits every count in the chain is
+# halved, so a layout change overtakes the old favourite in bounded time.
+MAX_HITS = 1000
+
+
+def _evaluate(response, selector):
+    kind, expr = selector
+    if kind == "css":
+        return response.css(expr).get()
+    return response.xpath(expr).get()
+
+
+def _key(selector) -> str:
+    kind, expr = selector
+    return f"{kind}:{expr}"
+
+
+class SelectorChain:
+    def __init__(self, name: str, alternatives, fallbacks=()):
+        self.name = name
+        self.alternatives = list(alternatives)
+        self.fallbacks = list(fallbacks)
+        self.order = list(range(len(self.alternatives)))
+        self.hits = [0] * len(self.alternatives)
+        self.run_hits = [0] * (len(self.alternatives) + len(self.fallbacks))
+        self.misses = 0
+
+    def extract(self, response):
+        """Return the first non-empty value, trying the best alternative first."""
+        for pos, idx in enumerate(self.order):
+            value = _evaluate(response, self.alternatives[idx])
+            if value and value.strip():
+                self._record_hit(pos)
+                return value
+        for offset, selector in enumerate(self.fallbacks):
+            value = _evaluate(response, selector)
+            if value and value.strip():
+                self.run_hits[len(self.alternatives) + offset] += 1
+                return value
+        self.misses += 1
+        return None
+
+    def _record_hit(self, pos: int) -> None:
+        idx = self.order[pos]
+        self.run_hits[idx] += 1
+        self.hits[idx] += 1
+        if self.hits[idx] >= MAX_HITS:
+            self.hits = [h // 2 for h in self.hits]
+        # Bubble the winner up past alternatives with fewer hits
+        while pos > 0 and self.hits[self.order[pos - 1]] < self.hits[idx]:
+            self.order[pos - 1], self.order[pos] = idx, self.order[pos - 1]
+            pos -= 1
+
+    def load(self, saved: dict) -> None:
+        """Restore hit counts (keyed by selector) and re-derive the order."""
+        for idx, selector in enumerate(self.alternatives):
+            self.hits[idx] = int(saved.get(_key(selector), 0))
+        self.order.sort(key=lambda idx: -self.hits[idx])
+
+    def dump(self) -> dict:
+        return {_key(self.alternatives[idx]): self.hits[idx] for idx in self.order}
+
+    def record_stats(self, stats) -> None:
+        prefix = f"selector_chains/{self.name}"
+        for idx, selector in enumerate(self.alternatives + self.fallbacks):
+            if self.run_hits[idx]:
+                stats.set_value(f"{prefix}/hits/{_key(selector)}", self.run_hits[idx])
+        stats.set_value(f"{prefix}/misses", self.misses)
+        stats.set_value(
+            f"{prefix}/order", [_key(self.alternatives[idx]) for idx in self.order]
+        )
+
+
+class SelectorChains:
+    """A named set of chains that is loaded from and saved to one JSON file."""
+
+    def __init__(self, chains):
+        self.chains = {chain.name: chain for chain in chains}
+
+    def __getitem__(self, name: str) -> SelectorChain:
+        return self.chains[name]
+
+    def load(self, path: str) -> None:
+        if not path or not os.path.exists(path):
+            return
+        try:
+            with open(path, encoding="utf-8") as f:
+                saved = json.load(f).get("chains", {})
+        except (OSError, ValueError):
+            return  # unreadable stats file — start fresh
+        for name, chain in self.chains.items():
+            chain.load(saved.get(name, {}))
+
+    def save(self, path: str) -> None:
+        if not path:
+            return
+        data = {"chains": {name: chain.dump() for name, chain in self.chains.items()}}
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, path)
+
+    def record_stats(self, stats) -> None:
+        for chain in self.chains.values():
+            chain.record_stats(stats)
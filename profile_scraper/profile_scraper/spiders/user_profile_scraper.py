@@ -8,16 +8,25 @@ Two modes:
   1. Authenticated (recommended): pass your li_at cookie for full profile data.
      Usage: scrapy crawl user_profile_scraper -a profiles=user1,user2 -a li_at=YOUR_COOKIE
   2. Fallback: uses DuckDuckGo search results (name, headline, about only).
+
+Large inputs: -a input=handles.txt (or a CSV/JSONL file, gzipped or not, or
+- for stdin) is read lazily as the crawl runs; see scraper_common/inputs.py.
 """
 
 import re
-import html as html_module
 from urllib.parse import quote_plus
 
 import scrapy
+from scrapy import signals
+
+from profile_scraper.selector_chains import SelectorChain, SelectorChains
+from scraper_common import ddg_results, inputs
+from scraper_common.items import ProfileItem
 
 DEFAULT_PROFILES = ["satya-nadella", "reidhoffman"]
 
+# Defaults of the LINKEDIN_BASE_URL / DDG_HTML_URL settings
+LINKEDIN_BASE_URL = "https://www.linkedin.com"
 DDG_HTML_URL = "https://html.duckduckgo.com/html/"
 
 
@@ -29,9 +38,48 @@ def extract_handle(profile_input: str) -> str:
     return profile_input
 
 
-def normalize_profile_url(handle: str) -> str:
+def normalize_profile_url(handle: str, base_url: str = LINKEDIN_BASE_URL) -> str:
     """Build full LinkedIn profile URL from handle."""
-    return f"https://www.linkedin.com/in/{handle}"
+    return f"{base_url.rstrip('/')}/in/{handle}"
+
+
+def profile_selector_chains() -> SelectorChains:
+    """Selector alternatives per field for authenticated profile pages.
+
+    ``fallbacks`` scan the whole document and always run last.
+    """
+    return SelectorChains([
+        SelectorChain("name", [
+            ("css", ".top-card-layout__entity-info h1::text"),
+            ("css", "h1.text-heading-xlarge::text"),
+            ("css", "h1.inline::text"),
+        ], fallbacks=[("xpath", "//h1//text()")]),
+        SelectorChain("headline", [
+            ("css", ".top-card-layout__headline::text"),
+            ("css", "div.text-body-medium::text"),
+        ], fallbacks=[("xpath", "//div[contains(@class, 'headline')]//text()")]),
+        SelectorChain("location", [
+            ("css", ".top-card__subline-item::text"),
+            ("css", "div.text-body-small.inline::text"),
+        ], fallbacks=[("xpath", "//span[contains(@class, 'text-body-small')]//text()")]),
+        SelectorChain("profile_photo_url", [
+            ("css", "img[data-delayed-url]::attr(data-delayed-url)"),
+            ("css", ".top-card-layout__entity-image-container img::attr(src)"),
+            ("css", ".pv-top-card-profile-picture img::attr(src)"),
+        ]),
+        SelectorChain("connections", [
+            ("css", "a.face-pile__cta::text"),
+        ], fallbacks=[("xpath", "//span[contains(text(), 'connection')]/text()")]),
+        SelectorChain("about", [
+            ("css", ".core-section-container__content p::text"),
+            ("css", "section#about p::text"),
+            ("css", ".pv-about__summary-text::text"),
+        ]),
+        SelectorChain("current_role", [
+            ("css", "section#experience li span[aria-hidden=true]::text"),
+            ("css", "[data-section='experience'] .experience-item__title::text"),
+        ]),
+    ])
 
 
 class UserProfileScraperSpider(scrapy.Spider):
@@ -53,124 +101,114 @@ class UserProfileScraperSpider(scrapy.Spider):
         },
     }
 
-    def __init__(self, profiles: str = None, li_at: str = None, *args, **kwargs):
+    def __init__(self, profiles: str = None, li_at: str = None, input: str = None,
+                 column: str = None, format: str = None, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        raw_list = [p.strip() for p in (profiles or "").split(",") if p.strip()]
-        if not raw_list:
-            raw_list = DEFAULT_PROFILES
-        self.handles = [extract_handle(p) for p in raw_list]
+        self.profiles = [p.strip() for p in (profiles or "").split(",") if p.strip()]
+        self.input, self.column, self.format = input, column, format
+        if not self.profiles and not input:
+            self.profiles = DEFAULT_PROFILES
+        self.seen = inputs.Dedupe()
         self.li_at = li_at.strip() if li_at else None
-        if not self.handles:
-            raise ValueError("No profile handles provided. Use -a profiles=user1,user2")
         if self.li_at:
             self.logger.info("Using authenticated mode (li_at cookie provided)")
         else:
             self.logger.info("No li_at cookie — falling back to DuckDuckGo search mode")
+        self.selector_chains = profile_selector_chains()
+
+    @classmethod
+    def from_crawler(cls, crawler, *args, **kwargs):
+        spider = super().from_crawler(crawler, *args, **kwargs)
+        spider.selector_chains.load(crawler.settings.get("SELECTOR_STATS_FILE"))
+        return spider
+
+    def closed(self, reason):
+        self.selector_chains.record_stats(self.crawler.stats)
+        self.selector_chains.save(self.crawler.settings.get("SELECTOR_STATS_FILE"))
+
+    def handles(self):
+        """Profile handles from the arguments, without repeats, read as needed."""
+        raw = self.profiles
+        if self.input:
+            raw = inputs.iter_values(self.input, self.column, self.format)
+        return inputs.unique((h for h in map(extract_handle, raw) if h), self.seen)
+
+    async def start(self):
+        # Read further input only once the scheduler runs dry, so a huge input
+        # is not queued up front
+        for request in self.start_requests():
+            if self.crawler.engine.needs_backout():
+                await self.crawler.signals.wait_for(signals.scheduler_empty)
+            yield request
 
     def start_requests(self):
-        for index, handle in enumerate(self.handles):
-            if self.li_at:
-                # Authenticated: hit LinkedIn directly
-                yield scrapy.Request(
-                    url=normalize_profile_url(handle),
-                    callback=self.parse_linkedin_profile,
-                    cookies={"li_at": self.li_at},
-                    meta={"handle": handle, "profile_index": index},
-                    dont_filter=True,
-                )
-            else:
-                # Fallback: use DuckDuckGo search
-                query = quote_plus(f"site:linkedin.com/in/{handle}")
-                yield scrapy.Request(
-                    url=f"{DDG_HTML_URL}?q={query}",
-                    callback=self.parse_ddg_results,
-                    meta={"handle": handle, "profile_index": index},
-                    dont_filter=True,
-                )
+        # In distributed mode the DistributedCrawl extension feeds leased handles
+        if self.settings.get("WORK_QUEUE_PATH"):
+            return
+        for index, handle in enumerate(self.handles()):
+            yield self.request_for(handle, index)
+
+    def request_for(self, handle: str, index: int = None, li_at: str = None):
+        """First request for a handle (``index`` is None for leased handles).
+
+        ``li_at`` overrides the spider's cookie for this handle.
+        """
+        meta = {"handle": handle, "profile_index": index, "work_key": handle}
+        li_at = li_at or self.li_at
+        if li_at:
+            # Authenticated: hit LinkedIn directly
+            return scrapy.Request(
+                url=normalize_profile_url(handle, self.settings.get("LINKEDIN_BASE_URL", LINKEDIN_BASE_URL)),
+                callback=self.parse_linkedin_profile,
+                cookies={"li_at": li_at},
+                # A dead cookie gets a login wall or a 999: fall back instead
+                meta={**meta, "handle_page_classes": ["authwall", "challenge"]},
+                dont_filter=True,
+            )
+        # Fallback: use DuckDuckGo search
+        return self._ddg_request(meta)
+
+    def _ddg_request(self, meta: dict, replaces: scrapy.Request = None):
+        """DuckDuckGo lookup; keeps the errback and priority of the request it ``replaces``."""
+        query = quote_plus(f"site:linkedin.com/in/{meta['handle']}")
+        return scrapy.Request(
+            url=f"{self.settings.get('DDG_HTML_URL', DDG_HTML_URL)}?q={query}",
+            callback=self.parse_ddg_results,
+            errback=replaces.errback if replaces is not None else None,
+            priority=replaces.priority if replaces is not None else 0,
+            meta={key: meta.get(key) for key in ("handle", "profile_index", "work_key")},
+            dont_filter=True,
+        )
+
+    def _progress(self, meta: dict) -> str:
+        if meta.get("profile_index") is None:
+            return "(leased)"
+        return f"#{meta['profile_index'] + 1}"
 
     # ── Authenticated mode: parse LinkedIn profile page directly ──
 
     def parse_linkedin_profile(self, response):
         handle = response.meta["handle"]
-        profile_index = response.meta["profile_index"]
         self.logger.info(
-            f"Scraping profile {profile_index + 1}/{len(self.handles)} "
+            f"Scraping profile {self._progress(response.meta)} "
             f"[{handle}] | Status: {response.status}"
         )
 
-        if response.status == 999:
+        page_class = response.meta.get("page_class")
+        if response.status == 999 or page_class in ("authwall", "challenge"):
             self.logger.warning(
-                f"LinkedIn returned 999 for {handle}. Cookie may be expired. "
-                "Falling back to DuckDuckGo search."
-            )
-            query = quote_plus(f"site:linkedin.com/in/{handle}")
-            yield scrapy.Request(
-                url=f"{DDG_HTML_URL}?q={query}",
-                callback=self.parse_ddg_results,
-                meta={"handle": handle, "profile_index": profile_index},
-                dont_filter=True,
+                f"LinkedIn returned a {page_class or response.status} page for {handle}. "
+                "Cookie may be expired. Falling back to DuckDuckGo search."
             )
+            yield self._ddg_request(response.meta, response.request)
             return
 
         item = self._empty_item(handle)
 
-        # Name
-        item["name"] = (
-            response.css(".top-card-layout__entity-info h1::text").get()
-            or response.css("h1.text-heading-xlarge::text").get()
-            or response.css("h1.inline::text").get()
-            or response.xpath("//h1//text()").get()
-        )
-        item["name"] = item["name"].strip() if item["name"] else "not-found"
-
-        # Headline
-        item["headline"] = (
-            response.css(".top-card-layout__headline::text").get()
-            or response.css("div.text-body-medium::text").get()
-            or response.xpath("//div[contains(@class, 'headline')]//text()").get()
-        )
-        item["headline"] = item["headline"].strip() if item["headline"] else "not-found"
-
-        # Location
-        item["location"] = (
-            response.css(".top-card__subline-item::text").get()
-            or response.css("div.text-body-small.inline::text").get()
-            or response.xpath("//span[contains(@class, 'text-body-small')]//text()").get()
-        )
-        item["location"] = item["location"].strip() if item["location"] else "not-found"
-
-        # Profile photo
-        item["profile_photo_url"] = (
-            response.css("img[data-delayed-url]::attr(data-delayed-url)").get()
-            or response.css(".top-card-layout__entity-image-container img::attr(src)").get()
-            or response.css(".pv-top-card-profile-picture img::attr(src)").get()
-            or "not-found"
-        )
-
-        # Connections
-        conn_text = (
-            response.css("a.face-pile__cta::text").get()
-            or response.xpath("//span[contains(text(), 'connection')]/text()").get()
-        )
-        item["connections"] = conn_text.strip() if conn_text else "not-found"
-
-        # About
-        about = (
-            response.css(".core-section-container__content p::text").get()
-            or response.css("section#about p::text").get()
-            or response.css(".pv-about__summary-text::text").get()
-        )
-        item["about"] = about.strip() if about else "not-found"
-
-        # Current role
-        try:
-            exp = (
-                response.css("section#experience li span[aria-hidden=true]::text").get()
-                or response.css("[data-section='experience'] .experience-item__title::text").get()
-            )
-            item["current_role"] = exp.strip() if exp else "not-found"
-        except (IndexError, TypeError):
-            item["current_role"] = "not-found"
+        # Each field tries its most successful selector first (see selector_chains.py)
+        for field, chain in self.selector_chains.chains.items():
+            value = chain.extract(response)
+            setattr(item, field, value.strip() if value else None)
 
         yield item
 
@@ -178,27 +216,15 @@ class UserProfileScraperSpider(scrapy.Spider):
 
     def parse_ddg_results(self, response):
         handle = response.meta["handle"]
-        profile_index = response.meta["profile_index"]
         self.logger.info(
-            f"[DDG fallback] profile {profile_index + 1}/{len(self.handles)} "
+            f"[DDG fallback] profile {self._progress(response.meta)} "
             f"[{handle}] | Status: {response.status}"
         )
 
         item = self._empty_item(handle)
 
-        # DDG HTML results: <div class="result"> or older formats
-        results = response.css("div.result") or response.css("div.results_links")
-
-        # Find result matching our handle
-        best = None
-        for r in results:
-            url_text = (r.css("a.result__url::text").get("") or
-                        r.css("a.result__a::attr(href)").get("")).strip()
-            if handle.lower() in url_text.lower():
-                best = r
-                break
-        if best is None and results:
-            best = results[0]
+        # First result whose URL has the handle, else the first result
+        best = ddg_results.best_result(response.text, handle)
 
         if best is None:
             self.logger.warning(f"No DDG results for {handle}")
@@ -206,54 +232,38 @@ class UserProfileScraperSpider(scrapy.Spider):
             return
 
         # Parse title: "Full Name - Headline | LinkedIn"
-        raw_title = best.css("a.result__a").get("")
-        raw_title = re.sub(r"<[^>]+>", "", raw_title).strip()
-        raw_title = html_module.unescape(raw_title)
-        raw_title = re.sub(r"\s*[-|]\s*LinkedIn\s*$", "", raw_title, flags=re.IGNORECASE)
+        raw_title = re.sub(r"\s*[-|]\s*LinkedIn\s*$", "", best.title, flags=re.IGNORECASE)
 
         parts = re.split(r"\s+-\s+", raw_title, maxsplit=1)
         if len(parts) == 2:
-            item["name"] = parts[0].strip()
-            item["headline"] = parts[1].strip()
+            item.name = parts[0].strip() or None
+            item.headline = parts[1].strip() or None
         elif raw_title:
-            item["name"] = raw_title.strip()
+            item.name = raw_title.strip()
 
         # Parse snippet (contains about/summary)
-        raw_snippet = best.css("a.result__snippet").get("")
-        raw_snippet = re.sub(r"<[^>]+>", "", raw_snippet).strip()
-        raw_snippet = html_module.unescape(raw_snippet)
+        raw_snippet = best.snippet
         if raw_snippet:
             snippet_parts = raw_snippet.split(" · ", maxsplit=1)
             if len(snippet_parts) == 2:
-                item["about"] = snippet_parts[1].strip()
-                if item["headline"] == "not-found":
-                    item["headline"] = snippet_parts[0].strip()
+                item.about = snippet_parts[1].strip() or None
+                if item.headline is None:
+                    item.headline = snippet_parts[0].strip() or None
             else:
-                item["about"] = raw_snippet.strip()
+                item.about = raw_snippet.strip()
 
         # Extract LinkedIn URL from result
-        href = best.css("a.result__a::attr(href)").get("")
-        if "linkedin.com/in/" in href:
-            item["profile_url"] = href.split("?")[0]
-        else:
-            url_text = best.css("a.result__url::text").get("").strip()
-            if "linkedin.com/in/" in url_text:
-                if not url_text.startswith("http"):
-                    url_text = "https://" + url_text
-                item["profile_url"] = url_text.split("?")[0]
+        if "linkedin.com/in/" in best.href:
+            item.profile_url = best.href.split("?")[0]
+        elif "linkedin.com/in/" in best.url:
+            url_text = best.url
+            if not url_text.startswith("http"):
+                url_text = "https://" + url_text
+            item.profile_url = url_text.split("?")[0]
 
         yield item
 
     # ── Helpers ──
 
-    def _empty_item(self, handle: str) -> dict:
-        return {
-            "profile_url": normalize_profile_url(handle),
-            "name": "not-found",
-            "headline": "not-found",
-            "location": "not-found",
-            "profile_photo_url": "not-found",
-            "connections": "not-found",
-            "about": "not-found",
-            "current_role": "not-found",
-        }
+    def _empty_item(self, handle: str) -> ProfileItem:
+        return ProfileItem(profile_url=normalize_profile_url(handle))
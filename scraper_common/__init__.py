@@ -0,0 +1,9 @@
+"""
+Code shared by the API and both Scrapy projects, kept in one place.
+
+The Scrapy projects put the repository root on ``sys.path`` when their
+package is imported (see their ``__init__.py``), so ``scrapy crawl`` run
+from a project directory finds this package too. Modules the API imports
+do not import Scrapy; the Scrapy components built on them are in
+``pipelines`` and ``middlewares``.
+"""
@@ -0,0 +1,160 @@
+"""
+Content-addressed store for company logos and profile photos.
+
+Each image is saved once, under the SHA-256 of its bytes, in a directory
+sharded on the first hex digits (``ab/cd/abcd….jpg``), so the same logo
+served under many CDN URLs takes one file. ``index.sqlite`` maps every URL
+downloaded to its key, and a URL already there is not downloaded again. The
+index is a single SQLite file, so several processes (API workers,
+distributed crawl workers) can share one store.
+
+``AssetFetcher`` downloads with ``requests`` in its own thread pool of
+``concurrency`` threads, apart from page fetching, so asset downloads never
+hold up a page. Concurrent requests for one URL share one download.
+Responses that are not images or are larger than ``max_bytes`` are not
+stored.
+
+Used by the API (``assets: true``) and by ``pipelines.AssetsPipeline`` in
+both Scrapy projects.
+"""
+
+import asyncio
+import hashlib
+import logging
+import mimetypes
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36"
+)
+# URL field on an item -> field receiving the stored asset's key
+ASSET_FIELDS = {
+    "company_logo_url": "company_logo_key",
+    "profile_photo_url": "profile_photo_key",
+}
+
+
+class AssetStore:
+    """Image files keyed by content hash, and the URL -> key index."""
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self._lock = threading.Lock()
+        self.db = sqlite3.connect(
+            os.path.join(root, "index.sqlite"), timeout=30, isolation_level=None, check_same_thread=False
+        )
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS urls (url TEXT PRIMARY KEY, key TEXT NOT NULL, stored REAL NOT NULL)"
+        )
+
+    def key_for(self, url: str) -> str | None:
+        """Key of the asset already downloaded from ``url``."""
+        with self._lock:
+            row = self.db.execute("SELECT key FROM urls WHERE url = ?", (url,)).fetchone()
+        return row[0] if row else None
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key[2:4], key)
+
+    def put(self, url: str, data: bytes, content_type: str = "") -> tuple[str, bool]:
+        """Store ``data`` downloaded from ``url``; returns its key and whether the file is new."""
+        ext = mimetypes.guess_extension(content_type.split(";")[0].strip()) or ""
+        key = hashlib.sha256(data).hexdigest() + ext
+        path = self.path(key)
+        new = not os.path.exists(path)
+        if new:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".part")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)  # atomic: readers never see half a file
+        with self._lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO urls (url, key, stored) VALUES (?, ?, ?)", (url, key, time.time())
+            )
+        return key, new
+
+    def close(self) -> None:
+        self.db.close()
+
+
+class AssetFetcher:
+    """Downloads assets into a store, at most ``concurrency`` at a time."""
+
+    def __init__(self, store: AssetStore, concurrency: int = 8, timeout: float = 20, max_bytes: int = 5 << 20):
+        self.store = store
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.stats = Counter()
+        self._stats_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="asset")
+        self._inflight: dict[str, asyncio.Future] = {}
+
+    async def fetch(self, url: str) -> str | None:
+        """Key of the asset at ``url``, downloading it unless already stored; None on failure."""
+        future = self._inflight.get(url)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = self._inflight[url] = loop.run_in_executor(self._executor, self._fetch, url)
+            future.add_done_callback(lambda _: self._inflight.pop(url, None))
+        try:
+            return await asyncio.shield(future)
+        except Exception as e:
+            logger.info("Asset %s not stored: %s", url, e)
+            return None
+
+    async def fetch_all(self, urls) -> dict[str, str | None]:
+        """Keys for ``urls`` (each URL fetched once), downloaded concurrently."""
+        unique = list(dict.fromkeys(url for url in urls if url))
+        keys = await asyncio.gather(*(self.fetch(url) for url in unique))
+        return dict(zip(unique, keys))
+
+    def _fetch(self, url: str) -> str:
+        key = self.store.key_for(url)
+        if key is not None:
+            self._count("skipped")
+            return key
+        try:
+            data, content_type = self._download(url)
+            key, new = self.store.put(url, data, content_type)
+        except Exception:
+            self._count("failed")
+            raise
+        self._count("downloaded" if new else "deduplicated")
+        return key
+
+    def _count(self, name: str) -> None:
+        # Called from the pool threads
+        with self._stats_lock:
+            self.stats[name] += 1
+
+    def _download(self, url: str) -> tuple[bytes, str]:
+        with requests.get(url, headers={"User-Agent": USER_AGENT}, timeout=self.timeout, stream=True) as resp:
+            resp.raise_for_status()
+            content_type = resp.headers.get("Content-Type", "")
+            if not content_type.startswith("image/"):
+                raise ValueError(f"not an image ({content_type or 'no content type'})")
+            chunks, size = [], 0
+            for chunk in resp.iter_content(64 * 1024):
+                size += len(chunk)
+                if size > self.max_bytes:
+                    raise ValueError(f"larger than {self.max_bytes} bytes")
+                chunks.append(chunk)
+        return b"".join(chunks), content_type
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self.store.close()
@@ -0,0 +1,333 @@
+"""
+Per-callback timing, rolling throughput and a JSON report per crawl.
+
+``CallbackTimingMiddleware`` (a spider middleware, closest to the spider)
+times every spider callback: the time spent inside the callback while its
+output is consumed, and the items and requests it yields. Timings go into
+the crawl stats (``callback/<name>/...``), with a histogram of powers of two
+milliseconds for percentiles.
+
+``CrawlStats`` (an extension) logs throughput over the last
+``CRAWL_STATS_INTERVAL`` seconds: pages and items per minute, KB per page,
+999 responses and mean time per callback. When the spider closes it writes
+``<CRAWL_STATS_DIR>/<spider>-<start time>.json`` with totals, per-callback
+timings, the throughput timeline, the settings that shape throughput and the
+raw Scrapy stats. Two reports can be compared (from the repository root):
+
+    python -m scraper_common.crawl_stats compare company_data_scraper/crawl_stats/a.json company_data_scraper/crawl_stats/b.json
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+import time
+from datetime import datetime, timezone
+
+from scrapy import Request, signals
+from scrapy.exceptions import NotConfigured
+from scrapy.utils.asyncio import create_looping_call
+
+logger = logging.getLogger(__name__)
+
+PREFIX = "callback/"
+# Histogram buckets: <= 1, 2, 4, ... 65536 ms
+_BUCKETS = 17
+
+# Settings recorded in the report, so runs can be compared
+REPORTED_SETTINGS = (
+    "CONCURRENT_REQUESTS", "CONCURRENT_REQUESTS_PER_DOMAIN", "DOWNLOAD_DELAY",
+    "AUTOTHROTTLE_ENABLED", "RETRY_TIMES", "DOWNLOAD_TIMEOUT", "WORK_QUEUE_PATH",
+)
+
+
+def _callback_name(response) -> str:
+    callback = response.request.callback if response.request is not None else None
+    return getattr(callback, "__name__", None) or "parse"
+
+
+class CallbackTimingMiddleware:
+    def __init__(self, stats):
+        self.stats = stats
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool("CRAWL_STATS_ENABLED", True):
+            raise NotConfigured
+        return cls(crawler.stats)
+
+    def _record(self, name: str, elapsed: float, items: int, requests: int) -> None:
+        key = f"{PREFIX}{name}"
+        ms = elapsed * 1000
+        bucket = min(_BUCKETS - 1, max(0, math.ceil(math.log2(ms)) if ms > 1 else 0))
+        self.stats.inc_value(f"{key}/count")
+        self.stats.inc_value(f"{key}/seconds", elapsed)
+        self.stats.max_value(f"{key}/max_ms", round(ms, 3))
+        self.stats.inc_value(f"{key}/ms_le_{2 ** bucket}")
+        if items:
+            self.stats.inc_value(f"{key}/items", items)
+        if requests:
+            self.stats.inc_value(f"{key}/requests", requests)
+
+    def process_spider_output(self, response, result, spider=None):
+        name, elapsed, items, requests = _callback_name(response), 0.0, 0, 0
+        iterator = iter(result)
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    output = next(iterator)
+                except StopIteration:
+                    break
+                finally:
+                    elapsed += time.perf_counter() - start
+                if isinstance(output, Request):
+                    requests += 1
+                else:
+                    items += 1
+                yield output
+        finally:
+            self._record(name, elapsed, items, requests)
+
+    async def process_spider_output_async(self, response, result, spider=None):
+        name, elapsed, items, requests = _callback_name(response), 0.0, 0, 0
+        iterator = result.__aiter__()
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    output = await iterator.__anext__()
+                except StopAsyncIteration:
+                    break
+                finally:
+                    elapsed += time.perf_counter() - start
+                if isinstance(output, Request):
+                    requests += 1
+                else:
+                    items += 1
+                yield output
+        finally:
+            self._record(name, elapsed, items, requests)
+
+
+def callback_summary(stats: dict) -> dict:
+    """Per-callback totals and percentile estimates (bucket upper bounds) from crawl stats."""
+    raw = {}
+    for key, value in stats.items():
+        if key.startswith(PREFIX):
+            name, metric = key[len(PREFIX):].rsplit("/", 1)
+            raw.setdefault(name, {})[metric] = value
+    summary = {}
+    for name, values in sorted(raw.items()):
+        count = values.get("count", 0)
+        histogram = sorted(
+            (int(metric[len("ms_le_"):]), n) for metric, n in values.items() if metric.startswith("ms_le_")
+        )
+
+        def quantile(q):
+            seen = 0
+            for upper, n in histogram:
+                seen += n
+                if seen >= q * count:
+                    return min(upper, values.get("max_ms", upper))
+            return None
+
+        seconds = values.get("seconds", 0.0)
+        summary[name] = {
+            "calls": count,
+            "items": values.get("items", 0),
+            "requests": values.get("requests", 0),
+            "total_s": round(seconds, 3),
+            "mean_ms": round(1000 * seconds / count, 3) if count else None,
+            "p50_ms": quantile(0.5),
+            "p95_ms": quantile(0.95),
+            "max_ms": values.get("max_ms"),
+        }
+    return summary
+
+
+class CrawlStats:
+    def __init__(self, crawler, interval: float, directory: str | None):
+        self.crawler = crawler
+        self.stats = crawler.stats
+        self.interval = interval
+        self.directory = directory
+        self.timeline = []
+        self.task = None
+        self._started = None
+        self._started_at = None
+        self._previous = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        if not settings.getbool("CRAWL_STATS_ENABLED", True):
+            raise NotConfigured
+        ext = cls(crawler, settings.getfloat("CRAWL_STATS_INTERVAL", 30), settings.get("CRAWL_STATS_DIR"))
+        crawler.signals.connect(ext.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(ext.response_received, signal=signals.response_received)
+        crawler.signals.connect(ext.spider_closed, signal=signals.spider_closed)
+        return ext
+
+    def spider_opened(self, spider):
+        self._started = time.monotonic()
+        self._started_at = datetime.now(timezone.utc)
+        self._previous = self._counters()
+        if self.interval > 0:
+            self.task = create_looping_call(self.log, spider)
+            self.task.start(self.interval, now=False)
+
+    def response_received(self, response, request, spider):
+        self.stats.inc_value("crawl_stats/page_bytes", len(response.body))
+        self.stats.max_value("crawl_stats/max_page_bytes", len(response.body))
+
+    def _counters(self) -> dict:
+        get = self.stats.get_value
+        counters = {
+            "t": time.monotonic(),
+            "pages": get("response_received_count", 0),
+            "items": get("item_scraped_count", 0),
+            "bytes": get("crawl_stats/page_bytes", 0),
+            "status_999": get("downloader/response_status_count/999", 0),
+        }
+        for name, values in callback_summary(self.stats.get_stats()).items():
+            counters[f"{PREFIX}{name}"] = (values["calls"], values["total_s"])
+        return counters
+
+    def _window(self, before: dict, after: dict) -> dict:
+        minutes = max(after["t"] - before["t"], 1e-9) / 60
+        pages = after["pages"] - before["pages"]
+        window = {
+            "elapsed_s": round(after["t"] - self._started, 1),
+            "pages_per_min": round(pages / minutes, 1),
+            "items_per_min": round((after["items"] - before["items"]) / minutes, 1),
+            "kb_per_page": round((after["bytes"] - before["bytes"]) / pages / 1024, 1) if pages else None,
+            "status_999": after["status_999"] - before["status_999"],
+            "callback_mean_ms": {},
+        }
+        for key, value in after.items():
+            if not key.startswith(PREFIX):
+                continue
+            calls, seconds = value
+            calls_before, seconds_before = before.get(key, (0, 0.0))
+            if calls > calls_before:
+                window["callback_mean_ms"][key[len(PREFIX):]] = round(
+                    1000 * (seconds - seconds_before) / (calls - calls_before), 2
+                )
+        return window
+
+    def log(self, spider):
+        current = self._counters()
+        window = self._window(self._previous, current)
+        self._previous = current
+        self.timeline.append(window)
+        callbacks = ", ".join(f"{name} {ms} ms" for name, ms in window["callback_mean_ms"].items())
+        logger.info(
+            "Last %gs: %s pages/min, %s items/min, %s KB/page, %d 999s%s",
+            self.interval, window["pages_per_min"], window["items_per_min"],
+            window["kb_per_page"], window["status_999"],
+            f"; callbacks: {callbacks}" if callbacks else "",
+            extra={"spider": spider},
+        )
+
+    def report(self, spider, reason: str) -> dict:
+        stats = self.stats.get_stats()
+        elapsed = time.monotonic() - self._started
+        pages = stats.get("response_received_count", 0)
+        items = stats.get("item_scraped_count", 0)
+        page_bytes = stats.get("crawl_stats/page_bytes", 0)
+        statuses = {
+            key.rsplit("/", 1)[1]: value
+            for key, value in stats.items()
+            if key.startswith("downloader/response_status_count/")
+        }
+        return {
+            "spider": spider.name,
+            "reason": reason,
+            "started": self._started_at.isoformat(),
+            "elapsed_s": round(elapsed, 3),
+            "totals": {
+                "pages": pages,
+                "items": items,
+                "pages_per_s": round(pages / elapsed, 3) if elapsed else None,
+                "items_per_s": round(items / elapsed, 3) if elapsed else None,
+                "page_bytes": page_bytes,
+                "bytes_per_page": round(page_bytes / pages) if pages else None,
+                "max_page_bytes": stats.get("crawl_stats/max_page_bytes"),
+                "statuses": statuses,
+                "status_999_rate": round(statuses.get("999", 0) / pages, 4) if pages else None,
+                "retries": stats.get("retry/count", 0),
+                "errors": stats.get("log_count/ERROR", 0),
+            },
+            "callbacks": callback_summary(stats),
+            "timeline": self.timeline,
+            "settings": {name: self.crawler.settings.get(name) for name in REPORTED_SETTINGS},
+            "stats": stats,
+        }
+
+    def spider_closed(self, spider, reason):
+        if self.task is not None and self.task.running:
+            self.task.stop()
+        if self._started is None or not self.directory:
+            return
+        report = self.report(spider, reason)
+        os.makedirs(self.directory, exist_ok=True)
+        name = f"{spider.name}-{self._started_at.strftime('%Y%m%dT%H%M%S')}.json"
+        path = os.path.join(self.directory, name)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, default=str)
+        logger.info("Crawl stats report written to %s", path, extra={"spider": spider})
+
+
+# ── Comparing reports ──
+
+_COMPARED = (
+    ("elapsed_s", lambda r: r["elapsed_s"]),
+    ("pages", lambda r: r["totals"]["pages"]),
+    ("items", lambda r: r["totals"]["items"]),
+    ("pages/s", lambda r: r["totals"]["pages_per_s"]),
+    ("items/s", lambda r: r["totals"]["items_per_s"]),
+    ("bytes/page", lambda r: r["totals"]["bytes_per_page"]),
+    ("999 rate", lambda r: r["totals"]["status_999_rate"]),
+    ("retries", lambda r: r["totals"]["retries"]),
+)
+
+
+def compare(before: dict, after: dict) -> list[tuple[str, object, object, str]]:
+    """(metric, before, after, change) rows for two reports."""
+    rows = []
+
+    def add(label, a, b):
+        change = f"{100 * (b - a) / a:+.1f}%" if isinstance(a, (int, float)) and isinstance(
+            b, (int, float)) and a else ""
+        rows.append((label, a, b, change))
+
+    for label, get in _COMPARED:
+        add(label, get(before), get(after))
+    for name in sorted(set(before["callbacks"]) | set(after["callbacks"])):
+        for metric in ("mean_ms", "p95_ms"):
+            add(f"{name} {metric}", before["callbacks"].get(name, {}).get(metric),
+                after["callbacks"].get(name, {}).get(metric))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare crawl stats reports")
+    sub = parser.add_subparsers(dest="command", required=True)
+    compare_cmd = sub.add_parser("compare", help="compare two reports")
+    compare_cmd.add_argument("before")
+    compare_cmd.add_argument("after")
+    args = parser.parse_args(argv)
+
+    with open(args.before, encoding="utf-8") as f:
+        before = json.load(f)
+    with open(args.after, encoding="utf-8") as f:
+        after = json.load(f)
+    print(f"{'metric':32} {'before':>12} {'after':>12} {'change':>9}")
+    for label, a, b, change in compare(before, after):
+        print(f"{label:32} {str(a):>12} {str(b):>12} {change:>9}")
+
+
+if __name__ == "__main__":
+    main()
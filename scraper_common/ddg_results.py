@@ -0,0 +1,74 @@
+"""
+One-pass parser for DuckDuckGo's HTML results page.
+
+The profile fallback only needs three things from each result: the link and
+title (``a.result__a``), the displayed URL (``a.result__url``) and the
+snippet (``a.result__snippet``). Instead of building a DOM, one regular
+expression walks the page's result anchors in order; a result starts at its
+title anchor and ends where the next one starts. Scanning stops at the first
+result whose URL contains the handle, and only the result returned has its
+text stripped of tags and unescaped.
+
+``best_result`` picks the same result as the previous selector-based code:
+the first whose displayed URL (or link, when there is none) contains the
+handle, else the first result.
+"""
+
+import html
+import re
+from typing import NamedTuple
+
+# Result anchors, with their kind (a, url or snippet), attributes and inner HTML
+_ANCHOR = re.compile(
+    r'<a\s([^>]*?\bclass="[^"]*?\bresult__(a|url|snippet)\b[^"]*"[^>]*)>(.*?)</a>',
+    re.DOTALL,
+)
+_HREF = re.compile(r'\bhref="([^"]*)"')
+_TAG = re.compile(r"<[^>]+>")
+
+
+class Result(NamedTuple):
+    href: str
+    url: str
+    title: str
+    snippet: str
+
+
+def _text(raw: str) -> str:
+    return html.unescape(_TAG.sub("", raw)).strip()
+
+
+def _blocks(page: str):
+    """``[href, raw url, raw title, raw snippet]`` per result, in page order."""
+    block = None
+    for match in _ANCHOR.finditer(page):
+        kind = match.group(2)
+        if kind == "a":
+            if block is not None:
+                yield block
+            href = _HREF.search(match.group(1))
+            block = [html.unescape(href.group(1)) if href else "", "", match.group(3), ""]
+            continue
+        if block is None:
+            block = ["", "", "", ""]  # a result without a title link
+        block[1 if kind == "url" else 3] = match.group(3)
+    if block is not None:
+        yield block
+
+
+def _result(block: list) -> Result:
+    href, url, title, snippet = block
+    return Result(href, _text(url), _text(title), _text(snippet))
+
+
+def best_result(page: str, handle: str) -> Result | None:
+    """The first result whose URL contains ``handle``, else the first result."""
+    handle = handle.lower()
+    first = None
+    for block in _blocks(page):
+        url = _text(block[1]) or block[0].strip()
+        if handle in url.lower():
+            return _result(block)
+        if first is None:
+            first = block
+    return _result(first) if first is not None else None
@@ -0,0 +1,415 @@
+"""
+Distributed crawl mode: many spider processes sharing one leased work queue.
+
+Workers lease batches of keys (company or profile handles) from a
+``WorkQueue``, keep the leases alive with heartbeats and mark each key done
+with its scraped item. A lease that is not renewed (crashed or stuck worker)
+expires and the key is handed to another worker, up to ``max_attempts``.
+Results are stored per key with upsert semantics, so a key scraped twice
+still yields one result. Workers also draw from a shared per-host token
+bucket, so the fleet as a whole respects one rate budget.
+
+``SqliteWorkQueue`` implements the queue on a single SQLite file (SQLite's
+file locks make every operation atomic across processes), which is enough to
+run several workers on one machine or on hosts sharing a filesystem.
+
+Usage (the queue commands from the repository root, the workers from a
+project directory, with either spider):
+
+    python -m scraper_common.distributed seed crawl.sqlite handles.txt   # or .csv/.jsonl[.gz], see inputs.py
+    scrapy crawl company_profile_scraper -s WORK_QUEUE_PATH=../crawl.sqlite   # x N
+    python -m scraper_common.distributed status crawl.sqlite
+    python -m scraper_common.distributed export crawl.sqlite out.jsonl
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import sqlite3
+import sys
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from itemadapter import ItemAdapter
+from scrapy import signals
+from scrapy.exceptions import DontCloseSpider, NotConfigured
+from scrapy.utils.misc import arg_to_iter
+from twisted.internet import task
+
+from scraper_common import inputs
+
+
+class WorkQueue(ABC):
+    """Leased work queue shared by all workers of a distributed crawl."""
+
+    @abstractmethod
+    def put(self, keys) -> int:
+        """Add keys (duplicates are ignored). Returns how many were new."""
+
+    @abstractmethod
+    def lease(self, worker: str, n: int, ttl: float) -> list[str]:
+        """Lease up to ``n`` pending or expired keys to ``worker`` for ``ttl`` seconds."""
+
+    @abstractmethod
+    def heartbeat(self, worker: str, keys, ttl: float) -> None:
+        """Extend ``worker``'s leases on ``keys`` by ``ttl`` seconds."""
+
+    @abstractmethod
+    def complete(self, worker: str, key: str, result: dict) -> None:
+        """Store the result for ``key`` (idempotent) and mark it done."""
+
+    @abstractmethod
+    def release(self, worker: str, key: str) -> None:
+        """Give a leased key back so another worker can retry it."""
+
+    @abstractmethod
+    def fail(self, worker: str, key: str) -> None:
+        """Give up on a leased key (e.g. the page does not exist)."""
+
+    @abstractmethod
+    def outstanding(self) -> int:
+        """Number of keys that are not done or failed yet."""
+
+    @abstractmethod
+    def acquire_rate(self, host: str, rate: float, burst: float) -> float:
+        """Reserve one request against ``host``'s shared token bucket.
+
+        Returns how many seconds the caller must wait before sending it.
+        """
+
+
+class SqliteWorkQueue(WorkQueue):
+    """Work queue in one SQLite file.
+
+    An instance must be used by one thread at a time, but not necessarily the
+    one that opened it (``SharedRateLimitMiddleware`` uses it from its own).
+    """
+
+    def __init__(self, path: str, max_attempts: int = 3):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.db = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS tasks (
+                key TEXT PRIMARY KEY,
+                status TEXT NOT NULL DEFAULT 'pending',
+                worker TEXT,
+                lease_until REAL,
+                attempts INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status, lease_until);
+            CREATE TABLE IF NOT EXISTS results (
+                key TEXT PRIMARY KEY,
+                data TEXT NOT NULL,
+                worker TEXT,
+                completed_at REAL
+            );
+            CREATE TABLE IF NOT EXISTS buckets (
+                host TEXT PRIMARY KEY,
+                tokens REAL NOT NULL,
+                updated REAL NOT NULL
+            );
+        """)
+
+    def _transaction(self):
+        return _Immediate(self.db)
+
+    def put(self, keys) -> int:
+        with self._transaction():
+            before = self.db.total_changes
+            self.db.executemany(
+                "INSERT OR IGNORE INTO tasks (key) VALUES (?)", ((k,) for k in keys)
+            )
+            return self.db.total_changes - before
+
+    def lease(self, worker: str, n: int, ttl: float) -> list[str]:
+        now = time.time()
+        with self._transaction():
+            self.db.execute(
+                "UPDATE tasks SET status = 'failed' "
+                "WHERE status = 'leased' AND lease_until < ? AND attempts >= ?",
+                (now, self.max_attempts),
+            )
+            keys = [row[0] for row in self.db.execute(
+                "SELECT key FROM tasks WHERE status = 'pending' "
+                "OR (status = 'leased' AND lease_until < ?) ORDER BY rowid LIMIT ?",
+                (now, n),
+            )]
+            self.db.executemany(
+                "UPDATE tasks SET status = 'leased', worker = ?, lease_until = ?, "
+                "attempts = attempts + 1 WHERE key = ?",
+                ((worker, now + ttl, k) for k in keys),
+            )
+        return keys
+
+    def heartbeat(self, worker: str, keys, ttl: float) -> None:
+        until = time.time() + ttl
+        with self._transaction():
+            self.db.executemany(
+                "UPDATE tasks SET lease_until = ? "
+                "WHERE key = ? AND worker = ? AND status = 'leased'",
+                ((until, k, worker) for k in keys),
+            )
+
+    def complete(self, worker: str, key: str, result: dict) -> None:
+        with self._transaction():
+            self.db.execute(
+                "INSERT OR REPLACE INTO results (key, data, worker, completed_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, json.dumps(result, ensure_ascii=False), worker, time.time()),
+            )
+            self.db.execute(
+                "UPDATE tasks SET status = 'done', lease_until = NULL WHERE key = ?", (key,)
+            )
+
+    def release(self, worker: str, key: str) -> None:
+        with self._transaction():
+            self.db.execute(
+                "UPDATE tasks SET status = CASE WHEN attempts >= ? THEN 'failed' "
+                "ELSE 'pending' END, lease_until = NULL "
+                "WHERE key = ? AND worker = ? AND status = 'leased'",
+                (self.max_attempts, key, worker),
+            )
+
+    def fail(self, worker: str, key: str) -> None:
+        with self._transaction():
+            self.db.execute(
+                "UPDATE tasks SET status = 'failed', lease_until = NULL "
+                "WHERE key = ? AND worker = ? AND status = 'leased'",
+                (key, worker),
+            )
+
+    def outstanding(self) -> int:
+        return self.db.execute(
+            "SELECT COUNT(*) FROM tasks WHERE status IN ('pending', 'leased')"
+        ).fetchone()[0]
+
+    def counts(self) -> dict:
+        return dict(self.db.execute("SELECT status, COUNT(*) FROM tasks GROUP BY status"))
+
+    def results(self):
+        for key, data in self.db.execute("SELECT key, data FROM results ORDER BY key"):
+            yield key, json.loads(data)
+
+    def acquire_rate(self, host: str, rate: float, burst: float) -> float:
+        now = time.time()
+        with self._transaction():
+            row = self.db.execute(
+                "SELECT tokens, updated FROM buckets WHERE host = ?", (host,)
+            ).fetchone()
+            tokens, updated = row if row else (burst, now)
+            tokens = min(burst, tokens + (now - updated) * rate) - 1
+            self.db.execute(
+                "INSERT OR REPLACE INTO buckets (host, tokens, updated) VALUES (?, ?, ?)",
+                (host, tokens, now),
+            )
+        # A negative balance is a reservation: wait until it is paid back
+        return max(0.0, -tokens / rate)
+
+
+class _Immediate:
+    """``BEGIN IMMEDIATE`` … ``COMMIT``: takes the write lock up front."""
+
+    def __init__(self, db):
+        self.db = db
+
+    def __enter__(self):
+        self.db.execute("BEGIN IMMEDIATE")
+
+    def __exit__(self, exc_type, exc, tb):
+        self.db.execute("ROLLBACK" if exc_type else "COMMIT")
+
+
+def worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class DistributedCrawl:
+    """Feeds a spider from a ``WorkQueue`` instead of its own start requests.
+
+    Spiders opt in by implementing ``request_for(key)`` and tagging their
+    requests with ``meta["work_key"]``. A leased request that ends without an
+    item (download error, HTTP error, a page dropped by ``PageClassMiddleware``,
+    a request dropped by the scheduler) gives its key back for another
+    attempt, or fails it for good when the page is not found; otherwise the
+    lease would be renewed forever and the crawl would never finish.
+    """
+
+    def __init__(self, crawler, queue: WorkQueue, batch_size: int, lease_ttl: float):
+        self.crawler = crawler
+        self.queue = queue
+        self.batch_size = batch_size
+        self.lease_ttl = lease_ttl
+        self.worker = worker_id()
+        self.held = set()
+        self._heartbeat = task.LoopingCall(self._renew_leases)
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        path = settings.get("WORK_QUEUE_PATH")
+        if not path:
+            raise NotConfigured
+        queue = SqliteWorkQueue(path, max_attempts=settings.getint("WORK_QUEUE_MAX_ATTEMPTS", 3))
+        ext = cls(
+            crawler,
+            queue,
+            batch_size=settings.getint("WORK_QUEUE_BATCH_SIZE", 20),
+            lease_ttl=settings.getfloat("WORK_QUEUE_LEASE_TTL", 120),
+        )
+        crawler.signals.connect(ext.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(ext.spider_idle, signal=signals.spider_idle)
+        crawler.signals.connect(ext.item_scraped, signal=signals.item_scraped)
+        crawler.signals.connect(ext.spider_error, signal=signals.spider_error)
+        crawler.signals.connect(ext.request_dropped, signal=signals.request_dropped)
+        crawler.signals.connect(ext.spider_closed, signal=signals.spider_closed)
+        return ext
+
+    def spider_opened(self, spider):
+        spider.work_queue = self.queue
+        spider.logger.info("Distributed mode: worker %s on %s", self.worker, self.queue.path)
+        self._heartbeat.start(self.lease_ttl / 3, now=False)
+
+    def spider_idle(self, spider):
+        keys = self.queue.lease(self.worker, self.batch_size, self.lease_ttl)
+        for key in keys:
+            self.held.add(key)
+            request = spider.request_for(key)
+            self.crawler.engine.crawl(request.replace(errback=self._errback(request.errback)))
+        self.crawler.stats.inc_value("work_queue/leased", len(keys))
+        # Keep running while other workers still hold leases that may expire
+        if keys or self.queue.outstanding():
+            raise DontCloseSpider
+
+    def item_scraped(self, item, response, spider):
+        key = response.meta.get("work_key")
+        if key is None:
+            return
+        self.queue.complete(self.worker, key, ItemAdapter(item).asdict())
+        self.held.discard(key)
+        self.crawler.stats.inc_value("work_queue/completed")
+
+    def spider_error(self, failure, response, spider):
+        self._give_up(response.meta.get("work_key"))
+
+    def request_dropped(self, request, spider):
+        self._give_up(request.meta.get("work_key"))
+
+    def _errback(self, errback):
+        """Wraps a leased request's errback; the key is given up unless it yields follow-ups."""
+
+        def failed(failure):
+            # An errback may return one request or item, an iterable of them or None
+            results = list(arg_to_iter(errback(failure))) if errback is not None else []
+            if not results:
+                request = failure.request
+                self._give_up(request.meta.get("work_key"), permanent=_not_found(failure))
+            return results
+
+        return failed
+
+    def _give_up(self, key, permanent: bool = False):
+        if key not in self.held:
+            return
+        if permanent:
+            self.queue.fail(self.worker, key)
+            self.crawler.stats.inc_value("work_queue/failed")
+        else:
+            self.queue.release(self.worker, key)
+            self.crawler.stats.inc_value("work_queue/released")
+        self.held.discard(key)
+
+    def spider_closed(self, spider, reason):
+        if self._heartbeat.running:
+            self._heartbeat.stop()
+        for key in list(self.held):
+            self.queue.release(self.worker, key)
+
+    def _renew_leases(self):
+        if self.held:
+            self.queue.heartbeat(self.worker, self.held, self.lease_ttl)
+
+
+def _not_found(failure) -> bool:
+    """Whether retrying cannot help: a 404/410 or a page labelled not-found."""
+    response = getattr(failure.value, "response", None)
+    if response is not None and getattr(response, "status", None) in (404, 410):
+        return True
+    return failure.request.meta.get("page_class") == "not-found"
+
+
+class SharedRateLimitMiddleware:
+    """Downloader middleware spending one token of the fleet-wide host budget per request.
+
+    The token is taken in a thread of its own: the SQLite transaction can wait
+    up to 30 s for another worker's write lock, which would stall every
+    download if it ran on the reactor thread.
+    """
+
+    def __init__(self, queue: WorkQueue, rate: float, burst: float):
+        self.queue = queue
+        self.rate = rate
+        self.burst = burst
+        # One thread, so the queue's connection is never used concurrently
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="shared-rate")
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        path = settings.get("WORK_QUEUE_PATH")
+        rate = settings.getfloat("WORK_QUEUE_HOST_RATE", 0)
+        if not path or rate <= 0:
+            raise NotConfigured
+        mw = cls(SqliteWorkQueue(path), rate, settings.getfloat("WORK_QUEUE_HOST_BURST", 1))
+        crawler.signals.connect(mw.spider_closed, signal=signals.spider_closed)
+        return mw
+
+    async def process_request(self, request):
+        host = urlsplit(request.url).hostname or ""
+        wait = await asyncio.get_running_loop().run_in_executor(
+            self._executor, self.queue.acquire_rate, host, self.rate, self.burst,
+        )
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return None
+
+    def spider_closed(self, spider):
+        self._executor.shutdown(wait=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage a distributed crawl queue")
+    sub = parser.add_subparsers(dest="command", required=True)
+    seed = sub.add_parser("seed", help="add keys to the queue")
+    seed.add_argument("queue")
+    seed.add_argument(
+        "input", help="file with one key per line (or CSV / JSON lines, see inputs.py), or - for stdin"
+    )
+    seed.add_argument("--column", help="CSV column or JSON field holding the keys")
+    status = sub.add_parser("status", help="show task counts")
+    status.add_argument("queue")
+    export = sub.add_parser("export", help="write results as JSON lines")
+    export.add_argument("queue")
+    export.add_argument("output", help="output file, or - for stdout")
+    args = parser.parse_args(argv)
+
+    queue = SqliteWorkQueue(args.queue)
+    if args.command == "seed":
+        added = queue.put(inputs.unique(inputs.iter_values(args.input, args.column)))
+        print(f"added {added} keys")
+    elif args.command == "status":
+        print(json.dumps(queue.counts(), indent=2))
+    else:
+        out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+        with out:
+            for key, data in queue.results():
+                out.write(json.dumps({"key": key, **data}, ensure_ascii=False) + "\n")
+
+
+if __name__ == "__main__":
+    main()
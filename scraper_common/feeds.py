@@ -0,0 +1,151 @@
+"""
+Rotating, gzip-compressed JSON lines feed.
+
+Writes scraped items as newline-delimited JSON in numbered segments
+(``part-00000.jsonl.gz``, ``part-00001.jsonl.gz``, ...) instead of one JSON
+array. Items are buffered and written in batches through a gzip stream; a
+segment is rotated once it holds ``ROTATING_FEED_MAX_ITEMS`` items or its
+compressed size reaches ``ROTATING_FEED_MAX_BYTES`` (checked after each batch
+of ``ROTATING_FEED_BATCH_SIZE`` items).
+
+The segment being written carries an ``.inprogress`` suffix. On rotation it is
+renamed to its final name and ``manifest.json`` is rewritten atomically, so a
+downstream job can read the manifest (or glob ``*.jsonl.gz``) while the crawl
+is running and only ever see complete segments. If the process dies, every
+segment listed in the manifest is intact; a re-run resumes numbering after the
+last listed segment.
+
+Enable with ``-s ROTATING_FEED_DIR=output/%(name)s`` (``%(name)s`` is the
+spider name, ``%(time)s`` the crawl start time). ``records.iter_items`` reads
+the completed segments back.
+"""
+
+import gzip
+import json
+import os
+import time
+from datetime import datetime, timezone
+
+from itemadapter import ItemAdapter
+from scrapy import signals
+from scrapy.exceptions import NotConfigured
+from scrapy.utils.serialize import ScrapyJSONEncoder
+
+from scraper_common.records import MANIFEST_NAME, read_manifest
+
+SEGMENT_TEMPLATE = "part-{:05d}.jsonl.gz"
+IN_PROGRESS_SUFFIX = ".inprogress"
+
+
+def _write_json_atomic(path: str, data) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class RotatingJsonLinesFeed:
+    def __init__(self, directory: str, max_items: int, max_bytes: int,
+                 batch_size: int, encoding: str = "utf-8"):
+        self.directory_template = directory
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.batch_size = max(1, batch_size)
+        self.encoding = encoding
+        self.encoder = ScrapyJSONEncoder(ensure_ascii=False)
+        self.directory = None
+        self.manifest = None
+        self._raw = None
+        self._gzip = None
+        self._batch = []
+        self._segment_items = 0
+        self._segment_started = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        directory = settings.get("ROTATING_FEED_DIR")
+        if not directory:
+            raise NotConfigured
+        ext = cls(
+            directory,
+            max_items=settings.getint("ROTATING_FEED_MAX_ITEMS", 50000),
+            max_bytes=settings.getint("ROTATING_FEED_MAX_BYTES", 64 * 1024 * 1024),
+            batch_size=settings.getint("ROTATING_FEED_BATCH_SIZE", 100),
+            encoding=settings.get("FEED_EXPORT_ENCODING") or "utf-8",
+        )
+        crawler.signals.connect(ext.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(ext.item_scraped, signal=signals.item_scraped)
+        crawler.signals.connect(ext.spider_closed, signal=signals.spider_closed)
+        return ext
+
+    # ── Signals ──
+
+    def spider_opened(self, spider):
+        self.directory = self.directory_template % {
+            "name": spider.name,
+            "time": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H-%M-%S"),
+        }
+        os.makedirs(self.directory, exist_ok=True)
+        self.manifest = read_manifest(self.directory)
+        self.manifest["complete"] = False
+        spider.logger.info(
+            "Rotating JSON lines feed: %s (resuming after %d segments)",
+            self.directory, len(self.manifest["segments"]),
+        )
+
+    def item_scraped(self, item, spider):
+        line = self.encoder.encode(ItemAdapter(item).asdict()) + "\n"
+        self._batch.append(line.encode(self.encoding))
+        if len(self._batch) >= self.batch_size:
+            self._write_batch()
+
+    def spider_closed(self, spider, reason):
+        self._write_batch()
+        self._finish_segment()
+        self.manifest["complete"] = True
+        self.manifest["finish_reason"] = reason
+        _write_json_atomic(os.path.join(self.directory, MANIFEST_NAME), self.manifest)
+
+    # ── Segments ──
+
+    def _segment_path(self) -> str:
+        index = len(self.manifest["segments"])
+        return os.path.join(self.directory, SEGMENT_TEMPLATE.format(index))
+
+    def _write_batch(self) -> None:
+        if not self._batch:
+            return
+        if self._gzip is None:
+            self._raw = open(self._segment_path() + IN_PROGRESS_SUFFIX, "wb")
+            self._gzip = gzip.GzipFile(fileobj=self._raw, mode="wb")
+            self._segment_items = 0
+            self._segment_started = time.time()
+        self._gzip.write(b"".join(self._batch))
+        self._segment_items += len(self._batch)
+        self._batch = []
+        if self._segment_items >= self.max_items or self._raw.tell() >= self.max_bytes:
+            self._finish_segment()
+
+    def _finish_segment(self) -> None:
+        if self._gzip is None:
+            return
+        self._gzip.close()
+        self._raw.flush()
+        os.fsync(self._raw.fileno())
+        size = self._raw.tell()
+        self._raw.close()
+
+        final_path = self._segment_path()
+        os.replace(final_path + IN_PROGRESS_SUFFIX, final_path)
+        self.manifest["segments"].append({
+            "name": os.path.basename(final_path),
+            "items": self._segment_items,
+            "bytes": size,
+            "started_at": self._segment_started,
+            "finished_at": time.time(),
+        })
+        _write_json_atomic(os.path.join(self.directory, MANIFEST_NAME), self.manifest)
+        self._gzip = self._raw = None
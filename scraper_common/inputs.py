@@ -0,0 +1,159 @@
+"""
+Streamed spider input: handles read lazily from a file or stdin.
+
+Instead of one comma-joined ``-a companies=...`` or ``-a profiles=...``
+argument, either spider can be given ``-a input=PATH`` (``-`` for stdin).
+The input is read line by line while the crawl runs, so a crawl over
+millions of handles starts at once and does not hold the list in memory.
+Formats, by extension (``.gz`` is decompressed, and gzip on stdin is
+detected):
+
+- plain (default): one handle or URL per line; blank lines and ``#`` comments
+  are skipped.
+- CSV (``.csv``, ``.tsv``): the ``-a column=NAME`` column, else the first
+  column named handle/company/profile/url, else the first column. Without a
+  known column name (or with ``column=N``, counting from 0) the file is taken
+  to have no header row.
+- JSON lines (``.jsonl``, ``.ndjson``): strings, or objects whose ``column``
+  field (else the first of the names above) holds the handle.
+
+``-a format=plain|csv|tsv|jsonl`` overrides the extension. Duplicates are
+dropped on the fly; ``Dedupe`` keeps an 8-byte hash per distinct handle
+rather than the strings.
+"""
+
+import csv
+import gzip
+import hashlib
+import io
+import json
+import sys
+from array import array
+
+KNOWN_COLUMNS = ("handle", "company", "profile", "url", "linkedin_url")
+
+_FORMATS = {".csv": "csv", ".tsv": "tsv", ".jsonl": "jsonl", ".ndjson": "jsonl"}
+_GZIP_MAGIC = b"\x1f\x8b"
+
+
+def input_format(path: str) -> str:
+    name = path.lower()
+    if name.endswith(".gz"):
+        name = name[:-3]
+    for extension, fmt in _FORMATS.items():
+        if name.endswith(extension):
+            return fmt
+    return "plain"
+
+
+def open_text(path: str):
+    """Text stream over a file or stdin (``-``), gunzipping when needed."""
+    raw = sys.stdin.buffer if path == "-" else open(path, "rb")
+    if not isinstance(raw, io.BufferedReader):
+        raw = io.BufferedReader(raw)
+    if raw.peek(2)[:2] == _GZIP_MAGIC:
+        raw = gzip.GzipFile(fileobj=raw)
+    return io.TextIOWrapper(raw, encoding="utf-8", newline="")
+
+
+def _from_record(record, column: str | None):
+    if isinstance(record, str):
+        return record
+    if not isinstance(record, dict):
+        return None
+    if column:
+        return record.get(column)
+    return next((record[name] for name in KNOWN_COLUMNS if record.get(name)), None)
+
+
+def _csv_values(f, column: str | None, delimiter: str):
+    rows = csv.reader(f, delimiter=delimiter)
+    header = next(rows, None)
+    if header is None:
+        return
+    names = [name.strip().lower() for name in header]
+    if column is not None:
+        if column.isdigit():
+            index = int(column)
+            if len(header) > index:
+                yield header[index]  # a column number means there is no header row
+        elif column.lower() in names:
+            index = names.index(column.lower())
+        else:
+            raise ValueError(f"Column {column!r} not in input header: {', '.join(header)}")
+    else:
+        known = [name for name in KNOWN_COLUMNS if name in names]
+        if known:
+            index = names.index(known[0])
+        else:
+            index = 0
+            yield header[0]  # no header row
+    for row in rows:
+        if len(row) > index:
+            yield row[index]
+
+
+def iter_values(path: str, column: str | None = None, fmt: str | None = None):
+    """Raw handle values from an input file, in file order (duplicates included)."""
+    fmt = fmt or input_format(path)
+    with open_text(path) as f:
+        if fmt in ("csv", "tsv"):
+            values = _csv_values(f, column, "\t" if fmt == "tsv" else ",")
+        elif fmt == "jsonl":
+            values = (_from_record(json.loads(line), column) for line in f if line.strip())
+        elif fmt == "plain":
+            values = (line for line in f if not line.lstrip().startswith("#"))
+        else:
+            raise ValueError(f"Unknown input format: {fmt}")
+        for value in values:
+            if value and str(value).strip():
+                yield str(value).strip()
+
+
+class Dedupe:
+    """Set of seen keys kept as 64-bit hashes in an open-addressing table.
+
+    About 16 bytes per distinct key; a collision (1 in 2**64 per pair) would
+    drop a key.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self._table = array("Q", bytes(8 * capacity))
+        self._mask = capacity - 1
+        self.size = 0
+        self.duplicates = 0
+
+    def add(self, key: str) -> bool:
+        """Record ``key``; False if it was seen before."""
+        h = int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "little") or 1
+        table, mask = self._table, self._mask
+        i = h & mask
+        while table[i]:
+            if table[i] == h:
+                self.duplicates += 1
+                return False
+            i = (i + 1) & mask
+        table[i] = h
+        self.size += 1
+        if 2 * self.size > len(table):
+            self._grow()
+        return True
+
+    def _grow(self) -> None:
+        old = self._table
+        self._table = array("Q", bytes(16 * len(old)))
+        self._mask = len(self._table) - 1
+        for h in old:
+            if h:
+                i = h & self._mask
+                while self._table[i]:
+                    i = (i + 1) & self._mask
+                self._table[i] = h
+
+
+def unique(keys, seen: Dedupe | None = None):
+    """``keys`` without repeats, lazily."""
+    seen = seen if seen is not None else Dedupe()
+    for key in keys:
+        if seen.add(key):
+            yield key
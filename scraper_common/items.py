@@ -0,0 +1,85 @@
+"""
+Typed records produced by the scrapers: the API and both Scrapy projects.
+
+Slotted dataclasses with a fixed schema: every field is always present,
+missing values are ``None`` (never a ``"not-found"`` string) and counts are
+ints. Scrapy handles them through itemadapter. ``status`` says how the
+lookup ended: ``"ok"``, ``"error"`` (with ``error`` saying why), or, for API
+requests with a deadline, ``"timeout"`` (started but unfinished) and
+``"skipped"`` (never started). ``dumps`` serializes them with orjson when it
+is installed.
+"""
+
+import json
+from dataclasses import dataclass
+
+try:
+    import orjson
+except ImportError:  # optional speed-up
+    orjson = None
+
+
+@dataclass(slots=True)
+class CompanyItem:
+    # Page the record was scraped from (its handle keys the search index)
+    company_url: str | None = None
+    company_name: str | None = None
+    linkedin_followers_count: int | None = None
+    company_logo_url: str | None = None
+    about_us: str | None = None
+    num_of_employees: int | None = None
+    website: str | None = None
+    industry: str | None = None
+    company_size_approx: str | None = None
+    headquarters: str | None = None
+    type: str | None = None
+    founded: str | None = None
+    specialties: str | None = None
+    funding: str | None = None
+    funding_total_rounds: int | None = None
+    funding_option: str | None = None
+    last_funding_round: str | None = None
+    # Stored logo (scraper_common/assets.py), filled when ASSET_DIR is set
+    company_logo_key: str | None = None
+    error: str | None = None
+    status: str = "ok"
+
+    def to_dict(self, fields=None) -> dict:
+        """Plain dict of the record, limited to ``fields`` (plus ``error`` and ``status``) if given."""
+        names = _COMPANY_SLOTS if fields is None else (*fields, "error", "status")
+        return {name: getattr(self, name) for name in names}
+
+
+@dataclass(slots=True)
+class ProfileItem:
+    profile_url: str | None = None
+    name: str | None = None
+    headline: str | None = None
+    location: str | None = None
+    profile_photo_url: str | None = None
+    connections: str | None = None
+    about: str | None = None
+    current_role: str | None = None
+    # Stored photo (scraper_common/assets.py), filled when ASSET_DIR is set
+    profile_photo_key: str | None = None
+    error: str | None = None
+    status: str = "ok"
+
+    def to_dict(self, fields=None) -> dict:
+        """Plain dict of the record, limited to ``fields`` (plus ``error`` and ``status``) if given."""
+        names = _PROFILE_SLOTS if fields is None else (*fields, "error", "status")
+        return {name: getattr(self, name) for name in names}
+
+
+_COMPANY_SLOTS = CompanyItem.__slots__
+_PROFILE_SLOTS = ProfileItem.__slots__
+
+COMPANY_FIELDS = tuple(name for name in _COMPANY_SLOTS if name not in ("error", "status"))
+PROFILE_FIELDS = tuple(name for name in _PROFILE_SLOTS if name not in ("error", "status"))
+
+
+def dumps(obj) -> bytes:
+    """Serialize items (or containers of items) to JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, default=lambda o: o.to_dict(), ensure_ascii=False).encode("utf-8")
@@ -0,0 +1,62 @@
+"""
+Downloader middlewares used by both Scrapy projects.
+"""
+
+from urllib.parse import urlsplit
+
+from scrapy.downloadermiddlewares.retry import get_retry_request
+from scrapy.exceptions import IgnoreRequest
+
+from scraper_common.page_class import ERROR, OK, RATE_LIMITED, SNIFF_BYTES, classify
+
+
+def _header(response, name: bytes) -> str:
+    return "; ".join(value.decode("latin-1") for value in response.headers.getlist(name))
+
+
+class PageClassMiddleware:
+    """Label responses before the spider parses them and drop the ones not worth parsing.
+
+    Each response gets a ``scraper_common.page_class`` label (ok, authwall,
+    challenge, not-found, rate-limited or error), counted per host in the
+    crawl stats (``page_class/<label>``, ``page_class/<host>/<label>``) and
+    stored in ``response.meta["page_class"]``. Then:
+
+    - ok and error pages go on as before (errors meet ``HttpErrorMiddleware``
+      and the retry middleware);
+    - rate-limited pages are retried (``RETRY_TIMES``), then dropped;
+    - login walls, challenges and not-found pages are dropped with
+      ``IgnoreRequest``, so the request's errback sees them instead of the
+      spider parsing an empty record. A request that handles some of these
+      itself lists them in ``meta["handle_page_classes"]``.
+
+    It sits after ``RedirectMiddleware`` on the way in, so a redirect to the
+    login wall is labelled by the page it lands on.
+    """
+
+    def __init__(self, crawler):
+        self.crawler = crawler
+        self.stats = crawler.stats
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls(crawler)
+
+    def process_response(self, request, response, spider=None):
+        label = classify(
+            response.status, response.url, response.body[:SNIFF_BYTES],
+            _header(response, b"Location"), _header(response, b"Set-Cookie"),
+        )
+        host = urlsplit(response.url).hostname or ""
+        self.stats.inc_value(f"page_class/{label}")
+        self.stats.inc_value(f"page_class/{host}/{label}")
+        request.meta["page_class"] = label
+        if label in (OK, ERROR) or label in request.meta.get("handle_page_classes", ()):
+            return response
+        if label == RATE_LIMITED:
+            retry = get_retry_request(
+                request, spider=spider or self.crawler.spider, reason="page_class/rate-limited",
+            )
+            if retry is not None:
+                return retry
+        raise IgnoreRequest(f"{label} page from {response.url}")
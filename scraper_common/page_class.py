@@ -0,0 +1,91 @@
+"""
+Cheap classification of fetched pages before they are parsed, shared by the
+API's fetcher (``api.page_class``) and the Scrapy projects
+(``scraper_common.middlewares.PageClassMiddleware``).
+
+A blocked or logged-out request to LinkedIn often gets a page the parser
+takes for real data, such as a login wall behind a redirect, a security
+check or an empty "page not found" shell. Parsing one returned a record of
+empty fields. ``classify`` looks at the status, the redirect target, the
+``Set-Cookie`` header and the first ``SNIFF_BYTES`` of the body, and labels
+the response:
+
+ok
+    The page asked for (or a redirect the caller deals with).
+authwall
+    Login or sign-up wall; also a revoked ``li_at`` (``li_at=delete me``).
+challenge
+    Security check or captcha, LinkedIn's 999, DuckDuckGo's anomaly page.
+not-found
+    404/410 or a "page not found" page.
+rate-limited
+    429 or a "too many requests" page.
+error
+    Any other 4xx/5xx.
+"""
+
+import re
+from urllib.parse import urlsplit
+
+OK = "ok"
+AUTHWALL = "authwall"
+CHALLENGE = "challenge"
+NOT_FOUND = "not-found"
+RATE_LIMITED = "rate-limited"
+ERROR = "error"
+LABELS = (OK, AUTHWALL, CHALLENGE, NOT_FOUND, RATE_LIMITED, ERROR)
+
+SNIFF_BYTES = 8192
+
+# Path prefixes of LinkedIn's login and security-check pages
+_AUTHWALL_PATHS = ("/authwall", "/login", "/uas/login", "/signup", "/checkpoint/lg/login")
+_CHALLENGE_PATHS = ("/checkpoint/",)
+
+_TITLE = re.compile(rb"<title[^>]*>(.*?)</title>", re.DOTALL | re.IGNORECASE)
+# Titles of those pages, up to the first "|" (company pages are titled
+# "<name> | LinkedIn", so the whole segment must match, not a prefix)
+_TITLES = (
+    (AUTHWALL, {b"sign up", b"sign in", b"linkedin login", b"linkedin login, sign in", b"join linkedin"}),
+    (CHALLENGE, {b"security verification"}),
+    (NOT_FOUND, {b"page not found", b"404", b"404 not found"}),
+    (RATE_LIMITED, {b"too many requests", b"429 too many requests"}),
+)
+_CHALLENGE_MARKERS = (b"/checkpoint/challenge", b"g-recaptcha", b"h-captcha", b"anomaly-modal")
+
+
+def _by_path(url: str) -> str | None:
+    path = urlsplit(url).path.lower()
+    if path.startswith(_AUTHWALL_PATHS):
+        return AUTHWALL
+    if path.startswith(_CHALLENGE_PATHS):
+        return CHALLENGE
+    return None
+
+
+def classify(status: int, url: str, head: bytes, location: str = "", set_cookie: str = "") -> str:
+    """Label a response from its status, final URL, first bytes and two headers."""
+    if status == 429:
+        return RATE_LIMITED
+    if status == 999:
+        return CHALLENGE
+    if "li_at=delete" in set_cookie:
+        return AUTHWALL
+    if 300 <= status < 400:
+        return _by_path(location) or OK
+    label = _by_path(url)
+    if label is not None:
+        return label
+    if status in (404, 410):
+        return NOT_FOUND
+    if status == 401:
+        return AUTHWALL
+    head = head[:SNIFF_BYTES].lower()
+    title = _TITLE.search(head)
+    if title is not None:
+        name = title.group(1).split(b"|", 1)[0].strip()
+        for label, names in _TITLES:
+            if name in names:
+                return label
+    if any(marker in head for marker in _CHALLENGE_MARKERS):
+        return CHALLENGE
+    return ERROR if status >= 400 else OK
@@ -0,0 +1,48 @@
+"""
+Item pipelines used by both Scrapy projects.
+"""
+
+from itemadapter import ItemAdapter
+from scrapy.exceptions import NotConfigured
+
+from scraper_common.assets import ASSET_FIELDS, AssetFetcher, AssetStore
+
+
+class AssetsPipeline:
+    """Store each item's logo or profile photo in the asset store and set its key field.
+
+    Off unless ``ASSET_DIR`` is set. Downloads run in the asset fetcher's own
+    ``ASSET_CONCURRENCY`` threads, not through Scrapy's downloader, so they
+    never take a page request's slot (see assets.py). Items without one of
+    the ``ASSET_FIELDS`` key fields pass through untouched.
+    """
+
+    def __init__(self, fetcher: AssetFetcher, stats):
+        self.fetcher = fetcher
+        self.stats = stats
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        root = settings.get("ASSET_DIR")
+        if not root:
+            raise NotConfigured
+        fetcher = AssetFetcher(
+            AssetStore(root),
+            concurrency=settings.getint("ASSET_CONCURRENCY", 8),
+            timeout=settings.getfloat("DOWNLOAD_TIMEOUT", 20),
+            max_bytes=settings.getint("ASSET_MAX_BYTES", 5 * 1024 * 1024),
+        )
+        return cls(fetcher, crawler.stats)
+
+    async def process_item(self, item):
+        adapter = ItemAdapter(item)
+        for url_field, key_field in ASSET_FIELDS.items():
+            if key_field in adapter.field_names() and adapter.get(url_field):
+                adapter[key_field] = await self.fetcher.fetch(adapter[url_field])
+        return item
+
+    def close_spider(self):
+        for name, count in self.fetcher.stats.items():
+            self.stats.set_value(f"assets/{name}", count)
+        self.fetcher.close()
@@ -0,0 +1,39 @@
+"""
+Readers for crawl output: Scrapy ``-O`` JSON arrays, (gzipped) JSON lines
+and the segment directories written by ``feeds.RotatingJsonLinesFeed``.
+
+Plain files and ``json``, so the API can read crawl output without Scrapy.
+"""
+
+import gzip
+import json
+import os
+
+MANIFEST_NAME = "manifest.json"
+
+
+def read_file(path: str):
+    """Records from a JSON array file or (gzipped) JSON lines."""
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        if path.endswith(".json"):
+            data = json.load(f)
+            yield from (r for r in data if isinstance(r, dict))
+            return
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def read_manifest(directory: str) -> dict:
+    path = os.path.join(directory, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {"segments": [], "complete": False}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def iter_items(directory: str, start_segment: int = 0):
+    """Yield items from completed segments, starting at ``start_segment``."""
+    for segment in read_manifest(directory)["segments"][start_segment:]:
+        yield from read_file(os.path.join(directory, segment["name"]))
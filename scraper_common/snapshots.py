@@ -0,0 +1,387 @@
+"""
+Append-only time series of company counts.
+
+Every scrape of a company appends one snapshot (time, followers, employees,
+funding rounds) instead of overwriting the last one. A snapshot directory
+holds two files:
+
+``log.csv``
+    New snapshots, one line each, appended with a single ``write`` per batch
+    so several processes (API workers, crawls) can append at once.
+``snapshots.npz``
+    The compacted history: rows grouped by company and sorted by time, each
+    numeric column delta-encoded (first value per company, then differences),
+    narrowed to the smallest integer type that fits and zlib-compressed.
+    Growth series change slowly, so most deltas are 0 or small.
+
+Once the log grows past ``compact_bytes`` it is folded into the npz. Queries
+decode the columns with ``numpy.cumsum`` and compute series and movers with
+array operations over all companies at once.
+
+The API records every company it scrapes here (``api.snapshots``), and so
+does a crawl with ``SnapshotRecorder`` (``company_data_scraper.snapshots``)
+pointed at the same directory.
+
+    python -m scraper_common.snapshots compact SNAPSHOT_DIR
+    python -m scraper_common.snapshots history SNAPSHOT_DIR openai
+    python -m scraper_common.snapshots movers SNAPSHOT_DIR --metric linkedin_followers_count --days 30
+"""
+
+import argparse
+import json
+import os
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # not on Windows — compaction runs unlocked
+    fcntl = None
+
+METRICS = ("linkedin_followers_count", "num_of_employees", "funding_total_rounds")
+
+LOG_NAME = "log.csv"
+COMPACTING_NAME = "log.csv.compacting"
+DATA_NAME = "snapshots.npz"
+LOCK_NAME = "compact.lock"
+
+
+@dataclass
+class Columns:
+    """Decoded snapshots, sorted by (company, time).
+
+    Rows of company ``handles[i]`` are ``offsets[i]:offsets[i + 1]``.
+    """
+
+    handles: np.ndarray
+    offsets: np.ndarray
+    ts: np.ndarray
+    values: dict[str, np.ndarray]
+    valid: dict[str, np.ndarray]
+
+    @property
+    def row_company(self) -> np.ndarray:
+        return np.repeat(np.arange(len(self.handles)), np.diff(self.offsets))
+
+
+def _narrow(a: np.ndarray) -> np.ndarray:
+    """Smallest signed integer dtype that holds every value of ``a``."""
+    if a.size == 0:
+        return a.astype(np.int8)
+    low, high = int(a.min()), int(a.max())
+    for dtype in (np.int8, np.int16, np.int32):
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return a.astype(dtype)
+    return a.astype(np.int64)
+
+
+def _segment_starts(offsets: np.ndarray) -> np.ndarray:
+    starts = offsets[:-1]
+    return starts[np.diff(offsets) > 0]
+
+
+def _delta_encode(x: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    d = np.diff(x, prepend=0)
+    starts = _segment_starts(offsets)
+    d[starts] = x[starts]
+    return _narrow(d)
+
+
+def _delta_decode(d: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    d = d.astype(np.int64)
+    total = np.cumsum(d)
+    starts = _segment_starts(offsets)
+    lengths = np.diff(offsets)
+    # Undo the running sum carried over from the previous companies
+    carry = total[starts] - d[starts]
+    return total - np.repeat(carry, lengths[lengths > 0])
+
+
+def _forward_fill(x: np.ndarray, valid: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """Replace missing values with the company's previous value (0 before the first)."""
+    is_start = np.zeros(len(x), dtype=bool)
+    is_start[_segment_starts(offsets)] = True
+    x = np.where(valid, x, 0)
+    pos = np.maximum.accumulate(np.where(valid | is_start, np.arange(len(x)), 0))
+    return x[pos]
+
+
+def _group(handles, ts, values, valid) -> Columns:
+    """Sort rows by (company, time), drop duplicate snapshots and build offsets."""
+    unique, idx = np.unique(handles, return_inverse=True)
+    order = np.lexsort((ts, idx))
+    idx, ts = idx[order], ts[order]
+    keep = np.ones(len(idx), dtype=bool)
+    keep[1:] = (idx[1:] != idx[:-1]) | (ts[1:] != ts[:-1])
+    rows = order[keep]
+    idx, ts = idx[keep], ts[keep]
+    offsets = np.searchsorted(idx, np.arange(len(unique) + 1))
+    return Columns(
+        handles=unique,
+        offsets=offsets,
+        ts=ts,
+        values={m: values[m][rows] for m in METRICS},
+        valid={m: valid[m][rows] for m in METRICS},
+    )
+
+
+def _metric_value(item, name):
+    value = item.get(name) if isinstance(item, dict) else getattr(item, name, None)
+    return value if isinstance(value, int) else None
+
+
+class SnapshotStore:
+    def __init__(self, directory: str, compact_bytes: int = 4 * 1024 * 1024):
+        self.directory = directory
+        self.compact_bytes = compact_bytes
+        os.makedirs(directory, exist_ok=True)
+        self._cache_key = None
+        self._cache = None
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    # ── Writing ──
+
+    def append(self, records, ts: int | None = None) -> None:
+        """Append ``(handle, item)`` pairs; ``item`` is a dict or item object."""
+        ts = int(time.time()) if ts is None else int(ts)
+        lines = []
+        for handle, item in records:
+            values = (_metric_value(item, m) for m in METRICS)
+            cells = ",".join("" if v is None else str(v) for v in values)
+            lines.append(f"{ts},{handle.replace(',', '')},{cells}\n")
+        if not lines:
+            return
+        fd = os.open(self._path(LOG_NAME), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, "".join(lines).encode("utf-8"))
+            size = os.fstat(fd).st_size
+        finally:
+            os.close(fd)
+        if size >= self.compact_bytes:
+            self.compact(wait=False)
+
+    def record(self, handle: str, item, ts: int | None = None) -> None:
+        self.append([(handle, item)], ts)
+
+    def compact(self, wait: bool = True) -> bool:
+        """Fold the log into the npz. Returns False if another process is compacting."""
+        with open(self._path(LOCK_NAME), "w") as lock:
+            if fcntl is not None:
+                try:
+                    fcntl.flock(lock, fcntl.LOCK_EX | (0 if wait else fcntl.LOCK_NB))
+                except BlockingIOError:
+                    return False
+            compacting = self._path(COMPACTING_NAME)
+            if not os.path.exists(compacting):  # else: finish a crashed compaction first
+                if not os.path.exists(self._path(LOG_NAME)):
+                    return True
+                os.replace(self._path(LOG_NAME), compacting)
+            cols = self._merge(self._read_data(), self._read_log(compacting))
+            self._write_data(cols)
+            os.remove(compacting)
+            self._cache_key = None
+        return True
+
+    def _write_data(self, cols: Columns) -> None:
+        arrays = {
+            "handles": cols.handles,
+            "offsets": cols.offsets,
+            "ts": _delta_encode(cols.ts, cols.offsets),
+        }
+        for m in METRICS:
+            filled = _forward_fill(cols.values[m], cols.valid[m], cols.offsets)
+            arrays[m] = _delta_encode(filled, cols.offsets)
+            arrays[f"{m}_valid"] = np.packbits(cols.valid[m])
+        tmp_path = self._path(DATA_NAME + ".tmp.npz")
+        np.savez_compressed(tmp_path, **arrays)
+        os.replace(tmp_path, self._path(DATA_NAME))
+
+    # ── Reading ──
+
+    def _read_data(self) -> Columns | None:
+        path = self._path(DATA_NAME)
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as data:
+            offsets = data["offsets"]
+            n = int(offsets[-1])
+            return Columns(
+                handles=data["handles"],
+                offsets=offsets,
+                ts=_delta_decode(data["ts"], offsets),
+                values={m: _delta_decode(data[m], offsets) for m in METRICS},
+                valid={
+                    m: np.unpackbits(data[f"{m}_valid"], count=n).astype(bool) for m in METRICS
+                },
+            )
+
+    def _read_log(self, path: str) -> Columns | None:
+        """Parse a (small) log file; malformed lines are skipped."""
+        handles, ts, values = [], [], []
+        try:
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    parts = line.rstrip("\n").split(",")
+                    if len(parts) != 2 + len(METRICS) or not parts[0].isdigit():
+                        continue
+                    handles.append(parts[1])
+                    ts.append(int(parts[0]))
+                    values.append([int(v) if v.lstrip("-").isdigit() else -1 for v in parts[2:]])
+        except FileNotFoundError:
+            return None
+        if not handles:
+            return None
+        matrix = np.array(values, dtype=np.int64).reshape(-1, len(METRICS))
+        return _group(
+            np.array(handles),
+            np.array(ts, dtype=np.int64),
+            {m: matrix[:, i] for i, m in enumerate(METRICS)},
+            {m: matrix[:, i] >= 0 for i, m in enumerate(METRICS)},
+        )
+
+    def _merge(self, *parts: Columns | None) -> Columns:
+        parts = [p for p in parts if p is not None and len(p.ts)]
+        if not parts:
+            empty = np.zeros(0, dtype=np.int64)
+            return Columns(
+                handles=np.array([], dtype=str),
+                offsets=np.zeros(1, dtype=np.int64),
+                ts=empty,
+                values={m: empty for m in METRICS},
+                valid={m: empty.astype(bool) for m in METRICS},
+            )
+        if len(parts) == 1:
+            return parts[0]
+        return _group(
+            np.concatenate([p.handles[p.row_company] for p in parts]),
+            np.concatenate([p.ts for p in parts]),
+            {m: np.concatenate([p.values[m] for p in parts]) for m in METRICS},
+            {m: np.concatenate([p.valid[m] for p in parts]) for m in METRICS},
+        )
+
+    def columns(self) -> Columns:
+        """Everything stored so far (compacted history plus the log)."""
+        key = tuple(
+            (os.stat(p).st_mtime_ns, os.stat(p).st_size) if os.path.exists(p) else None
+            for p in (self._path(DATA_NAME), self._path(COMPACTING_NAME), self._path(LOG_NAME))
+        )
+        if key != self._cache_key:
+            self._cache = self._merge(
+                self._read_data(),
+                self._read_log(self._path(COMPACTING_NAME)),
+                self._read_log(self._path(LOG_NAME)),
+            )
+            self._cache_key = key
+        return self._cache
+
+    def history(self, handle: str, since: int | None = None) -> list[dict]:
+        """Snapshots of one company, oldest first."""
+        cols = self.columns()
+        i = np.searchsorted(cols.handles, handle)
+        if i >= len(cols.handles) or cols.handles[i] != handle:
+            return []
+        rows = np.arange(cols.offsets[i], cols.offsets[i + 1])
+        if since is not None:
+            rows = rows[cols.ts[rows] >= since]
+        ts = cols.ts[rows].tolist()
+        values = {m: cols.values[m][rows].tolist() for m in METRICS}
+        valid = {m: cols.valid[m][rows].tolist() for m in METRICS}
+        return [
+            {"ts": ts[j], **{m: values[m][j] if valid[m][j] else None for m in METRICS}}
+            for j in range(len(rows))
+        ]
+
+    def movers(
+        self,
+        metric: str,
+        window: float,
+        n: int = 10,
+        relative: bool = False,
+        direction: str = "up",
+        now: float | None = None,
+    ) -> list[dict]:
+        """Companies whose ``metric`` changed most over the last ``window`` seconds.
+
+        The change is the last minus the first valid value inside the window
+        (relative: divided by the first value). Companies need two snapshots
+        in the window to count.
+        """
+        cols = self.columns()
+        now = time.time() if now is None else now
+        rows = np.flatnonzero((cols.ts >= now - window) & cols.valid[metric])
+        if rows.size == 0:
+            return []
+        row_company = cols.row_company
+        company = row_company[rows]
+        first = np.flatnonzero(np.r_[True, company[1:] != company[:-1]])
+        last = np.r_[first[1:] - 1, rows.size - 1]
+        enough = last > first
+        first, last = rows[first[enough]], rows[last[enough]]
+
+        start, end = cols.values[metric][first], cols.values[metric][last]
+        change = end - start
+        if relative:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                score = np.where(start > 0, change / np.where(start > 0, start, 1), np.nan)
+        else:
+            score = change.astype(np.float64)
+        score = np.where(np.isnan(score), -np.inf, score if direction == "up" else -score)
+        top = np.argsort(-score, kind="stable")[:n]
+        top = top[np.isfinite(score[top])]
+
+        handles = cols.handles[row_company[first[top]]]
+        return [
+            {
+                "handle": str(handles[j]),
+                "start": int(start[t]),
+                "end": int(end[t]),
+                "change": int(change[t]),
+                "change_pct": round(float(100 * change[t] / start[t]), 2) if start[t] > 0 else None,
+                "start_ts": int(cols.ts[first[t]]),
+                "end_ts": int(cols.ts[last[t]]),
+            }
+            for j, t in enumerate(top)
+        ]
+
+    def disk_usage(self) -> int:
+        return sum(
+            os.path.getsize(self._path(name))
+            for name in (DATA_NAME, LOG_NAME, COMPACTING_NAME)
+            if os.path.exists(self._path(name))
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect a snapshot store")
+    sub = parser.add_subparsers(dest="command", required=True)
+    compact = sub.add_parser("compact", help="fold the log into the compacted history")
+    compact.add_argument("directory")
+    history = sub.add_parser("history", help="print one company's snapshots")
+    history.add_argument("directory")
+    history.add_argument("handle")
+    movers = sub.add_parser("movers", help="print the top movers over a window")
+    movers.add_argument("directory")
+    movers.add_argument("--metric", choices=METRICS, default=METRICS[0])
+    movers.add_argument("--days", type=float, default=30)
+    movers.add_argument("-n", type=int, default=10)
+    movers.add_argument("--relative", action="store_true")
+    args = parser.parse_args(argv)
+
+    snapshot_store = SnapshotStore(args.directory)
+    if args.command == "compact":
+        snapshot_store.compact()
+        print(f"{snapshot_store.disk_usage()} bytes on disk")
+    elif args.command == "history":
+        print(json.dumps(snapshot_store.history(args.handle), indent=2))
+    else:
+        result = snapshot_store.movers(args.metric, args.days * 86400, args.n, args.relative)
+        print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()